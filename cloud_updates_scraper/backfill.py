@@ -0,0 +1,335 @@
+"""
+Historical backfill for the cloud updates scraper (main.py --backfill --from --to).
+
+The RSS feeds only cover the last few weeks. The backfill lists the updates of a date
+range from the archive listing APIs behind the providers' update pages instead:
+
+*   AWS   - the What's New directory search API behind the yearly archive pages
+            (aws.amazon.com/about-aws/whats-new/<year>/), paged newest first per year
+*   Azure - the release communications API behind azure.microsoft.com/updates, filtered
+            on the creation time
+
+The range is split into shards of shard_days days per provider, and the shards run in
+parallel. Every scraped record is appended to a checkpoint file of its shard
+(<checkpoint dir>/<provider>-<start>-<end>.jsonl), and a shard whose items were all
+scraped gets a .done marker. A run that is interrupted or that had failures can simply
+be started again: finished shards are skipped, and the other shards only scrape the URLs
+that are not in their checkpoint yet.
+
+At the end the records of all shards are merged into the workbook by one writer. URLs
+are deduplicated across the shards and upserted, so running a backfill again, or over a
+range that overlaps the workbook, adds no duplicate rows.
+"""
+
+import os
+import re
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from urllib.parse import urlencode, urljoin
+
+import run_report
+import tracing
+from scraper import http_get, normalize_azure_status, extract_azure_status_from_title
+
+logger = logging.getLogger(__name__)
+
+AWS_ARCHIVE_URL = "https://aws.amazon.com/api/dirs/items/search"
+AWS_DIRECTORY_ID = "whats-new-v2"
+AZURE_ARCHIVE_URL = "https://www.microsoft.com/releasecommunications/api/v2/azure"
+AZURE_UPDATE_URL = "https://azure.microsoft.com/en-us/updates?id={id}"
+ARCHIVE_PAGE_SIZE = 100
+DEFAULT_SHARD_DAYS = 30
+
+def _parse_timestamp(value):
+    """Naive UTC datetime of an ISO 8601 timestamp such as 2025-01-20T18:00:26.0233333Z, or None"""
+    if not value:
+        return None
+    # fromisoformat() of Python < 3.11 takes neither 'Z' nor 7 fractional digits
+    value = re.sub(r'(\.\d{6})\d+', r'\1', value.strip()).replace('Z', '+00:00')
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = (parsed - parsed.utcoffset()).replace(tzinfo=None)
+    return parsed
+
+def _get_json(url, params, provider):
+    with run_report.stage(provider, 'archive_fetch'):
+        response = http_get(f"{url}?{urlencode(params)}", timeout=30)
+        tracing.set_attribute('http.response.status_code', response.status_code)
+        response.raise_for_status()
+    run_report.add_bytes(provider, 'archive', len(response.content))
+    return response.json()
+
+@tracing.traced('list_aws_archive')
+def list_aws_archive(start, end):
+    """AWS What's New posts with start <= post time < end, newest first"""
+    items = []
+    for year in range(start.year, (end - timedelta(seconds=1)).year + 1):
+        page = 0
+        while True:
+            data = _get_json(AWS_ARCHIVE_URL, {
+                'item.directoryId': AWS_DIRECTORY_ID,
+                'sort_by': 'item.additionalFields.postDateTime',
+                'sort_order': 'desc',
+                'size': ARCHIVE_PAGE_SIZE,
+                'item.locale': 'en_US',
+                'tags.id': f"{AWS_DIRECTORY_ID}#year#{year}",
+                'page': page,
+            }, 'AWS')
+            entries = data.get('items') or []
+            oldest = None
+            for entry in entries:
+                fields = (entry.get('item') or {}).get('additionalFields') or {}
+                posted = _parse_timestamp(fields.get('postDateTime'))
+                if posted is None:
+                    continue
+                oldest = posted
+                if start <= posted < end and fields.get('headlineUrl'):
+                    items.append({
+                        'title': (fields.get('headline') or 'N/A').strip(),
+                        'url': urljoin(AWS_ARCHIVE_URL, fields['headlineUrl']),
+                        'date_posted': posted.strftime('%m/%d/%Y'),
+                    })
+            # The pages are sorted newest first, so stop at the first page that reaches past start
+            if len(entries) < ARCHIVE_PAGE_SIZE or (oldest is not None and oldest < start):
+                break
+            page += 1
+    return items
+
+@tracing.traced('list_azure_archive')
+def list_azure_archive(start, end):
+    """Azure updates created at start <= time < end, newest first, with the metadata the RSS feed carries"""
+    items = []
+    skip = 0
+    while True:
+        data = _get_json(AZURE_ARCHIVE_URL, {
+            '$filter': f"created ge {start:%Y-%m-%dT%H:%M:%SZ} and created lt {end:%Y-%m-%dT%H:%M:%SZ}",
+            '$orderby': 'created desc',
+            '$top': ARCHIVE_PAGE_SIZE,
+            '$skip': skip,
+        }, 'Azure')
+        entries = data.get('value') or []
+        for entry in entries:
+            created = _parse_timestamp(entry.get('created'))
+            if created is None or not start <= created < end or not entry.get('id'):
+                continue
+            title = (entry.get('title') or 'N/A').strip()
+            status = entry.get('status') or extract_azure_status_from_title(title) or 'N/A'
+            items.append({
+                'title': title,
+                'url': AZURE_UPDATE_URL.format(id=entry['id']),
+                'date_posted': created.strftime('%m/%d/%Y'),
+                'status': normalize_azure_status(status),
+                'update_type': ", ".join(entry.get('tags') or []) or "N/A",
+                'product_list': ", ".join(entry.get('products') or []) or "N/A",
+                'categories': ", ".join(entry.get('productCategories') or []) or "N/A",
+            })
+        if len(entries) < ARCHIVE_PAGE_SIZE:
+            break
+        skip += ARCHIVE_PAGE_SIZE
+    return items
+
+ARCHIVE_LISTERS = {'AWS': list_aws_archive, 'Azure': list_azure_archive}
+
+def shard_ranges(from_date, to_date, shard_days=DEFAULT_SHARD_DAYS):
+    """Split the days from_date..to_date (both included) into [start, end) ranges of shard_days days, newest first"""
+    shards = []
+    end = datetime(to_date.year, to_date.month, to_date.day) + timedelta(days=1)
+    first = datetime(from_date.year, from_date.month, from_date.day)
+    while end > first:
+        start = max(first, end - timedelta(days=shard_days))
+        shards.append((start, end))
+        end = start
+    return shards
+
+class ShardCheckpoint:
+    """Scraped records of one shard in a JSON lines file, plus a .done marker once the shard is complete"""
+
+    def __init__(self, checkpoint_dir, provider, start, end):
+        self.provider = provider
+        self.start = start
+        self.end = end
+        self.name = f"{provider}-{start:%Y%m%d}-{end:%Y%m%d}"
+        self.path = os.path.join(checkpoint_dir, self.name + '.jsonl')
+        self.done_path = os.path.join(checkpoint_dir, self.name + '.done')
+        self._lock = threading.Lock()
+
+    @property
+    def done(self):
+        return os.path.exists(self.done_path)
+
+    def records(self):
+        """The records saved so far; a last line cut short by a crash is ignored"""
+        records = []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            pass
+        return records
+
+    def append(self, record):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock, open(self.path, 'a+b') as f:
+            # Start a new line after a line cut short by a crash, so only that line is lost
+            if f.tell():
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    line = "\n" + line
+            f.write(line.encode('utf-8'))
+
+    def mark_done(self):
+        open(self.done_path, 'w').close()
+
+def list_archive_items(providers, from_date, to_date, shard_days=DEFAULT_SHARD_DAYS, parallel_shards=4):
+    """List the archive items of from_date..to_date shard by shard, in parallel. Returns [(provider, items)], one per shard"""
+    shards = [(provider, start, end) for provider in providers for start, end in shard_ranges(from_date, to_date, shard_days)]
+    with ThreadPoolExecutor(max_workers=max(1, parallel_shards)) as executor:
+        listed = list(executor.map(lambda shard: (shard[0], ARCHIVE_LISTERS[shard[0]](shard[1], shard[2])), shards))
+    for provider, items in listed:
+        run_report.count(provider, 'archive_items', len(items))
+    return listed
+
+def run_shard(checkpoint, process_item, workers=1):
+    """List the items of a shard and scrape the ones not in its checkpoint yet. Returns the number of failed items"""
+    provider = checkpoint.provider
+    if checkpoint.done:
+        logger.info("Shard %s was finished by an earlier run, skipping it.", checkpoint.name)
+        return 0
+    scraped_urls = {record.get('url') for record in checkpoint.records()}
+    items = ARCHIVE_LISTERS[provider](checkpoint.start, checkpoint.end)
+    run_report.count(provider, 'archive_items', len(items))
+    pending = [item for item in items if item['url'] not in scraped_urls]
+    logger.info("Shard %s: %s items, %s left to scrape.", checkpoint.name, len(items), len(pending))
+
+    def scrape(item):
+        record = process_item(item)
+        if record:
+            checkpoint.append(record)
+        return record
+
+    if workers <= 1 or len(pending) < 2:
+        records = [scrape(item) for item in pending]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            records = list(executor.map(scrape, pending))
+    scraped = sum(1 for record in records if record)
+    run_report.count(provider, 'scraped_items', scraped)
+    failed = len(pending) - scraped
+    if failed:
+        logger.warning("Shard %s: %s items failed; run the backfill again to retry them.", checkpoint.name, failed)
+    else:
+        checkpoint.mark_done()
+    return failed
+
+def record_date(record):
+    """Posting date of a record, for sorting newest first"""
+    try:
+        return datetime.strptime(record.get('date_posted') or '', '%m/%d/%Y')
+    except ValueError:
+        return datetime.min
+
+def merge_checkpoints(checkpoints, excel_updater):
+    """Add the records of all shards to the workbook, each URL once. Returns {provider: row counts}"""
+    results = {}
+    for provider in dict.fromkeys(checkpoint.provider for checkpoint in checkpoints):
+        seen_urls = set()
+        records = []
+        for checkpoint in checkpoints:
+            if checkpoint.provider != provider:
+                continue
+            for record in checkpoint.records():
+                url = record.get('url')
+                if url in seen_urls:
+                    continue
+                seen_urls.add(url)
+                records.append(record)
+        records.sort(key=record_date, reverse=True)
+        with run_report.stage(provider, 'add_rows'):
+            counts = excel_updater.add_updates(records, upsert=True)
+        for key, value in counts.items():
+            run_report.count(provider, f'rows_{key}', value)
+        logger.info("%s backfill rows written: %s added, %s updated, %s skipped.",
+                    provider, counts['added'], counts['updated'], counts['skipped'])
+        results[provider] = counts
+    return results
+
+def run_backfill(excel_updater, process_items, from_date, to_date, checkpoint_dir,
+                 shard_days=DEFAULT_SHARD_DAYS, parallel_shards=4, workers=1):
+    """
+    Backfill the updates of from_date..to_date into the workbook.
+
+    Args:
+        excel_updater: ExcelUpdater the merged records are written to (the caller saves it)
+        process_items: {provider: function scraping one listed item, returning the record or None}
+        from_date, to_date: First and last day of the range (datetime)
+        checkpoint_dir: Directory of the shard checkpoints
+        shard_days: Days per shard
+        parallel_shards: Shards processed at the same time
+        workers: Update pages fetched in parallel within a shard
+
+    Returns:
+        The number of shards that are not complete yet
+    """
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    shards = shard_ranges(from_date, to_date, shard_days)
+    checkpoints = [ShardCheckpoint(checkpoint_dir, provider, start, end)
+                   for provider in process_items for start, end in shards]
+    logger.info("Backfilling %s to %s in %s shards of up to %s days, %s at a time (checkpoints in %s)",
+                from_date.strftime('%m/%d/%Y'), to_date.strftime('%m/%d/%Y'), len(checkpoints), shard_days,
+                parallel_shards, checkpoint_dir)
+
+    incomplete = 0
+    with ThreadPoolExecutor(max_workers=max(1, parallel_shards)) as executor:
+        futures = {executor.submit(run_shard, checkpoint, process_items[checkpoint.provider], workers): checkpoint
+                   for checkpoint in checkpoints}
+        for future, checkpoint in futures.items():
+            try:
+                if future.result():
+                    incomplete += 1
+            except Exception as e:
+                incomplete += 1
+                run_report.record_error(checkpoint.provider, e)
+                logger.error("Shard %s failed: %s", checkpoint.name, e)
+
+    merge_checkpoints(checkpoints, excel_updater)
+    if incomplete:
+        logger.warning("%s of %s shards are incomplete; run the same backfill again to finish them.",
+                       incomplete, len(checkpoints))
+    return incomplete
+
+if __name__ == '__main__':
+    # Offline check against the benchmark fixture server, which also serves archive listings.
+    # main.py imports this file as the module 'backfill', so the archive URLs are set there.
+    import sys
+    import tempfile
+    import benchmark
+    import backfill
+    import main as scraper_main
+    from openpyxl import load_workbook
+
+    server, base_url = benchmark.start_fixture_server()
+    backfill.AWS_ARCHIVE_URL = f"{base_url}/aws/archive"
+    backfill.AZURE_ARCHIVE_URL = f"{base_url}/azure/archive"
+    backfill.AZURE_UPDATE_URL = f"{base_url}/azure/update/{{id}}"
+    with tempfile.TemporaryDirectory() as workdir:
+        scraper_main.EXCEL_FILENAME = os.path.join(workdir, 'cloud_updates.xlsx')
+        for run in (1, 2):
+            print(f"--- Backfill run {run} ---")
+            sys.argv = ['main.py', '--backfill', '--from', '05/01/2025', '--to', '05/31/2025',
+                        '--shard-days', '7', '--workers', '2', '--quiet']
+            scraper_main.main()
+            sheet = load_workbook(scraper_main.EXCEL_FILENAME)['Updates']
+            urls = [row[0] for row in sheet.iter_rows(min_row=2, min_col=3, max_col=3, values_only=True)]
+            print(f"{len(urls)} rows, {len(set(urls))} distinct URLs, "
+                  f"{len(os.listdir(os.path.join(workdir, 'cloud_updates.backfill')))} checkpoint files")
+    server.shutdown()
@@ -0,0 +1,352 @@
+"""
+Offline benchmark for the cloud updates scraper.
+
+Serves generated AWS and Azure RSS feeds and update pages from a local HTTP server and
+runs main() against them at several feed sizes and worker counts. The update pages cover
+the layouts the scrapers handle: AWS pages with the postBody JSON and with the plain
+HTML fallback, and Azure pages whose __NEXT_DATA__ carries pageData, carries no pageData
+(metadata comes from the HTML) or is malformed.
+
+Every run is a separate process, so peak RSS and module state belong to that run alone.
+The report lists items/sec, p50/p95 per-item latency and peak RSS per run. Results are
+written to JSON; --baseline compares them with the results of an earlier version.
+
+Usage: python benchmark.py [--sizes 10 50 200] [--workers 1 4] [--latency-ms 25]
+                           [--output benchmark_results.json] [--baseline old_results.json]
+"""
+
+import os
+import sys
+import re
+import json
+import time
+import hashlib
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+try:
+    import resource  # Not available on Windows
+except ImportError:
+    resource = None
+
+AWS_PAGE_VARIANTS = ("postbody_json", "html_fallback")
+AZURE_PAGE_VARIANTS = ("next_data", "next_data_without_page_data", "next_data_malformed")
+AZURE_STATUSES = ("Launched", "In preview", "Retirement", "In development")
+FIXTURE_START_DATE = datetime(2025, 6, 30, 17, 0, tzinfo=timezone.utc)
+
+# --- Fixtures ---
+
+def _item_date(index):
+    return FIXTURE_START_DATE - timedelta(hours=6 * index)
+
+def _description(provider, index):
+    return "".join(f"<p>{provider} update {index} paragraph {paragraph}: the service now supports "
+                   f"<a href=\"/docs/{provider.lower()}/{index}/{paragraph}\">feature {paragraph}</a> in all regions.</p>"
+                   for paragraph in range(3))
+
+def aws_feed(base_url, size):
+    items = "".join(f"""
+    <item>
+      <title>Amazon EC2 now supports feature {index}</title>
+      <link>{base_url}/aws/update/{index}</link>
+      <pubDate>{format_datetime(_item_date(index), usegmt=True)}</pubDate>
+    </item>""" for index in range(size))
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Recent Announcements</title>{items}
+</channel></rss>"""
+
+def azure_feed(base_url, size):
+    items = "".join(f"""
+    <item>
+      <title>Azure Virtual Machines feature {index}</title>
+      <link>{base_url}/azure/update/{index}</link>
+      <pubDate>{format_datetime(_item_date(index), usegmt=True)}</pubDate>
+      <category>{AZURE_STATUSES[index % len(AZURE_STATUSES)]}</category>
+      <category>Features</category>
+      <category>Compute</category>
+      <category>Virtual Machines</category>
+    </item>""" for index in range(size))
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Azure updates</title>{items}
+</channel></rss>"""
+
+def aws_page(index):
+    variant = AWS_PAGE_VARIANTS[index % len(AWS_PAGE_VARIANTS)]
+    date = _item_date(index)
+    body = _description("AWS", index)
+    if variant == "postbody_json":
+        post = json.dumps({"data": {"items": [{"fields": {"postBody": body}}]}})
+        content = f'<time datetime="{date.isoformat()}"></time><script type="application/json">{post}</script>'
+    else:
+        content = f'<p class="wn-post-date">Posted On: {date.strftime("%B %d, %Y")}</p><div class="wn-body">{body}</div>'
+    return f"<html><head><title>AWS update {index}</title></head><body><main>{content}</main></body></html>"
+
+def azure_page(index):
+    variant = AZURE_PAGE_VARIANTS[index % len(AZURE_PAGE_VARIANTS)]
+    if variant == "next_data":
+        next_data = json.dumps({"props": {"pageProps": {"pageData": {
+            "status": AZURE_STATUSES[index % len(AZURE_STATUSES)], "updateType": "Features",
+            "services": ["Virtual Machines"], "categories": ["Compute"]}}}})
+    elif variant == "next_data_without_page_data":
+        next_data = json.dumps({"props": {"pageProps": {}}, "page": f"/updates/{index}"})
+    else:
+        next_data = '{"props": {"pageProps": '
+    metadata = ('<div class="row metadata-tags">'
+                '<div><h4>Status</h4></div><div><ul><li>Launched</li></ul></div>'
+                '<div><h4>Update type</h4></div><div><ul><li>Features</li></ul></div>'
+                '<div><h4>Products</h4></div><div><ul><li><a href="/products/vm">Virtual Machines</a></li></ul></div>'
+                '</div>')
+    return (f'<html><head><title>Azure update {index}</title></head><body>'
+            f'<script id="__NEXT_DATA__" type="application/json">{next_data}</script>'
+            f'<div class="html-content">{_description("Azure", index)}</div>{metadata}</body></html>')
+
+def _archive_dates(size):
+    return [(index, _item_date(index)) for index in range(size)]
+
+def aws_archive(query, size):
+    """A page of the AWS What's New directory search API over the first size fixture items"""
+    year = int(query['tags.id'][0].rsplit('#', 1)[-1])
+    page, page_size = int(query.get('page', ['0'])[0]), int(query.get('size', ['15'])[0])
+    matching = [(index, date) for index, date in _archive_dates(size) if date.year == year]
+    entries = [{"item": {"id": f"whats-new-{index}", "additionalFields": {
+        "headline": f"Amazon EC2 now supports feature {index}",
+        "headlineUrl": f"/aws/update/{index}",
+        "postDateTime": date.strftime('%Y-%m-%dT%H:%M:%SZ')}}}
+        for index, date in matching[page * page_size:(page + 1) * page_size]]
+    return json.dumps({"metadata": {"count": len(entries), "totalHits": len(matching)}, "items": entries})
+
+def azure_archive(query, size):
+    """A page of the Azure release communications API over the first size fixture items"""
+    bounds = re.findall(r"created (ge|lt) (\S+)", query.get('$filter', [''])[0])
+    limits = {operator: datetime.fromisoformat(value.replace('Z', '+00:00')) for operator, value in bounds}
+    top, skip = int(query.get('$top', ['12'])[0]), int(query.get('$skip', ['0'])[0])
+    matching = [(index, date) for index, date in _archive_dates(size)
+                if ('ge' not in limits or date >= limits['ge']) and ('lt' not in limits or date < limits['lt'])]
+    entries = [{"id": str(index), "title": f"Azure Virtual Machines feature {index}",
+                "status": AZURE_STATUSES[index % len(AZURE_STATUSES)], "tags": ["Features"],
+                "productCategories": ["Compute"], "products": ["Virtual Machines"],
+                "created": date.strftime('%Y-%m-%dT%H:%M:%S.0000000Z')}
+               for index, date in matching[skip:skip + top]]
+    return json.dumps({"@odata.count": len(matching), "value": entries})
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """
+    Serves /aws/feed, /azure/feed (?size=N) and /aws/update/<i>, /azure/update/<i>, with ETags,
+    and the archive listings /aws/archive and /azure/archive of the first archive_size items
+    """
+    latency = 0.0
+    archive_size = 400
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        parts = parsed.path.strip('/').split('/')
+        base_url = f"http://{self.headers['Host']}"
+        query = parse_qs(parsed.query)
+        try:
+            size = int(query.get('size', ['10'])[0])
+            if parts == ['aws', 'archive']:
+                body, content_type = aws_archive(query, self.archive_size), 'application/json'
+            elif parts == ['azure', 'archive']:
+                body, content_type = azure_archive(query, self.archive_size), 'application/json'
+            elif parts == ['aws', 'feed']:
+                body, content_type = aws_feed(base_url, size), 'application/rss+xml'
+            elif parts == ['azure', 'feed']:
+                body, content_type = azure_feed(base_url, size), 'application/rss+xml'
+            elif len(parts) == 3 and parts[:2] == ['aws', 'update']:
+                body, content_type = aws_page(int(parts[2])), 'text/html'
+            elif len(parts) == 3 and parts[:2] == ['azure', 'update']:
+                body, content_type = azure_page(int(parts[2])), 'text/html'
+            else:
+                self.send_error(404)
+                return
+        except (ValueError, KeyError):
+            self.send_error(400)
+            return
+        # Stand-in for the network round trip to the real sites
+        time.sleep(self.latency)
+        data = body.encode('utf-8')
+        etag = f'"{hashlib.sha1(data).hexdigest()[:16]}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_fixture_server(latency_ms=0):
+    """Start the fixture server on a free local port. Returns (server, base_url)"""
+    handler = type('Handler', (FixtureHandler,), {'latency': latency_ms / 1000.0})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+# --- Single run (child process) ---
+
+def percentile(values, percent):
+    """Nearest-rank percentile of a list of numbers, None for an empty list"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[int(rank) - 1]
+
+def peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def run_once(base_url, size, workers, workdir, quiet=True):
+    """Run main() against the fixture server and return the measurements"""
+    import main as scraper_main
+
+    scraper_main.AWS_RSS_URL = f"{base_url}/aws/feed?size={size}"
+    scraper_main.AZURE_RSS_URL = f"{base_url}/azure/feed?size={size}"
+    scraper_main.EXCEL_FILENAME = os.path.join(workdir, 'cloud_updates.xlsx')
+
+    latencies = {'AWS': [], 'Azure': []}
+    results = {'scraped': 0, 'failed': 0}
+    lock = threading.Lock()
+
+    def timed(provider, scrape):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            record = scrape(*args, **kwargs)
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies[provider].append(elapsed)
+                results['scraped' if record else 'failed'] += 1
+            return record
+        return wrapper
+
+    scraper_main.scrape_aws_update = timed('AWS', scraper_main.scrape_aws_update)
+    scraper_main.scrape_azure_update = timed('Azure', scraper_main.scrape_azure_update)
+    # Without --verbose nobody reads the scraper's log, so it should not pay for it either
+    sys.argv = ['main.py', '--workers', str(workers)] + (['--quiet'] if quiet else [])
+
+    start = time.perf_counter()
+    scraper_main.main()
+    seconds = time.perf_counter() - start
+
+    all_latencies = latencies['AWS'] + latencies['Azure']
+    items = len(all_latencies)
+    return {
+        'size': size,
+        'workers': workers,
+        'items': items,
+        'scraped': results['scraped'],
+        'failed': results['failed'],
+        'seconds': round(seconds, 3),
+        'items_per_sec': round(items / seconds, 2) if seconds else None,
+        'latency_p50_ms': round(percentile(all_latencies, 50) * 1000, 1) if items else None,
+        'latency_p95_ms': round(percentile(all_latencies, 95) * 1000, 1) if items else None,
+        'latency_by_provider_ms': {provider: {'p50': round(percentile(values, 50) * 1000, 1),
+                                              'p95': round(percentile(values, 95) * 1000, 1)}
+                                   for provider, values in latencies.items() if values},
+        'peak_rss_bytes': peak_rss_bytes(),
+    }
+
+# --- Benchmark driver ---
+
+def run_in_subprocess(base_url, size, workers, verbose=False):
+    with tempfile.TemporaryDirectory() as workdir:
+        result_path = os.path.join(workdir, 'result.json')
+        command = [sys.executable, os.path.abspath(__file__), '--run-one', '--base-url', base_url,
+                   '--size', str(size), '--workers', str(workers), '--workdir', workdir, '--result-file', result_path]
+        if verbose:
+            command.append('--verbose')
+        output = None if verbose else subprocess.DEVNULL
+        subprocess.run(command, check=True, stdout=output, stderr=output, cwd=os.path.dirname(os.path.abspath(__file__)))
+        with open(result_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+def print_results(runs):
+    print(f"\n{'Feed size':>9} {'Workers':>7} {'Items':>6} {'Failed':>6} {'Seconds':>8} {'Items/s':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'Peak RSS MB':>11}")
+    for run in runs:
+        rss = f"{run['peak_rss_bytes'] / (1024 * 1024):.1f}" if run['peak_rss_bytes'] else 'n/a'
+        print(f"{run['size']:>9} {run['workers']:>7} {run['items']:>6} {run['failed']:>6} {run['seconds']:>8.2f} "
+              f"{run['items_per_sec'] or 0:>8.1f} {run['latency_p50_ms'] or 0:>8.1f} {run['latency_p95_ms'] or 0:>8.1f} {rss:>11}")
+
+def compare_with_baseline(runs, baseline_path):
+    """Print the items/sec and p95 latency change of every run that also exists in the baseline file"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {(run['size'], run['workers']): run for run in json.load(f)['runs']}
+    print(f"\nCompared with {baseline_path}:")
+    for run in runs:
+        old = baseline.get((run['size'], run['workers']))
+        if not old or not old.get('items_per_sec') or not run.get('items_per_sec'):
+            continue
+        throughput = (run['items_per_sec'] / old['items_per_sec'] - 1) * 100
+        p95 = ((run['latency_p95_ms'] / old['latency_p95_ms'] - 1) * 100
+               if old.get('latency_p95_ms') and run.get('latency_p95_ms') else 0)
+        print(f"  size {run['size']:>5}, {run['workers']:>2} workers: items/sec {throughput:+.1f}%, p95 latency {p95:+.1f}%")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Offline benchmark for the cloud updates scraper')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 50, 200], help='Items per RSS feed (default: 10 50 200)')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4], help='Worker counts passed to main.py --workers (default: 1 4)')
+    parser.add_argument('--latency-ms', type=float, default=25, help='Simulated network latency per request (default: 25)')
+    parser.add_argument('--output', default='benchmark_results.json', help='JSON results file (default: benchmark_results.json)')
+    parser.add_argument('--baseline', help='Earlier results file to compare with')
+    parser.add_argument('--verbose', action='store_true', help="Show the scraper's own output")
+    # Internal: a single measured run, started by the driver in a fresh process
+    parser.add_argument('--run-one', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--base-url', help=argparse.SUPPRESS)
+    parser.add_argument('--size', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--workdir', help=argparse.SUPPRESS)
+    parser.add_argument('--result-file', help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if args.run_one:
+        result = run_once(args.base_url, args.size, args.workers[0], args.workdir, quiet=not args.verbose)
+        with open(args.result_file, 'w', encoding='utf-8') as f:
+            json.dump(result, f)
+        return
+
+    server, base_url = start_fixture_server(args.latency_ms)
+    print(f"Fixture server running at {base_url} ({args.latency_ms:g} ms latency per request)")
+    runs = []
+    try:
+        for size in args.sizes:
+            for workers in args.workers:
+                print(f"Running main() with {size} items per feed and {workers} workers...")
+                runs.append(run_in_subprocess(base_url, size, workers, args.verbose))
+    finally:
+        server.shutdown()
+
+    print_results(runs)
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'latency_ms': args.latency_ms,
+        'runs': runs,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to {args.output}")
+    if args.baseline:
+        compare_with_baseline(runs, args.baseline)
+
+if __name__ == '__main__':
+    main()
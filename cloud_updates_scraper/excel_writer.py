@@ -1,17 +1,50 @@
 import os
+import json
+import logging
+from datetime import datetime
 from openpyxl import Workbook, load_workbook
 from openpyxl.utils.exceptions import InvalidFileException
+import tracing
+
+logger = logging.getLogger(__name__)
+
+PARTITION_MODES = ("provider", "month", "provider_month")
 
 class ExcelUpdater:
-    def __init__(self, filename="cloud_updates.xlsx"):
+    def __init__(self, filename="cloud_updates.xlsx", partition_by=None, split_by_year=False):
+        """
+        Args:
+            filename: Excel file to create or update
+            partition_by: Optional sheet layout - "provider", "month" or "provider_month".
+                          None keeps everything in a single "Updates" sheet.
+            split_by_year: Write rows into one file per year (e.g. cloud_updates_2025.xlsx)
+        """
+        if partition_by is not None and partition_by not in PARTITION_MODES:
+            raise ValueError(f"Unknown partition_by '{partition_by}'. Expected one of: {', '.join(PARTITION_MODES)}")
         self.filename = filename
+        self.partition_by = partition_by
+        self.split_by_year = split_by_year
         self.workbook = None
         self.sheet = None
         self.headers = [
             "Provider", "Title", "URL", "Date Posted", "Description", "Links",
             "AWS Product", "Azure Products", "Azure Categories", "Azure Status", "Azure Update Type"
         ]
-        self._load_or_create_workbook()
+        self.url_index = {}  # URL -> row number, used by upsert_update
+        if self.is_partitioned:
+            self.manifest_path = os.path.splitext(filename)[0] + ".manifest.json"
+            self.partition_workbooks = {}  # file -> Workbook, loaded only when a row is routed to it
+            self.partitions = {}  # (file, sheet name) -> (sheet, url index, headers)
+            self.url_partitions = {}  # URL -> (file, sheet name) of its row, across all partitions
+            self.dirty_files = set()
+            self._load_manifest()
+        else:
+            self._load_or_create_workbook()
+            self._build_url_index()
+
+    @property
+    def is_partitioned(self):
+        return self.partition_by is not None or self.split_by_year
 
     def _load_or_create_workbook(self):
         if os.path.exists(self.filename):
@@ -24,16 +57,16 @@ class ExcelUpdater:
                         self.sheet = self.workbook.active
                         self.sheet.title = "Updates"
                     else: 
-                        print(f"Sheet 'Updates' not found in {self.filename}. Creating it.")
+                        logger.info("Sheet 'Updates' not found in %s. Creating it.", self.filename)
                         self.sheet = self.workbook.create_sheet("Updates")
                 
                 if self.sheet.max_row > 0:
                     current_headers = [cell.value for cell in self.sheet[1]]
                     if len(current_headers) > 3 and "Title" in current_headers : 
                         self.headers = current_headers
-                        print(f"Loaded existing workbook '{self.filename}' and sheet '{self.sheet.title}' with headers: {self.headers}")
+                        logger.info("Loaded existing workbook '%s' and sheet '%s' with headers: %s", self.filename, self.sheet.title, self.headers)
                     else: 
-                        print(f"Sheet '{self.sheet.title}' in '{self.filename}' has content but headers are missing/invalid. Appending standard headers.")
+                        logger.warning("Sheet '%s' in '%s' has content but headers are missing/invalid. Appending standard headers.", self.sheet.title, self.filename)
                         is_first_row_empty = True
                         if self.sheet.max_row >=1:
                             first_row_values = [cell.value for cell in self.sheet[1]]
@@ -42,18 +75,18 @@ class ExcelUpdater:
 
                         if self.sheet.max_row == 0 or is_first_row_empty:
                              self.sheet.append(self.headers)
-                             print("Appended headers to existing but empty/headerless sheet.")
+                             logger.info("Appended headers to existing but empty/headerless sheet.")
                         else:
-                            print(f"Warning: Sheet '{self.sheet.title}' has existing data but unrecognized headers. Standard headers will be used for mapping, but not re-written to avoid data loss.")
+                            logger.warning("Sheet '%s' has existing data but unrecognized headers. Standard headers will be used for mapping, but not re-written to avoid data loss.", self.sheet.title)
                 else: 
                     self.sheet.append(self.headers)
-                    print(f"Loaded existing workbook '{self.filename}'. Sheet '{self.sheet.title}' was empty. Added headers.")
+                    logger.info("Loaded existing workbook '%s'. Sheet '%s' was empty. Added headers.", self.filename, self.sheet.title)
 
             except InvalidFileException:
-                print(f"Error: File '{self.filename}' is not a valid Excel file or is corrupted. Creating a new workbook.")
+                logger.error("File '%s' is not a valid Excel file or is corrupted. Creating a new workbook.", self.filename)
                 self._create_new_workbook()
             except Exception as e:
-                print(f"An unexpected error occurred while loading workbook: {e}. Creating a new workbook.")
+                logger.error("An unexpected error occurred while loading workbook: %s. Creating a new workbook.", e)
                 self._create_new_workbook()
         else:
             self._create_new_workbook()
@@ -63,61 +96,317 @@ class ExcelUpdater:
         self.sheet = self.workbook.active
         self.sheet.title = "Updates"
         self.sheet.append(self.headers)
-        print(f"Created new workbook '{self.filename}' and sheet 'Updates' with headers.")
+        logger.info("Created new workbook '%s' and sheet 'Updates' with headers.", self.filename)
 
-    def add_update(self, data: dict):
-        if not self.sheet:
-            print("Error: Worksheet not initialized.")
+    def _build_url_index(self):
+        """Builds the URL -> row number index once so upserts don't rescan the sheet."""
+        self.url_index = self._index_urls(self.sheet, self.headers)
+
+    def _index_urls(self, sheet, headers) -> dict:
+        url_index = {}
+        if not sheet or "URL" not in headers:
+            return url_index
+        url_col = headers.index("URL") + 1
+        for row_num, (url,) in enumerate(sheet.iter_rows(min_row=2, min_col=url_col, max_col=url_col, values_only=True), 2):
+            if url and url != "N/A":
+                url_index.setdefault(url, row_num)  # keep the first row if the sheet already has duplicates
+        return url_index
+
+    def known_urls(self) -> set:
+        """The URLs that already have a row, in all partitions."""
+        if self.is_partitioned:
+            return set(self.url_partitions)
+        return set(self.url_index)
+
+    # --- Partitioned layout ---
+
+    def _load_manifest(self):
+        self.manifest = {"partition_by": self.partition_by, "split_by_year": self.split_by_year, "partitions": {}}
+        if not os.path.exists(self.manifest_path):
+            return
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                loaded = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Could not read partition manifest '%s': %s. Starting a new one.", self.manifest_path, e)
             return
+        if loaded.get("partition_by") != self.partition_by or loaded.get("split_by_year") != self.split_by_year:
+            logger.warning("Manifest '%s' was written with partition_by=%s, split_by_year=%s. New rows will use the requested layout.",
+                           self.manifest_path, loaded.get('partition_by'), loaded.get('split_by_year'))
+        self.manifest["partitions"] = loaded.get("partitions", {})
+        logger.info("Loaded partition manifest '%s' with %s file(s).", self.manifest_path, len(self.manifest['partitions']))
+        if "urls" in loaded:
+            self.url_partitions = {url: tuple(key) for url, key in loaded["urls"].items()}
+        else:
+            # Manifests written before the URL map: index every partition once
+            for filename, sheets in self.manifest["partitions"].items():
+                for sheet_name in sheets:
+                    if os.path.exists(filename):
+                        self._open_partition((filename, sheet_name))
 
-        row_to_add = []
-        for header in self.headers:
-            value = None
-            if header == "Provider": value = data.get('provider')
-            elif header == "Title": value = data.get('title')
-            elif header == "URL": value = data.get('url')
-            elif header == "Date Posted": value = data.get('date_posted')
-            elif header == "Description": value = data.get('description')
-            elif header == "Links": value = data.get('links')
-            elif header == "AWS Product": value = data.get('product') if data.get('provider') == 'AWS' else None
-            # Handle Azure metadata with priority from RSS feed if available
-            elif header == "Azure Products":
-                if data.get('provider') == 'Azure':
-                    # Use product_list from data, which is already processed to include RSS data
-                    value = data.get('product_list')
-                else:
-                    value = None
-            elif header == "Azure Categories":
-                if data.get('provider') == 'Azure':
-                    value = data.get('categories')
-                else:
-                    value = None
-            elif header == "Azure Status":
-                if data.get('provider') == 'Azure':
-                    value = data.get('status')
+    def _partition_for(self, data: dict) -> tuple:
+        """Returns the (file, sheet name) a row belongs to."""
+        provider = data.get('provider') or "Unknown"
+        try:
+            posted = datetime.strptime(data.get('date_posted') or "", '%m/%d/%Y')
+            year, month = posted.strftime('%Y'), posted.strftime('%Y-%m')
+        except ValueError:
+            year = month = "Undated"
+
+        filename = self.filename
+        if self.split_by_year:
+            base, ext = os.path.splitext(self.filename)
+            filename = f"{base}_{year}{ext}"
+
+        if self.partition_by == "provider": sheet_name = provider
+        elif self.partition_by == "month": sheet_name = month
+        elif self.partition_by == "provider_month": sheet_name = f"{provider} {month}"
+        else: sheet_name = "Updates"
+        # Excel sheet names are limited to 31 characters and can't contain []:*?/\
+        sheet_name = "".join("_" if c in '[]:*?/\\' else c for c in sheet_name)[:31]
+        return filename, sheet_name
+
+    def _get_partition_workbook(self, filename):
+        if filename in self.partition_workbooks:
+            return self.partition_workbooks[filename]
+        workbook = None
+        if os.path.exists(filename):
+            try:
+                workbook = load_workbook(filename)
+                logger.info("Loaded partition workbook '%s'.", filename)
+            except Exception as e:
+                logger.error("Could not load partition workbook '%s': %s. Creating a new workbook.", filename, e)
+        if workbook is None:
+            workbook = Workbook()
+            workbook.remove(workbook.active)  # Sheets are created per partition
+            logger.info("Created new partition workbook '%s'.", filename)
+        self.partition_workbooks[filename] = workbook
+        return workbook
+
+    def _open_partition(self, key: tuple) -> tuple:
+        """Returns the (sheet, url index, headers) of a partition, keeping the headers an existing sheet has."""
+        if key not in self.partitions:
+            filename, sheet_name = key
+            workbook = self._get_partition_workbook(filename)
+            headers = self.headers
+            if sheet_name in workbook.sheetnames:
+                sheet = workbook[sheet_name]
+                current_headers = [cell.value for cell in sheet[1]]
+                if len(current_headers) > 3 and "Title" in current_headers:
+                    headers = current_headers
+                elif not any(current_headers) and sheet.max_row <= 1:
+                    sheet.append(self.headers)
                 else:
-                    value = None
-            elif header == "Azure Update Type":
-                if data.get('provider') == 'Azure':
-                    value = data.get('update_type')
+                    logger.warning("Partition sheet '%s' in '%s' has unrecognized headers. Standard headers will be used for mapping.", sheet_name, filename)
+            else:
+                sheet = workbook.create_sheet(sheet_name)
+                sheet.append(self.headers)
+            url_index = self._index_urls(sheet, headers)
+            for url in url_index:
+                self.url_partitions.setdefault(url, key)
+            self.partitions[key] = (sheet, url_index, headers)
+        return self.partitions[key]
+
+    def _get_partition(self, key: tuple) -> tuple:
+        self.dirty_files.add(key[0])
+        return self._open_partition(key)
+
+    def _remove_from_other_partition(self, url, key: tuple) -> bool:
+        """
+        Deletes the row of a URL that is in another partition than key, e.g. after a corrected
+        date moved it to another month. Returns True if a row was removed.
+        """
+        old_key = self.url_partitions.get(url)
+        if old_key is None or old_key == key:
+            return False
+        # Open the old partition first: opening it indexes its URLs, this one included
+        sheet, url_index, _ = self._open_partition(old_key)
+        del self.url_partitions[url]
+        row_num = url_index.pop(url, None)
+        if row_num is None:
+            return False
+        sheet.delete_rows(row_num)
+        for other_url, other_row in url_index.items():
+            if other_row > row_num:
+                url_index[other_url] = other_row - 1
+        self.dirty_files.add(old_key[0])
+        return True
+
+    def _target(self, data: dict) -> tuple:
+        """Returns the (sheet, url index, headers) a row should be written to."""
+        if self.is_partitioned:
+            return self._get_partition(self._partition_for(data))
+        return self.sheet, self.url_index, self.headers
+
+    def _row_mappers(self, headers=None) -> list:
+        """
+        Returns one value getter per header. The header -> field mapping is resolved once per
+        header layout instead of walking the header checks for every row.
+        """
+        headers = headers or self.headers
+        headers_key = tuple(headers)
+        self._mappers = getattr(self, '_mappers', {})
+        if headers_key in self._mappers:
+            return self._mappers[headers_key]
+
+        def field(key):
+            return lambda data: data.get(key)
+
+        def provider_field(provider, key):
+            return lambda data: data.get(key) if data.get('provider') == provider else None
+
+        field_map = {
+            "Provider": field('provider'),
+            "Title": field('title'),
+            "URL": field('url'),
+            "Date Posted": field('date_posted'),
+            "Description": field('description'),
+            "Links": field('links'),
+            "AWS Product": provider_field('AWS', 'product'),
+            # Azure metadata is already merged with the RSS feed values by the scraper
+            "Azure Products": provider_field('Azure', 'product_list'),
+            "Azure Categories": provider_field('Azure', 'categories'),
+            "Azure Status": provider_field('Azure', 'status'),
+            "Azure Update Type": provider_field('Azure', 'update_type'),
+        }
+        self._mappers[headers_key] = [field_map.get(header) or field(header) for header in headers]
+        return self._mappers[headers_key]
+
+    def _build_row(self, data: dict, headers=None) -> list:
+        row_to_add = []
+        for mapper in self._row_mappers(headers):
+            value = mapper(data)
+            row_to_add.append(value if value is not None else "")
+        return row_to_add
+
+    def add_update(self, data: dict):
+        with tracing.span('ExcelUpdater.add_update', data.get('url')) as span:
+            sheet, url_index, headers = self._target(data)
+            if not sheet:
+                span.set_attribute(tracing.OUTCOME_ATTRIBUTE, 'no_sheet')
+                logger.error("Worksheet not initialized.")
+                return
+
+            sheet.append(self._build_row(data, headers))
+            span.set_attribute(tracing.OUTCOME_ATTRIBUTE, 'added')
+            url = data.get('url')
+            if url and url != "N/A":
+                url_index.setdefault(url, sheet.max_row)
+                if self.is_partitioned:
+                    self.url_partitions.setdefault(url, self._partition_for(data))
+
+    def upsert_update(self, data: dict) -> bool:
+        """
+        Updates the row with the same URL in place, or appends a new row if the URL is not present.
+        In a partitioned layout a row whose partition changed is moved to the new partition.
+
+        Returns:
+            True if an existing row was updated, False if a new row was appended
+        """
+        return self.add_updates([data], upsert=True)['updated'] > 0
+
+    def add_updates(self, records, upsert: bool = False) -> dict:
+        """
+        Adds a batch (or any iterable/generator) of update records in a single pass.
+
+        Records that are not dicts or have no URL and no title are skipped.
+
+        Args:
+            records: Iterable of update dicts, as passed to add_update
+            upsert: Update rows with a matching URL in place instead of appending
+
+        Returns:
+            dict with 'added', 'updated' and 'skipped' counts
+        """
+        counts = {'added': 0, 'updated': 0, 'skipped': 0}
+        current_sheet, current_index, current_headers, key = None, None, None, None
+        for data in records:
+            if not isinstance(data, dict) or not (data.get('url') or data.get('title')):
+                counts['skipped'] += 1
+                continue
+            url = data.get('url')
+            has_url = url and url != "N/A"
+            moved = False
+            if self.is_partitioned:
+                key = self._partition_for(data)
+                if upsert and has_url:
+                    moved = self._remove_from_other_partition(url, key)
+                current_sheet, current_index, current_headers = self._get_partition(key)
+            elif current_sheet is None:
+                current_sheet, current_index, current_headers = self._target(data)
+                if not current_sheet:
+                    logger.error("Worksheet not initialized.")
+                    return counts
+            mappers = self._row_mappers(current_headers)
+
+            # One span per row, named like the single-row method it stands for
+            with tracing.span('ExcelUpdater.add_update', url) as span:
+                row = [value if value is not None else "" for value in (mapper(data) for mapper in mappers)]
+                row_num = current_index.get(url) if upsert and has_url else None
+                if row_num is not None:
+                    for col_idx, value in enumerate(row, 1):
+                        current_sheet.cell(row=row_num, column=col_idx, value=value)
+                    counts['updated'] += 1
+                    span.set_attribute(tracing.OUTCOME_ATTRIBUTE, 'updated')
                 else:
-                    value = None
-            else: 
-                value = data.get(header) 
-            row_to_add.append(value if value is not None else "") 
-        self.sheet.append(row_to_add)
+                    current_sheet.append(row)
+                    if has_url:
+                        current_index.setdefault(url, current_sheet.max_row)
+                        if key and (upsert or url not in self.url_partitions):
+                            self.url_partitions[url] = key
+                    # A row moved to another partition is still an update of the record
+                    counts['updated' if moved else 'added'] += 1
+                    span.set_attribute(tracing.OUTCOME_ATTRIBUTE, 'updated' if moved else 'added')
+        return counts
 
-    def save_workbook(self):
+    def save_workbook(self) -> bool:
+        """Saves the workbook (or the modified partitions). Returns False if anything could not be saved."""
+        if self.is_partitioned:
+            return self._save_partitions()
         if not self.workbook:
-            print("Error: Workbook not initialized.")
-            return
+            logger.error("Workbook not initialized.")
+            return False
         try:
             self.workbook.save(self.filename)
-            print(f"Workbook saved to {self.filename}")
+            logger.info("Workbook saved to %s", self.filename)
+            return True
         except Exception as e:
-            print(f"Error saving workbook: {e}")
+            logger.error("Error saving workbook: %s", e)
+            return False
+
+    def _save_partitions(self):
+        """Saves only the partition files that received rows in this run, then updates the manifest."""
+        if not self.dirty_files:
+            logger.info("No partitions were modified; nothing to save.")
+            return True
+        failed = set()
+        for filename in sorted(self.dirty_files):
+            workbook = self.partition_workbooks[filename]
+            try:
+                workbook.save(filename)
+                logger.info("Partition workbook saved to %s", filename)
+            except Exception as e:
+                logger.error("Error saving partition workbook %s: %s", filename, e)
+                failed.add(filename)
+                continue
+            self.manifest["partitions"][filename] = {sheet.title: sheet.max_row - 1 for sheet in workbook.worksheets}
+        # Files that could not be saved are tried again by the next save
+        self.dirty_files = failed
+
+        self.manifest["partition_by"] = self.partition_by
+        self.manifest["split_by_year"] = self.split_by_year
+        self.manifest["urls"] = {url: list(key) for url, key in self.url_partitions.items()}
+        self.manifest["updated"] = datetime.now().isoformat(timespec='seconds')
+        try:
+            with open(self.manifest_path, 'w', encoding='utf-8') as f:
+                json.dump(self.manifest, f, indent=2, sort_keys=True)
+        except OSError as e:
+            logger.error("Error writing partition manifest %s: %s", self.manifest_path, e)
+            return False
+        return not failed
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
     TEST_FILENAME = "test_cloud_updates.xlsx"
     if os.path.exists(TEST_FILENAME):
         os.remove(TEST_FILENAME)
@@ -193,6 +482,43 @@ if __name__ == '__main__':
         except Exception as e:
             print(f"File '{CORRUPTED_FILENAME}' is still corrupted or not a valid Excel file: {e}")
 
-    print(f"\nNote: Test files '{TEST_FILENAME}' and '{CORRUPTED_FILENAME}' were created/updated.")
+    print("\n--- Test 5: Upserting an existing URL updates the row in place ---")
+    writer_upsert = ExcelUpdater(TEST_FILENAME)
+    rows_before = writer_upsert.sheet.max_row
+    corrected_aws_data = dict(aws_sample_data, title='AWS Test Update 1 (corrected)')
+    updated = writer_upsert.upsert_update(corrected_aws_data)
+    print(f"Updated in place: {updated}, rows before: {rows_before}, rows after: {writer_upsert.sheet.max_row}")
+    print(f"Row {writer_upsert.url_index[aws_sample_data['url']]} title: {writer_upsert.sheet.cell(row=writer_upsert.url_index[aws_sample_data['url']], column=writer_upsert.headers.index('Title') + 1).value}")
+    writer_upsert.save_workbook()
+
+    print("\n--- Test 6: Adding a batch of updates in one call ---")
+    writer_batch = ExcelUpdater(TEST_FILENAME)
+    batch = [
+        {'provider': 'AWS', 'title': f'AWS Batch Update {n}', 'url': f'http://aws.example.com/batch/{n}',
+         'date_posted': '06/14/2024', 'description': 'Batch', 'links': '', 'product': 'EC2'}
+        for n in range(3)
+    ] + [corrected_aws_data, {'title': None}]
+    print(f"Batch result: {writer_batch.add_updates(batch, upsert=True)}")
+    writer_batch.save_workbook()
+
+    print("\n--- Test 7: A re-dated row moves between month partitions over three runs ---")
+    PARTITIONED_FILENAME = "test_partitioned_updates.xlsx"
+    partitioned_files = [PARTITIONED_FILENAME, os.path.splitext(PARTITIONED_FILENAME)[0] + ".manifest.json"]
+    for path in partitioned_files:
+        if os.path.exists(path):
+            os.remove(path)
+    moving = {'provider': 'AWS', 'title': 'Moving Update', 'url': 'http://aws.example.com/moving', 'date_posted': '05/20/2025'}
+    staying = {'provider': 'AWS', 'title': 'June Update', 'url': 'http://aws.example.com/june', 'date_posted': '06/02/2025'}
+    for run, records in enumerate([[moving, staying], [dict(moving, date_posted='06/01/2025')],
+                                   [dict(moving, date_posted='05/21/2025')]], 1):
+        writer_partitioned = ExcelUpdater(PARTITIONED_FILENAME, partition_by="month")
+        result = writer_partitioned.add_updates(records, upsert=True)
+        writer_partitioned.save_workbook()
+        sheets = load_workbook(PARTITIONED_FILENAME)
+        rows = {sheet.title: [row[2] for row in sheet.iter_rows(min_row=2, values_only=True)] for sheet in sheets}
+        print(f"Run {run}: {result}, sheets: {rows}")
+    partitioned_files.append(PARTITIONED_FILENAME)
+
+    print(f"\nNote: Test files '{TEST_FILENAME}', '{CORRUPTED_FILENAME}' and {', '.join(partitioned_files[:-1])} were created/updated.")
     print("Please inspect them manually if needed. Uncomment cleanup lines to auto-delete.")
 # Removed the erroneous ``` line that was here
@@ -4,8 +4,11 @@ This is an optional module that can be used by the main scraper.py to handle
 pages that load content dynamically through JavaScript.
 """
 import time
+import logging
 import importlib.util
 
+logger = logging.getLogger(__name__)
+
 # Check if required packages are available
 SELENIUM_AVAILABLE = importlib.util.find_spec("selenium") is not None
 WEBDRIVER_MGR_AVAILABLE = importlib.util.find_spec("webdriver_manager") is not None
@@ -27,8 +30,8 @@ def fetch_page_with_javascript(url, wait_for_selector=None, wait_time=10, user_a
         HTML content of the page after JavaScript execution or None if Selenium is not available
     """
     if not SELENIUM_AVAILABLE:
-        print("WARNING: Selenium is not installed. Cannot execute JavaScript.")
-        print("To install required packages, run: pip install selenium webdriver-manager")
+        logger.warning("Selenium is not installed. Cannot execute JavaScript. "
+                       "To install required packages, run: pip install selenium webdriver-manager")
         return None
     
     try:
@@ -59,10 +62,10 @@ def fetch_page_with_javascript(url, wait_for_selector=None, wait_time=10, user_a
                 driver = webdriver.Chrome(options=chrome_options)
                 
             if not driver:
-                print("Failed to initialize Chrome WebDriver")
+                logger.error("Failed to initialize Chrome WebDriver")
                 return None
                 
-            print(f"Fetching page with JavaScript: {url}")
+            logger.debug("Fetching page with JavaScript: %s", url)
             driver.get(url)
             
             if wait_for_selector:
@@ -70,12 +73,12 @@ def fetch_page_with_javascript(url, wait_for_selector=None, wait_time=10, user_a
                     WebDriverWait(driver, wait_time).until(
                         EC.presence_of_element_located((By.CSS_SELECTOR, wait_for_selector))
                     )
-                    print(f"Found element matching selector: {wait_for_selector}")
+                    logger.debug("Found element matching selector: %s", wait_for_selector)
                 except TimeoutException:
-                    print(f"Timeout waiting for element with selector: {wait_for_selector}")
+                    logger.warning("Timeout waiting for element with selector: %s", wait_for_selector)
             else:
                 # Wait for the page to load completely
-                print(f"Waiting {wait_time} seconds for page to load...")
+                logger.debug("Waiting %s seconds for page to load...", wait_time)
                 time.sleep(wait_time)
                 
             page_source = driver.page_source
@@ -84,11 +87,12 @@ def fetch_page_with_javascript(url, wait_for_selector=None, wait_time=10, user_a
             if driver:
                 driver.quit()
     except Exception as e:
-        print(f"Error fetching page with JavaScript: {e}")
+        logger.error("Error fetching page with JavaScript: %s", e)
         return None
 
 if __name__ == "__main__":
     # Example usage
+    logging.basicConfig(level=logging.DEBUG, format='%(levelname)s: %(message)s')
     test_url = "https://azure.microsoft.com/en-us/updates?id=495755"
     html = fetch_page_with_javascript(
         test_url,
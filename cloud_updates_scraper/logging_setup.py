@@ -0,0 +1,131 @@
+"""
+Logging configuration for pdf2excel and the cloud updates scraper.
+
+Twin file: pdftoExcel/logging_setup.py and cloud_updates_scraper/logging_setup.py are kept
+byte-identical, because each tool runs standalone from its own directory. Change both.
+
+configure_logging() installs a QueueHandler on the root logger: the worker threads only
+put records on a queue, and a single QueueListener thread formats them and writes them to
+the stream. Workers never contend on the stream, and records below the level are dropped
+before their message is formatted, so --quiet does no per-page or per-item formatting
+work (all log calls pass their arguments lazily, logger.info("... %s", value)).
+
+The scraper writes timestamped log lines to stderr. pdf2excel passes plain=True: the
+bare message on stdout, the output it always had. With json_format every record is
+written as one JSON object per line, with the time, level, logger, message, the
+exception if any and the fields given in extra={...}.
+
+Batch worker processes get a plain StreamHandler instead (use_queue=False): a forked
+worker inherits the queue but not the listener thread that empties it.
+"""
+
+import sys
+import copy
+import json
+import atexit
+import logging
+import logging.handlers
+import queue
+from datetime import datetime, timezone
+
+LOG_LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR')
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+PLAIN_FORMAT = '%(message)s'
+
+# Attributes every LogRecord has; anything else on a record came from extra={...}
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+_listener = None
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage().strip(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value if isinstance(value, (str, int, float, bool, type(None))) else str(value)
+        return json.dumps(entry, ensure_ascii=False)
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Merges the arguments into the message but leaves the formatting to the listener"""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+def stop_logging():
+    """Write the queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def flush_logging():
+    """Write the queued records now, e.g. before printing a report to the same stream"""
+    if _listener is not None:
+        _listener.stop()
+        _listener.start()
+
+def configure_logging(level='INFO', json_format=False, stream=None, use_queue=True, plain=False):
+    """
+    Route all logging through a queue to one writer thread.
+
+    Args:
+        level: Name of the lowest level written, e.g. 'INFO'
+        json_format: Write JSON lines instead of text
+        stream: Output stream (default: sys.stdout if plain, otherwise sys.stderr)
+        use_queue: False writes directly from the logging thread (batch worker processes)
+        plain: Write the bare message instead of timestamped log lines
+    """
+    global _listener
+    stop_logging()
+    output = logging.StreamHandler(stream or (sys.stdout if plain else sys.stderr))
+    if json_format:
+        output.setFormatter(JsonFormatter())
+    elif plain:
+        output.setFormatter(logging.Formatter(PLAIN_FORMAT))
+    else:
+        output.setFormatter(logging.Formatter(TEXT_FORMAT, DATE_FORMAT))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.setLevel(level)
+    if not use_queue:
+        root.addHandler(output)
+        return
+    log_queue = queue.SimpleQueue()
+    root.addHandler(_QueueHandler(log_queue))
+    _listener = logging.handlers.QueueListener(log_queue, output)
+    _listener.start()
+
+def add_logging_arguments(parser):
+    parser.add_argument('--log-level', choices=LOG_LEVELS, default='INFO',
+                        help='Lowest level of the messages shown; DEBUG lists every item (default: INFO)')
+    parser.add_argument('--quiet', action='store_true', help='Only show warnings and errors (same as --log-level WARNING)')
+    parser.add_argument('--log-json', action='store_true', help='Write the messages as JSON lines')
+
+def settings_from_args(args):
+    """(level, json_format) of the logging options, e.g. for the batch worker processes"""
+    return ('WARNING' if args.quiet else args.log_level), args.log_json
+
+def configure_from_args(args, plain=False):
+    configure_logging(*settings_from_args(args), plain=plain)
+
+atexit.register(stop_logging)
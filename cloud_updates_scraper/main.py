@@ -1,6 +1,9 @@
+import os
 import logging
 import argparse
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 from scraper import (
@@ -8,9 +11,17 @@ from scraper import (
     parse_aws_rss,
     parse_azure_rss,
     scrape_aws_update,
-    scrape_azure_update
+    scrape_azure_update,
+    keep_browsers_open
 )
-from excel_writer import ExcelUpdater
+from excel_writer import ExcelUpdater, PARTITION_MODES
+import run_report
+import profiling
+import backfill
+import workqueue
+import tracing
+import logging_setup
+from metrics import ScraperMetrics
 
 # Constants
 AWS_RSS_URL = "https://aws.amazon.com/about-aws/whats-new/recent/feed/"
@@ -18,13 +29,6 @@ AZURE_RSS_URL = "https://www.microsoft.com/releasecommunications/api/v2/azure/rs
 EXCEL_FILENAME = "cloud_updates.xlsx"
 TEST_LIMIT = 3  # Number of items to process in test mode
 
-# Basic Logging Setup
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
-
-# Enable debug logging if needed
-# Uncomment the next line to see more detailed logs
-# logging.getLogger().setLevel(logging.DEBUG)
-
 def parse_date_arg(date_str):
     """Parse a date string in MM/DD/YYYY format to a datetime object."""
     if not date_str:
@@ -32,7 +36,7 @@ def parse_date_arg(date_str):
     try:
         return datetime.strptime(date_str, '%m/%d/%Y')
     except ValueError:
-        logging.error(f"Invalid date format: {date_str}. Expected MM/DD/YYYY.")
+        logging.error("Invalid date format: %s. Expected MM/DD/YYYY.", date_str)
         sys.exit(1)
 
 def is_date_in_range(date_str, from_date=None, to_date=None):
@@ -56,38 +60,390 @@ def is_date_in_range(date_str, from_date=None, to_date=None):
         if from_date:
             in_range = in_range and date_obj >= from_date
             if not in_range:
-                logging.debug(f"Date {date_str} is before from_date {from_date.strftime('%m/%d/%Y')}")
+                logging.debug("Date %s is before from_date %s", date_str, from_date)
         
         if to_date:
             compare_result = date_obj <= to_date
             in_range = in_range and compare_result
             if not compare_result:
-                logging.debug(f"Date {date_str} is after to_date {to_date.strftime('%m/%d/%Y')}")
+                logging.debug("Date %s is after to_date %s", date_str, to_date)
             
         return in_range
     except ValueError:
         # If we can't parse the date, better to include it than filter it out
-        logging.warning(f"Could not parse date for filtering: {date_str}")
+        logging.warning("Could not parse date for filtering: %s", date_str)
         return True
 
+def select_items(items, provider, test_mode=False, from_date=None, to_date=None):
+    """Apply the test mode limit and the date range filter to the RSS items of a provider."""
+    selected = []
+    for i, item in enumerate(items):
+        # Apply item limit only in test mode
+        if test_mode and i >= TEST_LIMIT:
+            logging.info("%s: Reached test mode limit (%s), stopping %s processing.", provider, TEST_LIMIT, provider)
+            break
+        # Check if date is in the specified range
+        if not is_date_in_range(item['date_posted'], from_date, to_date):
+            logging.info("Skipping %s item from %s: outside of requested date range", provider, item['date_posted'])
+            continue
+        selected.append(item)
+    return selected
+
+def process_aws_item(item):
+    """Scrape the detail page of one AWS RSS item. Returns the record or None."""
+    log_fields = {'provider': 'AWS', 'url': item.get('url')}
+    logging.info("Processing AWS item from %s: %s - URL: %s", item['date_posted'], item.get('title', 'N/A'), item.get('url', 'N/A'),
+                 extra=log_fields)
+    start = time.perf_counter()
+    errors_before = run_report.errors_recorded()
+    scraped_data = None
+    try:
+        scraped_data = scrape_aws_update(item['url'], item['title'], item['date_posted'])
+        if scraped_data:
+            scraped_data['provider'] = 'AWS'
+            logging.info("Successfully scraped AWS item: %s", item.get('title'), extra=log_fields)
+        else:
+            if run_report.errors_recorded() == errors_before: # the scraper records its own fetch errors
+                run_report.record_error('AWS', 'NoData')
+            logging.warning("Scraping returned None for AWS item: %s", item.get('url'), extra=log_fields)
+    except Exception as e:
+        run_report.record_error('AWS', e)
+        logging.error("Error scraping AWS item %s: %s", item.get('url'), e, exc_info=False, extra=log_fields) # exc_info=False to keep log cleaner
+    run_report.record_item('AWS', item.get('url'), time.perf_counter() - start, bool(scraped_data))
+    return scraped_data
+
+def process_azure_item(item):
+    """Scrape the detail page of one Azure RSS item. Returns the record or None."""
+    log_fields = {'provider': 'Azure', 'url': item.get('url')}
+    logging.info("Processing Azure item from %s: %s - URL: %s", item['date_posted'], item.get('title', 'N/A'), item.get('url', 'N/A'),
+                 extra=log_fields)
+    start = time.perf_counter()
+    errors_before = run_report.errors_recorded()
+    scraped_data = None
+    try:
+        # Extract RSS metadata for the Azure item
+        metadata = {
+            'status': item.get('status'),
+            'update_type': item.get('update_type'),
+            'product_list': item.get('product_list'),
+            'categories': item.get('categories')
+        }
+        logging.debug("RSS metadata: Status='%s', Type='%s', Products='%s'", metadata['status'], metadata['update_type'], metadata['product_list'])
+        
+        # Pass the metadata to the scraper function
+        scraped_data = scrape_azure_update(item['url'], item['title'], item['date_posted'], metadata)
+        if scraped_data:
+            scraped_data['provider'] = 'Azure'
+            logging.info("Successfully scraped Azure item: %s", item.get('title'), extra=log_fields)
+        else:
+            if run_report.errors_recorded() == errors_before: # the scraper records its own fetch errors
+                run_report.record_error('Azure', 'NoData')
+            logging.warning("Scraping returned None for Azure item: %s", item.get('url'), extra=log_fields)
+    except Exception as e:
+        run_report.record_error('Azure', e)
+        logging.error("Error scraping Azure item %s: %s", item.get('url'), e, exc_info=False, extra=log_fields)
+    run_report.record_item('Azure', item.get('url'), time.perf_counter() - start, bool(scraped_data))
+    return scraped_data
+
+def scrape_items(items, process_item, workers=1):
+    """
+    Run process_item for every item, on up to `workers` threads (the detail page
+    fetches are network bound). Returns the non-empty records in feed order.
+    """
+    if workers <= 1 or len(items) < 2:
+        records = [process_item(item) for item in items]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            records = list(executor.map(process_item, items))
+    return [record for record in records if record]
+
+def registered_feeds():
+    """(provider, RSS URL, feed parser, item processor) of every feed the scraper reads."""
+    return [
+        ('AWS', AWS_RSS_URL, parse_aws_rss, process_aws_item),
+        ('Azure', AZURE_RSS_URL, parse_azure_rss, process_azure_item),
+    ]
+
+def process_feed(feed, excel_updater, args, from_date=None, to_date=None, seen_urls=None, retry_items=None):
+    """
+    Fetch one registered feed, scrape its selected items and add them to the workbook.
+    
+    With seen_urls (watch mode) the feed is fetched with a conditional request, items whose URL
+    is in seen_urls are left out, and the URLs of the items handled are added to it. Items
+    that failed to scrape stay out of it and are kept in retry_items (URL -> (item, attempts)),
+    which are tried again on the next poll even when the feed did not change, until they have
+    failed args.max_attempts times.
+    
+    Returns the row counts of add_updates, or None if the feed could not be fetched or did not
+    change and there was nothing to retry.
+    """
+    provider, rss_url, parse_feed, process_item = feed
+    watching = seen_urls is not None
+    if watching and retry_items is None:
+        retry_items = {}
+    if not watching:
+        logging.info("Starting %s updates processing...", provider)
+    try:
+        with profiling.stage('rss'):
+            feed_content = fetch_rss_feed(rss_url, provider=provider, conditional=watching)
+        if watching and feed_content is None:
+            logging.debug("%s RSS feed not modified.", provider)
+            if not retry_items:
+                return None
+            items = []
+        elif not feed_content:
+            logging.warning("Could not fetch %s RSS feed content.", provider)
+            return None
+        else:
+            with run_report.stage(provider, 'rss_extract'), profiling.stage('rss'):
+                items = parse_feed(feed_content)
+            logging.info("Found %s %s items in the RSS feed.", len(items), provider)
+        rss_item_count = len(items)
+        run_report.count(provider, 'rss_items', rss_item_count)
+        if watching:
+            items = [item for item in items if item['url'] not in seen_urls]
+            new_urls = {item['url'] for item in items}
+            retries = [item for url, (item, _) in retry_items.items() if url not in new_urls and url not in seen_urls]
+            logging.info("%s of the %s items are new, %s failed before and are retried.", len(items), provider, len(retries))
+            items += retries
+            rss_item_count += len(retries)
+        new_items = items
+        items = select_items(items, provider, args.test, from_date, to_date)
+        with profiling.stage('scrape'):
+            records = scrape_items(items, process_item, args.workers)
+        with run_report.stage(provider, 'add_rows'), profiling.stage('add_rows'):
+            counts = excel_updater.add_updates(records, upsert=True)
+        run_report.count(provider, 'selected_items', len(items))
+        run_report.count(provider, 'skipped_items', rss_item_count - len(items))
+        run_report.count(provider, 'scraped_items', len(records))
+        for key, value in counts.items():
+            run_report.count(provider, f'rows_{key}', value)
+        logging.info("%s rows written: %s added, %s updated, %s skipped.", provider, counts['added'], counts['updated'], counts['skipped'])
+        if watching:
+            selected = {item['url'] for item in items}
+            seen_urls.update(item['url'] for item in new_items if item['url'] not in selected)
+            seen_urls.update(record['url'] for record in records)
+            attempts = {url: tries for url, (_, tries) in retry_items.items()}
+            retry_items.clear()
+            for item in items:
+                url = item['url']
+                if url in seen_urls:
+                    continue
+                tries = attempts.get(url, 0) + 1
+                if tries >= args.max_attempts:
+                    logging.warning("Giving up on %s item %s after %s failed attempts.", provider, url, tries,
+                                    extra={'provider': provider, 'url': url})
+                    seen_urls.add(url)
+                else:
+                    retry_items[url] = (item, tries)
+        return counts
+    except Exception as e:
+        run_report.record_error(provider, e)
+        logging.error("An error occurred during %s RSS feed processing: %s", provider, e, exc_info=False)
+        return None
+
+def list_feed_items(args, from_date=None, to_date=None):
+    """Fetch and parse the registered feeds and select their items, for the work queue. Returns [(provider, items)]"""
+    batches = []
+    for provider, rss_url, parse_feed, _ in registered_feeds():
+        try:
+            with profiling.stage('rss'):
+                feed_content = fetch_rss_feed(rss_url, provider=provider)
+            if not feed_content:
+                logging.warning("Could not fetch %s RSS feed content.", provider)
+                continue
+            with run_report.stage(provider, 'rss_extract'), profiling.stage('rss'):
+                items = parse_feed(feed_content)
+        except Exception as e:
+            run_report.record_error(provider, e)
+            logging.error("An error occurred during %s RSS feed processing: %s", provider, e, exc_info=False)
+            continue
+        run_report.count(provider, 'rss_items', len(items))
+        selected = select_items(items, provider, args.test, from_date, to_date)
+        run_report.count(provider, 'selected_items', len(selected))
+        run_report.count(provider, 'skipped_items', len(items) - len(selected))
+        batches.append((provider, selected))
+    return batches
+
+def coordinate(excel_updater, args, from_date=None, to_date=None):
+    """
+    Coordinator mode: queue the items of the feeds (or of the archive with --backfill) in
+    the work queue at args.coordinator, and write the records the workers submit.
+    """
+    work_queue = workqueue.WorkQueue(args.coordinator, args.lease_seconds, args.max_attempts)
+    if args.queue_port:
+        workqueue.serve_queue(work_queue, args.queue_port, args.queue_host, args.queue_token)
+        logging.info("Serving the work queue at http://%s:%s/", args.queue_host, args.queue_port)
+    if args.backfill:
+        providers = [feed[0] for feed in registered_feeds()]
+        batches = backfill.list_archive_items(providers, from_date, to_date or datetime.now(),
+                                              args.shard_days, args.parallel_shards)
+    else:
+        batches = list_feed_items(args, from_date, to_date)
+
+    def write_records(provider, records):
+        records.sort(key=backfill.record_date, reverse=True)
+        with run_report.stage(provider, 'add_rows'), profiling.stage('add_rows'):
+            counts = excel_updater.add_updates(records, upsert=True)
+        run_report.count(provider, 'scraped_items', len(records))
+        for key, value in counts.items():
+            run_report.count(provider, f'rows_{key}', value)
+        logging.info("%s rows written: %s added, %s updated, %s skipped.", provider, counts['added'], counts['updated'], counts['skipped'])
+
+    logging.info("Waiting for workers (main.py --worker %s%s)", args.coordinator,
+                 f" or --worker http://<this host>:{args.queue_port}" if args.queue_port else "")
+    counts = workqueue.run_coordinator(work_queue, batches, write_records, lambda: save_updates(excel_updater),
+                                       save_interval=args.save_interval)
+    if counts['failed']:
+        logging.warning("%s items failed; start the coordinator again to retry them.", counts['failed'])
+
+def work(args):
+    """Worker mode: scrape the items of the work queue at args.worker until the coordinator is done."""
+    process_items = {feed[0]: feed[3] for feed in registered_feeds()}
+    with profiling.stage('scrape'):
+        workqueue.run_worker(workqueue.open_queue(args.worker, args.lease_seconds, args.max_attempts, args.queue_token),
+                             process_items, args.workers, args.worker_id)
+
+def save_updates(excel_updater):
+    """Save the workbook. Returns False if it could not be saved."""
+    try:
+        with run_report.stage(None, 'save_workbook'), profiling.stage('save_workbook'):
+            saved = excel_updater.save_workbook()
+    except Exception as e:
+        run_report.record_error(None, e)
+        logging.error("Failed to save the workbook: %s", e, exc_info=False)
+        return False
+    if not saved:
+        run_report.record_error(None, 'SaveFailed')
+    return saved
+
+def write_metrics(metrics, path):
+    try:
+        metrics.write(path)
+        logging.info("Metrics saved to %s", path)
+    except OSError as e:
+        logging.error("Failed to write the metrics file %s: %s", path, e)
+
+def watch_feeds(excel_updater, args, from_date=None, to_date=None, metrics=None):
+    """
+    Watch mode: poll the registered feeds every args.interval seconds until interrupted.
+    
+    Unlike a cron job of one-shot runs, the process keeps its HTTP sessions, Chrome instances,
+    workbook and URL index between polls. Feeds are fetched with conditional requests, only
+    items not seen before are scraped, and new rows are saved as soon as a poll finds them.
+    """
+    # Rows already in the workbook are not scraped again after a restart
+    seen_urls = excel_updater.known_urls()
+    retry_items = {feed[0]: {} for feed in registered_feeds()}
+    keep_browsers_open()
+    logging.info("Watching the feeds every %s seconds (Ctrl+C to stop)", args.interval)
+    try:
+        while True:
+            poll_start = time.perf_counter()
+            if metrics:
+                metrics.start_run(time.time())
+            written = 0
+            for feed in registered_feeds():
+                counts = process_feed(feed, excel_updater, args, from_date, to_date, seen_urls, retry_items[feed[0]])
+                if counts:
+                    written += counts['added'] + counts['updated']
+            if written:
+                save_updates(excel_updater)
+            poll_seconds = time.perf_counter() - poll_start
+            logging.info("Poll finished in %.1fs: %s rows written.", poll_seconds, written)
+            if metrics:
+                metrics.finish_run(poll_seconds)
+                if args.metrics_file:
+                    write_metrics(metrics, args.metrics_file)
+            try:
+                tracing.flush()
+            except OSError as e:
+                logging.error("Failed to write the trace file %s: %s", args.trace, e)
+            time.sleep(max(0.0, args.interval - poll_seconds))
+    except KeyboardInterrupt:
+        logging.info("Stopped watching.")
+    finally:
+        keep_browsers_open(False)
+
 def parse_args():
     """Parse command-line arguments."""
     parser = argparse.ArgumentParser(description='Cloud Updates Scraper')
     parser.add_argument('--test', action='store_true', help='Run in test mode with limited items')
     parser.add_argument('--from', dest='from_date', help='Process updates from this date (MM/DD/YYYY format)')
     parser.add_argument('--to', dest='to_date', help='Process updates to this date (MM/DD/YYYY format)')
+    parser.add_argument('--partition-by', choices=PARTITION_MODES, help='Split rows into per-provider and/or per-month sheets')
+    parser.add_argument('--split-by-year', action='store_true', help='Write rows into one workbook per year (e.g. cloud_updates_2025.xlsx)')
+    parser.add_argument('--workers', type=int, default=1, help='Number of update pages fetched in parallel (default: 1)')
+    parser.add_argument('--report', metavar='PATH', help='Write a JSON run report with stage timings, counts and errors to PATH')
+    parser.add_argument('--metrics-file', metavar='PATH', help='Write Prometheus metrics (text format) to PATH at the end of the run')
+    parser.add_argument('--metrics-port', type=int, metavar='PORT', help='Serve Prometheus metrics at http://127.0.0.1:PORT/metrics while running')
+    parser.add_argument('--trace', metavar='PATH', help='Write tracing spans per URL (fetch, render, parse, write) to PATH as OTLP/JSON lines')
+    parser.add_argument('--profile', nargs='?', const='scraper_profile', metavar='PREFIX',
+                        help='Profile the run per stage, print the hottest functions and save the data as PREFIX.* (default: scraper_profile)')
+    parser.add_argument('--profile-mode', choices=profiling.PROFILE_MODES, default='cprofile',
+                        help='cprofile (deterministic, main thread only) or sample (low overhead, all threads; use it with --workers) (default: cprofile)')
+    parser.add_argument('--profile-memory', action='store_true', help='With --profile, also trace memory allocations per stage with tracemalloc')
+    parser.add_argument('--profile-top', type=int, default=15, metavar='N', help='Number of functions listed per profiled stage (default: 15)')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep running and poll the feeds every --interval seconds, writing new items as they appear')
+    parser.add_argument('--interval', type=float, default=300, help='Watch mode: seconds between polls (default: 300)')
+    parser.add_argument('--backfill', action='store_true',
+                        help='Scrape the updates between --from and --to (default: today) from the archive listings instead of the RSS feeds')
+    parser.add_argument('--shard-days', type=int, default=backfill.DEFAULT_SHARD_DAYS, metavar='N',
+                        help=f'Backfill: days per shard (default: {backfill.DEFAULT_SHARD_DAYS})')
+    parser.add_argument('--parallel-shards', type=int, default=4, metavar='N', help='Backfill: shards processed at the same time (default: 4)')
+    parser.add_argument('--checkpoint-dir', metavar='PATH',
+                        help='Backfill: directory of the per-shard checkpoints (default: cloud_updates.backfill next to the workbook)')
+    parser.add_argument('--coordinator', metavar='QUEUE',
+                        help='Queue the items in the SQLite work queue QUEUE and write the records that --worker processes submit')
+    parser.add_argument('--worker', metavar='QUEUE',
+                        help='Scrape items from the work queue QUEUE (its SQLite file, or the http:// URL of a coordinator with --queue-port)')
+    parser.add_argument('--queue-port', type=int, metavar='PORT', help='Coordinator: serve the work queue to workers on other hosts at PORT')
+    parser.add_argument('--queue-host', default='127.0.0.1',
+                        help='Coordinator: address the work queue is served on; 0.0.0.0 for all interfaces (default: 127.0.0.1)')
+    parser.add_argument('--queue-token', default=os.environ.get(workqueue.QUEUE_TOKEN_ENV), metavar='TOKEN',
+                        help=f'Shared secret the coordinator requires from remote workers (default: ${workqueue.QUEUE_TOKEN_ENV})')
+    parser.add_argument('--lease-seconds', type=float, default=workqueue.DEFAULT_LEASE_SECONDS, metavar='N',
+                        help=f'Work queue: seconds before the items of a worker that stopped responding are claimed again (default: {workqueue.DEFAULT_LEASE_SECONDS})')
+    parser.add_argument('--max-attempts', type=int, default=workqueue.DEFAULT_MAX_ATTEMPTS, metavar='N',
+                        help=f'Work queue and watch mode: times an item is tried before it counts as failed (default: {workqueue.DEFAULT_MAX_ATTEMPTS})')
+    parser.add_argument('--save-interval', type=float, default=workqueue.SAVE_INTERVAL, metavar='N',
+                        help=f'Coordinator: seconds between workbook saves while records come in (default: {workqueue.SAVE_INTERVAL:g})')
+    parser.add_argument('--worker-id', help='Worker: name of this worker in the work queue (default: <host>-<pid>)')
+    parser.add_argument('--report-slowest', type=int, default=10, metavar='N', help='Number of slowest URLs listed in the run report (default: 10)')
+    logging_setup.add_logging_arguments(parser)
     return parser.parse_args()
 
 def main():
     # Parse command-line arguments
     args = parse_args()
+    logging_setup.configure_from_args(args)
     test_mode = args.test
     from_date = parse_date_arg(args.from_date) if args.from_date else None
     to_date = parse_date_arg(args.to_date) if args.to_date else None
     
     # Validate date range if both are provided
     if from_date and to_date and from_date > to_date:
-        logging.error(f"Invalid date range: --from ({args.from_date}) is after --to ({args.to_date})")
+        logging.error("Invalid date range: --from (%s) is after --to (%s)", args.from_date, args.to_date)
+        sys.exit(1)
+    if args.backfill:
+        if not from_date:
+            logging.error("--backfill needs --from (MM/DD/YYYY)")
+            sys.exit(1)
+        if args.watch:
+            logging.error("--backfill and --watch cannot be combined")
+            sys.exit(1)
+        if args.shard_days < 1:
+            logging.error("--shard-days must be at least 1")
+            sys.exit(1)
+    if args.coordinator and args.worker:
+        logging.error("--coordinator and --worker cannot be combined")
+        sys.exit(1)
+    if (args.coordinator or args.worker) and args.watch:
+        logging.error("--watch cannot be combined with --coordinator or --worker")
+        sys.exit(1)
+    if args.worker and args.backfill:
+        logging.error("--backfill is a coordinator option: workers scrape whatever the coordinator queues")
         sys.exit(1)
     
     # Log execution mode and date filters
@@ -97,94 +453,84 @@ def main():
         logging.info("Running in PRODUCTION MODE - Processing all available items")
     
     if from_date:
-        logging.info(f"Filtering updates from {args.from_date}")
+        logging.info("Filtering updates from %s", args.from_date)
     if to_date:
-        logging.info(f"Filtering updates to {args.to_date}")
+        logging.info("Filtering updates to %s", args.to_date)
     
-    logging.info("Initializing ExcelUpdater...")
-    excel_updater = ExcelUpdater(EXCEL_FILENAME) # excel_writer.py handles file existence
-
-    # --- AWS Processing ---
-    logging.info("Starting AWS updates processing...")
-    try:
-        aws_feed_content = fetch_rss_feed(AWS_RSS_URL)
-        if aws_feed_content:
-            aws_items = parse_aws_rss(aws_feed_content)
-            logging.info(f"Found {len(aws_items)} AWS items in the RSS feed.")
-            for i, item in enumerate(aws_items):
-                # Apply item limit only in test mode
-                if test_mode and i >= TEST_LIMIT:
-                    logging.info(f"AWS: Reached test mode limit ({TEST_LIMIT}), stopping AWS processing.")
-                    break                # Check if date is in the specified range
-                if not is_date_in_range(item['date_posted'], from_date, to_date):
-                    logging.info(f"Skipping AWS item from {item['date_posted']}: outside of requested date range")
-                    continue
-
-                logging.info(f"Processing AWS item from {item['date_posted']}: {item.get('title', 'N/A')} - URL: {item.get('url', 'N/A')}")
-                try:
-                    scraped_data = scrape_aws_update(item['url'], item['title'], item['date_posted'])
-                    if scraped_data:
-                        scraped_data['provider'] = 'AWS'
-                        excel_updater.add_update(scraped_data)
-                        logging.info(f"Successfully scraped and added AWS item: {item.get('title')}")
-                    else:
-                        logging.warning(f"Scraping returned None for AWS item: {item.get('url')}")
-                except Exception as e:
-                    logging.error(f"Error scraping AWS item {item.get('url')}: {e}", exc_info=False) # exc_info=False to keep log cleaner
-        else:
-            logging.warning("Could not fetch AWS RSS feed content.")
-    except Exception as e:
-        logging.error(f"An error occurred during AWS RSS feed processing: {e}", exc_info=False)
-
-    # --- Azure Processing ---
-    logging.info("Starting Azure updates processing...")
-    try:
-        azure_feed_content = fetch_rss_feed(AZURE_RSS_URL)
-        if azure_feed_content:
-            azure_items = parse_azure_rss(azure_feed_content)
-            logging.info(f"Found {len(azure_items)} Azure items in the RSS feed.")
-            for i, item in enumerate(azure_items):
-                # Apply item limit only in test mode
-                if test_mode and i >= TEST_LIMIT:
-                    logging.info(f"Azure: Reached test mode limit ({TEST_LIMIT}), stopping Azure processing.")
-                    break
-                  # Check if date is in the specified range
-                if not is_date_in_range(item['date_posted'], from_date, to_date):
-                    logging.info(f"Skipping Azure item from {item['date_posted']}: outside of requested date range")
-                    continue
-                
-                logging.info(f"Processing Azure item from {item['date_posted']}: {item.get('title', 'N/A')} - URL: {item.get('url', 'N/A')}")
-                try:
-                    # Extract RSS metadata for the Azure item
-                    metadata = {
-                        'status': item.get('status'),
-                        'update_type': item.get('update_type'),
-                        'product_list': item.get('product_list'),
-                        'categories': item.get('categories')
-                    }
-                    logging.info(f"RSS metadata: Status='{metadata['status']}', Type='{metadata['update_type']}', Products='{metadata['product_list']}'")
-                    
-                    # Pass the metadata to the scraper function
-                    scraped_data = scrape_azure_update(item['url'], item['title'], item['date_posted'], metadata)
-                    if scraped_data:
-                        scraped_data['provider'] = 'Azure'
-                        excel_updater.add_update(scraped_data)
-                        logging.info(f"Successfully scraped and added Azure item: {item.get('title')}")
-                    else:
-                        logging.warning(f"Scraping returned None for Azure item: {item.get('url')}")
-                except Exception as e:
-                    logging.error(f"Error scraping Azure item {item.get('url')}: {e}", exc_info=False)
-        else:
-            logging.warning("Could not fetch Azure RSS feed content.")
-    except Exception as e:
-        logging.error(f"An error occurred during Azure RSS feed processing: {e}", exc_info=False)
+    report = run_report.start_report(args.report_slowest) if args.report else None
+    metrics = None
+    if args.metrics_file or args.metrics_port:
+        metrics = ScraperMetrics()
+        run_report.add_sink(metrics)
+        metrics.start_run(time.time())
+        if args.metrics_port:
+            metrics.serve(args.metrics_port)
+            logging.info("Serving metrics at http://127.0.0.1:%s/metrics", args.metrics_port)
+    if args.trace:
+        try:
+            tracing.start_tracing(args.trace)
+            logging.info("Writing trace spans to %s", args.trace)
+        except OSError as e:
+            logging.error("Cannot write the trace file %s: %s", args.trace, e)
+            sys.exit(1)
+    profiler = None
+    if args.profile:
+        profiler = profiling.start_profiler(args.profile, args.profile_mode, args.profile_top, args.profile_memory)
+        logging.info("Profiling stages with %s%s", args.profile_mode, ' and tracemalloc' if args.profile_memory else '')
+    run_start = time.perf_counter()
+    
+    excel_updater = None
+    if not args.worker: # Workers only scrape; the coordinator writes the workbook
+        logging.info("Initializing ExcelUpdater...")
+        excel_updater = ExcelUpdater(EXCEL_FILENAME, partition_by=args.partition_by, split_by_year=args.split_by_year) # excel_writer.py handles file existence
 
-    try:
-        excel_updater.save_workbook()
-    except Exception as e:
-        logging.error(f"Failed to save the workbook: {e}", exc_info=False)
+    if args.worker:
+        work(args)
+    elif args.coordinator:
+        coordinate(excel_updater, args, from_date, to_date)
+    elif args.backfill:
+        checkpoint_dir = args.checkpoint_dir or os.path.splitext(EXCEL_FILENAME)[0] + '.backfill'
+        with profiling.stage('scrape'):
+            backfill.run_backfill(excel_updater, {'AWS': process_aws_item, 'Azure': process_azure_item},
+                                  from_date, to_date or datetime.now(), checkpoint_dir,
+                                  args.shard_days, args.parallel_shards, args.workers)
+        save_updates(excel_updater)
+    elif args.watch:
+        watch_feeds(excel_updater, args, from_date, to_date, metrics)
+    else:
+        for feed in registered_feeds():
+            process_feed(feed, excel_updater, args, from_date, to_date)
+        save_updates(excel_updater)
         
     logging.info("Processing complete.")
+    
+    if args.trace:
+        try:
+            tracing.stop_tracing()
+            logging.info("Trace spans saved to %s", args.trace)
+        except OSError as e:
+            logging.error("Failed to write the trace file %s: %s", args.trace, e)
+    
+    if metrics:
+        if not args.watch:
+            metrics.finish_run(time.perf_counter() - run_start)
+        if args.metrics_file:
+            write_metrics(metrics, args.metrics_file)
+    
+    if report:
+        try:
+            report.write(args.report, args.report_slowest)
+            logging.info("Run report saved to %s", args.report)
+        except OSError as e:
+            logging.error("Failed to write the run report %s: %s", args.report, e)
+    
+    if profiler:
+        profiling.stop_profiler()
+        print(profiler.summary())
+        try:
+            logging.info("Profile data saved to %s", ', '.join(profiler.write()))
+        except OSError as e:
+            logging.error("Failed to write the profile data %s.*: %s", args.profile, e)
 
 if __name__ == '__main__':
     main()
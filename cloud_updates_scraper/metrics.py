@@ -0,0 +1,218 @@
+"""
+Prometheus metrics for the cloud updates scraper.
+
+ScraperMetrics receives the same measurements as the run report (it is registered as a
+run_report sink) and keeps them as counters and histograms:
+
+*   cloud_updates_stage_duration_seconds{provider,stage} - histogram; rss_fetch and page_fetch
+    are the fetch latency, javascript_render the render latency, save_workbook the save time
+*   cloud_updates_item_duration_seconds{provider} - histogram of the time per update page
+*   cloud_updates_items_total{provider,result} - rss, selected, skipped, scraped and failed items
+*   cloud_updates_rows_total{provider,action} - rows added, updated or skipped in the workbook
+*   cloud_updates_cache_requests_total{provider,result} - conditional feed requests (watch
+    mode): hit (304 Not Modified) or miss; the hit rate is hits / (hits + misses)
+*   cloud_updates_errors_total{provider,type}, cloud_updates_downloaded_bytes_total{provider,kind}
+*   cloud_updates_last_run_* gauges - start time, duration and success of the last run (in
+    watch mode, of the last poll)
+
+The metrics are written in the Prometheus text format to a file (for the node_exporter
+textfile collector, replaced atomically) and can be served over HTTP at /metrics.
+No Prometheus client library is needed.
+"""
+
+import os
+import math
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+# The process umask, read once at import (os.umask can only be read by setting it)
+_UMASK = os.umask(0o022)
+os.umask(_UMASK)
+RUN_LABEL = "run"  # provider label of measurements that belong to the whole run, e.g. save_workbook
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+def _number(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for labelvalues, value in sorted(self._values.items()):
+                lines.extend(self._render_sample(labelvalues, value))
+        return lines
+
+    def _render_sample(self, labelvalues, value):
+        return [f"{self.name}{_labels(self.labelnames, labelvalues)} {_number(value)}"]
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, *labelvalues):
+        with self._lock:
+            self._values[labelvalues] = value
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, *labelvalues):
+        with self._lock:
+            state = self._values.get(labelvalues)
+            if state is None:
+                state = self._values[labelvalues] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['counts'][index] += 1
+                    break
+            state['sum'] += value
+            state['count'] += 1
+
+    def _render_sample(self, labelvalues, state):
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, state['counts']):
+            cumulative += bucket_count
+            labels = _labels(self.labelnames, labelvalues, [('le', _number(bound))])
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _labels(self.labelnames, labelvalues)
+        lines.append(f"{self.name}_sum{labels} {_number(state['sum'])}")
+        lines.append(f"{self.name}_count{labels} {state['count']}")
+        return lines
+
+class ScraperMetrics:
+    """Counters and histograms of the scraper, fed through run_report.add_sink"""
+
+    def __init__(self):
+        self.stage_duration = Histogram('cloud_updates_stage_duration_seconds', 'Duration of a scraper stage call',
+                                        ('provider', 'stage'))
+        self.item_duration = Histogram('cloud_updates_item_duration_seconds', 'Time to scrape one update page',
+                                       ('provider',))
+        self.items = Counter('cloud_updates_items_total', 'RSS items by result', ('provider', 'result'))
+        self.rows = Counter('cloud_updates_rows_total', 'Workbook rows by action', ('provider', 'action'))
+        self.cache_requests = Counter('cloud_updates_cache_requests_total', 'Conditional feed requests by result',
+                                      ('provider', 'result'))
+        self.errors = Counter('cloud_updates_errors_total', 'Errors by type', ('provider', 'type'))
+        self.downloaded_bytes = Counter('cloud_updates_downloaded_bytes_total', 'Bytes downloaded', ('provider', 'kind'))
+        self.last_run_start = Gauge('cloud_updates_last_run_start_timestamp_seconds', 'Start time of the last run')
+        self.last_run_duration = Gauge('cloud_updates_last_run_duration_seconds', 'Duration of the last run')
+        self.last_run_success = Gauge('cloud_updates_last_run_success', '1 if the last run finished without errors')
+        self._metrics = [self.stage_duration, self.item_duration, self.items, self.rows, self.cache_requests,
+                         self.errors, self.downloaded_bytes, self.last_run_start, self.last_run_duration,
+                         self.last_run_success]
+        self._run_errors = 0
+
+    # --- run_report sink interface ---
+
+    def add_time(self, provider, name, seconds):
+        self.stage_duration.observe(seconds, provider or RUN_LABEL, name)
+
+    def count(self, provider, name, amount=1):
+        provider = provider or RUN_LABEL
+        if name.startswith('rows_'):
+            self.rows.inc(provider, name[len('rows_'):], amount=amount)
+        elif name.startswith('cache_'):
+            self.cache_requests.inc(provider, name[len('cache_'):], amount=amount)
+        elif name.endswith('_items'):
+            self.items.inc(provider, name[:-len('_items')], amount=amount)
+
+    def add_bytes(self, provider, kind, amount):
+        self.downloaded_bytes.inc(provider or RUN_LABEL, kind, amount=amount)
+
+    def record_error(self, provider, error):
+        name = error if isinstance(error, str) else type(error).__name__
+        self.errors.inc(provider or RUN_LABEL, name)
+        self._run_errors += 1
+
+    def record_item(self, provider, url, seconds, ok):
+        self.item_duration.observe(seconds, provider or RUN_LABEL)
+        if not ok:
+            self.items.inc(provider or RUN_LABEL, 'failed')
+
+    # --- runs ---
+
+    def start_run(self, timestamp):
+        self.last_run_start.set(timestamp)
+        self._run_errors = 0
+
+    def finish_run(self, duration_seconds):
+        self.last_run_duration.set(duration_seconds)
+        self.last_run_success.set(0 if self._run_errors else 1)
+
+    # --- export ---
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Write the metrics file atomically, so a collector never reads a partial file"""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(self.render())
+            # mkstemp creates the file as 0600; the textfile collector may run as another user
+            os.chmod(temp_path, 0o666 & ~_UMASK)
+            os.replace(temp_path, path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def serve(self, port, host='127.0.0.1'):
+        """Serve the metrics at http://host:port/metrics from a background thread. Returns the server"""
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                data = metrics.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
@@ -0,0 +1,197 @@
+"""
+Run report for the cloud updates scraper.
+
+Collects per-stage timings (RSS fetch and parse, page fetch, JavaScript render, page
+parsing, metadata merge, workbook save), counts, errors by type and byte counts, overall
+and per provider, plus the per-item durations to list the slowest URLs. main.py starts
+a report with --report and writes it as JSON at the end of the run.
+
+The scraper functions record into the active report (and any other sink, such as the
+metrics of metrics.py) through the module functions below. Without an active report or
+sink they return immediately, so an unreported run pays nothing.
+Stage times are summed over all calls, so with several workers a stage can add up to
+more than the wall-clock duration of the run.
+"""
+
+import json
+import time
+import heapq
+import itertools
+import threading
+import contextlib
+from collections import defaultdict
+from datetime import datetime
+
+_NO_STAGE = contextlib.nullcontext()
+_active_report = None
+# Everything measurements are recorded into: the active report and e.g. a metrics registry
+_sinks = []
+# Errors recorded by the current thread, so a caller can tell whether a callee already recorded one
+_thread_errors = threading.local()
+
+class RunReport:
+    def __init__(self, keep_slowest=10):
+        """keep_slowest: number of slowest items kept for the report; other items are only counted"""
+        self.started = datetime.now()
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._sections = {}
+        self._keep_slowest = keep_slowest
+        # Bounded min-heap of the slowest items, so a long watch run does not keep every item
+        self._slowest = []
+        self._sequence = itertools.count()
+        self._item_count = 0
+        self._failed_count = 0
+
+    def _section(self, provider):
+        """Counters of a provider; provider None holds the stages of the whole run (e.g. save_workbook)"""
+        section = self._sections.get(provider)
+        if section is None:
+            section = self._sections[provider] = {
+                'stages': defaultdict(lambda: {'count': 0, 'seconds': 0.0, 'max_seconds': 0.0}),
+                'counts': defaultdict(int),
+                'errors': defaultdict(int),
+                'bytes': defaultdict(int),
+            }
+        return section
+
+    def add_time(self, provider, name, seconds):
+        with self._lock:
+            stage = self._section(provider)['stages'][name]
+            stage['count'] += 1
+            stage['seconds'] += seconds
+            stage['max_seconds'] = max(stage['max_seconds'], seconds)
+
+    @contextlib.contextmanager
+    def stage(self, provider, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(provider, name, time.perf_counter() - start)
+
+    def count(self, provider, name, amount=1):
+        with self._lock:
+            self._section(provider)['counts'][name] += amount
+
+    def add_bytes(self, provider, kind, amount):
+        with self._lock:
+            self._section(provider)['bytes'][kind] += amount
+
+    def record_error(self, provider, error):
+        """Count an error by type; error is an exception or a short name such as 'NoData'"""
+        name = error if isinstance(error, str) else type(error).__name__
+        with self._lock:
+            self._section(provider)['errors'][name] += 1
+
+    def record_item(self, provider, url, seconds, ok):
+        entry = (seconds, next(self._sequence), provider, url, ok)
+        with self._lock:
+            self._item_count += 1
+            self._failed_count += not ok
+            if len(self._slowest) < self._keep_slowest:
+                heapq.heappush(self._slowest, entry)
+            elif self._slowest and seconds > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, entry)
+
+    @staticmethod
+    def _section_dict(section):
+        return {
+            'stages': {name: {'count': stage['count'], 'seconds': round(stage['seconds'], 3),
+                              'max_seconds': round(stage['max_seconds'], 3)}
+                       for name, stage in section['stages'].items()},
+            'counts': dict(section['counts']),
+            'errors': dict(section['errors']),
+            'bytes': dict(section['bytes']),
+        }
+
+    def to_dict(self, slowest=10):
+        with self._lock:
+            providers = {provider: self._section_dict(section)
+                         for provider, section in self._sections.items() if provider is not None}
+            run = self._section_dict(self._section(None))
+            items = sorted(self._slowest, reverse=True)
+            item_count, failed_count = self._item_count, self._failed_count
+
+        totals = {'counts': defaultdict(int), 'errors': defaultdict(int), 'bytes': defaultdict(int)}
+        for section in providers.values():
+            for key in totals:
+                for name, value in section[key].items():
+                    totals[key][name] += value
+        return {
+            'started': self.started.isoformat(timespec='seconds'),
+            'duration_seconds': round(time.perf_counter() - self._start, 3),
+            'items': item_count,
+            'failed_items': failed_count,
+            'counts': dict(totals['counts']),
+            'errors': dict(totals['errors']),
+            'bytes': dict(totals['bytes']),
+            'stages': run['stages'],
+            'providers': providers,
+            'slowest_urls': [{'url': url, 'provider': provider, 'seconds': round(seconds, 3), 'ok': ok}
+                             for seconds, _, provider, url, ok in items[:slowest]],
+        }
+
+    def write(self, path, slowest=10):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(slowest), f, indent=2)
+
+def start_report(keep_slowest=10):
+    """Make a new report the active one and return it"""
+    global _active_report
+    if _active_report in _sinks:
+        _sinks.remove(_active_report)
+    _active_report = RunReport(keep_slowest)
+    _sinks.append(_active_report)
+    return _active_report
+
+def active_report():
+    return _active_report
+
+def add_sink(sink):
+    """Also send every measurement to sink, an object with the recording methods of RunReport (e.g. metrics)"""
+    if sink not in _sinks:
+        _sinks.append(sink)
+
+def remove_sink(sink):
+    if sink in _sinks:
+        _sinks.remove(sink)
+
+@contextlib.contextmanager
+def _timed_stage(provider, name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_time(provider, name, time.perf_counter() - start)
+
+def stage(provider, name):
+    """Context manager timing a stage in the active report and sinks"""
+    if not _sinks:
+        return _NO_STAGE
+    return _timed_stage(provider, name)
+
+def add_time(provider, name, seconds):
+    for sink in _sinks:
+        sink.add_time(provider, name, seconds)
+
+def count(provider, name, amount=1):
+    for sink in _sinks:
+        sink.count(provider, name, amount)
+
+def add_bytes(provider, kind, amount):
+    for sink in _sinks:
+        sink.add_bytes(provider, kind, amount)
+
+def record_error(provider, error):
+    _thread_errors.count = getattr(_thread_errors, 'count', 0) + 1
+    for sink in _sinks:
+        sink.record_error(provider, error)
+
+def errors_recorded():
+    """Number of errors the current thread has recorded so far"""
+    return getattr(_thread_errors, 'count', 0)
+
+def record_item(provider, url, seconds, ok):
+    for sink in _sinks:
+        sink.record_item(provider, url, seconds, ok)
@@ -4,6 +4,11 @@ from datetime import datetime
 from urllib.parse import urljoin
 import re
 import json # Ensure json is imported globally
+import queue
+import logging
+import threading
+import run_report
+import tracing
 
 # Try to import the JavaScript scraper module
 try:
@@ -42,10 +47,67 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
 from webdriver_manager.chrome import ChromeDriverManager
 
+logger = logging.getLogger(__name__)
+
 USER_AGENT_HEADER = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
 }
 
+# Idle HTTP sessions. Every request borrows one, so connections and TLS sessions are reused
+# across requests, worker threads and watch mode polls
+_idle_sessions = queue.SimpleQueue()
+
+# ETag and Last-Modified of the feeds fetched with conditional=True, by URL
+_feed_validators = {}
+
+# Watch mode keeps the Chrome instances open between pages; idle ones wait here
+_keep_browsers = False
+_idle_browsers = queue.SimpleQueue()
+_open_browsers = []
+_browsers_lock = threading.Lock()
+
+def http_get(url: str, timeout: float, headers: dict = None) -> requests.Response:
+    """ requests.get through a pooled requests.Session carrying the User-Agent header. """
+    try:
+        session = _idle_sessions.get_nowait()
+    except queue.Empty:
+        session = requests.Session()
+        session.headers.update(USER_AGENT_HEADER)
+    try:
+        return session.get(url, headers=headers, timeout=timeout)
+    finally:
+        _idle_sessions.put(session)
+
+def keep_browsers_open(enabled: bool = True):
+    """ Reuse idle Chrome instances in fetch_page_with_javascript instead of starting one per page. """
+    global _keep_browsers
+    _keep_browsers = enabled
+    if not enabled:
+        close_browsers()
+
+def close_browsers():
+    """ Quit the Chrome instances kept open by keep_browsers_open. """
+    with _browsers_lock:
+        browsers = list(_open_browsers)
+        _open_browsers.clear()
+        while not _idle_browsers.empty():
+            _idle_browsers.get_nowait()
+    for driver in browsers:
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.debug("Error closing Chrome WebDriver: %s", e)
+
+def _discard_browser(driver):
+    """ Forget (and quit) a kept Chrome instance that failed, so the next page starts a new one. """
+    with _browsers_lock:
+        if driver in _open_browsers:
+            _open_browsers.remove(driver)
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
 def fetch_page_with_javascript(url: str, wait_for_selector: str = None, wait_time: int = 10) -> str:
     """
     Fetch a web page with JavaScript execution using Selenium if available.
@@ -60,7 +122,7 @@ def fetch_page_with_javascript(url: str, wait_for_selector: str = None, wait_tim
     """
     selenium_spec = importlib.util.find_spec("selenium")
     if selenium_spec is None:
-        print("WARNING: Selenium is not installed. Cannot execute JavaScript. Run: pip install selenium webdriver-manager")
+        logger.warning("Selenium is not installed. Cannot execute JavaScript. Run: pip install selenium webdriver-manager")
         return None
     
     try:
@@ -93,12 +155,11 @@ def fetch_page_with_javascript(url: str, wait_for_selector: str = None, wait_tim
                 # Try to use locally installed ChromeDriver
                 driver = webdriver.Chrome(options=chrome_options)
         except Exception as e:
-            print(f"Error initializing Chrome WebDriver: {e}")
-            print("If you don't have ChromeDriver installed, run: pip install webdriver-manager")
+            logger.error("Error initializing Chrome WebDriver: %s. If you don't have ChromeDriver installed, run: pip install webdriver-manager", e)
             return None
             
         try:
-            print(f"Fetching page with JavaScript: {url}")
+            logger.debug("Fetching page with JavaScript: %s", url)
             driver.get(url)
             
             if wait_for_selector:
@@ -107,7 +168,7 @@ def fetch_page_with_javascript(url: str, wait_for_selector: str = None, wait_tim
                         EC.presence_of_element_located((By.CSS_SELECTOR, wait_for_selector))
                     )
                 except TimeoutException:
-                    print(f"Timeout waiting for element with selector: {wait_for_selector}")
+                    logger.warning("Timeout waiting for element with selector: %s", wait_for_selector)
             else:
                 # Wait for the page to load completely
                 time.sleep(wait_time)
@@ -117,21 +178,44 @@ def fetch_page_with_javascript(url: str, wait_for_selector: str = None, wait_tim
         finally:
             driver.quit()
     except Exception as e:
-        print(f"Error fetching page with JavaScript: {e}")
+        logger.error("Error fetching page with JavaScript: %s", e)
         return None
 
-def fetch_rss_feed(url: str) -> BeautifulSoup:
-    """ Fetches the content from the given URL and parses it as XML. """
+@tracing.traced(arg_attributes={'provider': 'scraper.provider'})
+def fetch_rss_feed(url: str, provider: str = None, conditional: bool = False) -> BeautifulSoup | None:
+    """
+    Fetches the content from the given URL and parses it as XML. provider labels the run report entries.
+    With conditional the request sends the ETag/Last-Modified of the previous conditional fetch of
+    the URL, and None is returned when the server answers 304 Not Modified.
+    """
+    headers = None
+    if conditional:
+        etag, last_modified = _feed_validators.get(url, (None, None))
+        headers = {}
+        if etag: headers['If-None-Match'] = etag
+        if last_modified: headers['If-Modified-Since'] = last_modified
     try:
-        response = requests.get(url, headers=USER_AGENT_HEADER, timeout=10)
-        response.raise_for_status()
-        try: soup = BeautifulSoup(response.content, 'lxml-xml')
-        except Exception:
-            try: soup = BeautifulSoup(response.content, 'xml')
-            except Exception: soup = BeautifulSoup(response.content, 'html.parser')
+        with run_report.stage(provider, 'rss_fetch'):
+            response = http_get(url, timeout=10, headers=headers)
+            tracing.set_attribute('http.response.status_code', response.status_code)
+            response.raise_for_status()
+        if conditional:
+            if response.status_code == 304:
+                run_report.count(provider, 'cache_hit')
+                tracing.set_attribute(tracing.OUTCOME_ATTRIBUTE, 'not_modified')
+                logger.debug("RSS feed %s not modified", url)
+                return None
+            run_report.count(provider, 'cache_miss')
+            _feed_validators[url] = (response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        run_report.add_bytes(provider, 'rss', len(response.content))
+        with run_report.stage(provider, 'rss_parse'):
+            try: soup = BeautifulSoup(response.content, 'lxml-xml')
+            except Exception:
+                try: soup = BeautifulSoup(response.content, 'xml')
+                except Exception: soup = BeautifulSoup(response.content, 'html.parser')
         return soup
     except requests.exceptions.RequestException as e:
-        print(f"Error fetching RSS feed from {url}: {e}"); raise
+        logger.error("Error fetching RSS feed from %s: %s", url, e); raise
 
 def parse_aws_rss(feed_content: BeautifulSoup) -> list[dict]:
     """ Parses AWS RSS feed content to extract update details. """
@@ -337,7 +421,7 @@ def format_date(date_string: str) -> str:
         dt_obj = datetime.fromisoformat(date_string)
         return dt_obj.strftime("%m/%d/%Y")
     except ValueError: pass
-    print(f"Warning: Could not parse date string: {date_string} with known formats."); return date_string
+    logger.warning("Could not parse date string: %s with known formats.", date_string); return date_string
 
 def extract_product_from_title(title: str) -> str:
     """ Extracts AWS product name from the RSS title. """
@@ -351,13 +435,21 @@ def extract_product_from_title(title: str) -> str:
         if re.search(r"\b" + re.escape(prod) + r"\b", title): return prod
     return "N/A"
 
+@tracing.traced()
 def scrape_aws_update(url: str, rss_title: str, rss_pub_date: str) -> dict | None:
     """ Scrapes an individual AWS update page for detailed information. """
     try:
-        response = requests.get(url, headers=USER_AGENT_HEADER, timeout=15)
-        response.raise_for_status()
+        with run_report.stage('AWS', 'page_fetch'):
+            response = http_get(url, timeout=15)
+            tracing.set_attribute('http.response.status_code', response.status_code)
+            response.raise_for_status()
     except requests.exceptions.RequestException as e:
-        print(f"Error fetching page {url}: {e}"); return None
+        run_report.record_error('AWS', e)
+        tracing.record_exception(e)
+        tracing.set_attribute(tracing.OUTCOME_ATTRIBUTE, 'fetch_error')
+        logger.error("Error fetching page %s: %s", url, e); return None
+    run_report.add_bytes('AWS', 'page', len(response.content))
+    parse_start = time.perf_counter()
     soup = BeautifulSoup(response.content, 'html.parser')
     title_val = rss_title # Renamed to avoid conflict
     page_date_str = None
@@ -379,14 +471,14 @@ def scrape_aws_update(url: str, rss_title: str, rss_pub_date: str) -> dict | Non
     json_script_tags = soup.find_all('script', type='application/json')
     for script_tag in json_script_tags:
         if script_tag.string and '"postBody":' in script_tag.string: 
-            print("DEBUG: Found a JSON script tag potentially containing postBody.")
+            logger.debug("Found a JSON script tag potentially containing postBody.")
             try:
                 json_data = json.loads(script_tag.string)
                 if (json_data and isinstance(json_data, dict) and json_data.get('data') and isinstance(json_data['data'], dict) and json_data['data'].get('items') and isinstance(json_data['data']['items'], list) and len(json_data['data']['items']) > 0 and isinstance(json_data['data']['items'][0], dict) and json_data['data']['items'][0].get('fields') and isinstance(json_data['data']['items'][0]['fields'], dict) and json_data['data']['items'][0]['fields'].get('postBody')):
                     content_html_source = json_data['data']['items'][0]['fields']['postBody']
-                    print("DEBUG: Successfully extracted postBody HTML from JSON.")
+                    logger.debug("Successfully extracted postBody HTML from JSON.")
                     processed_via_json = True; break 
-            except Exception as e: print(f"DEBUG: Error processing JSON for AWS: {e}")
+            except Exception as e: logger.debug("Error processing JSON for AWS: %s", e)
     if processed_via_json and content_html_source:
         content_soup = BeautifulSoup(content_html_source, 'html.parser')
         paragraphs = content_soup.find_all(['p', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
@@ -395,7 +487,7 @@ def scrape_aws_update(url: str, rss_title: str, rss_pub_date: str) -> dict | Non
             href = a_tag['href']; absolute_url = urljoin(url, href)
             if absolute_url not in links_list: links_list.append(absolute_url)
     else:
-        if not processed_via_json: print("DEBUG: AWS JSON script/postBody method failed. Falling back to CSS selectors.")
+        if not processed_via_json: logger.debug("AWS JSON script/postBody method failed. Falling back to CSS selectors.")
         content_selectors = ["div.wn-body", "div.aws-text-box", "article", "main#main-content"]
         description_html_element = next((soup.select_one(s) for s in content_selectors if soup.select_one(s)), None)
         if description_html_element:
@@ -404,7 +496,7 @@ def scrape_aws_update(url: str, rss_title: str, rss_pub_date: str) -> dict | Non
             for a_tag in description_html_element.find_all('a', href=True):
                 href = a_tag['href']; absolute_url = urljoin(url, href)
                 if absolute_url not in links_list: links_list.append(absolute_url)
-        else: print(f"Warning: AWS Fallback CSS selectors also failed on page {url}")
+        else: logger.warning("AWS Fallback CSS selectors also failed on page %s", url)
     description_text = re.sub(r'\n\s*\n+', '\n', description_text).strip()
     if description_text.lower().startswith("posted on:") and "\n" in description_text:
         lines = description_text.split("\n", 2)
@@ -412,8 +504,13 @@ def scrape_aws_update(url: str, rss_title: str, rss_pub_date: str) -> dict | Non
             description_text = lines[2].strip() if len(lines) > 2 else ""
     links_str = ",".join(links_list) if links_list else "N/A"
     product = extract_product_from_title(rss_title)
+    parse_end = time.perf_counter()
+    run_report.add_time('AWS', 'parse', parse_end - parse_start)
+    tracing.add_span('parse', parse_start, parse_end,
+                     {'scraper.content_source': 'post_body' if processed_via_json and content_html_source else 'css_fallback'})
     return {'title': title_val, 'url': url, 'date_posted': date_posted, 'description': description_text, 'links': links_str, 'product': product}
 
+@tracing.traced(none_outcome='not_found', arg_attributes={'heading_text': 'scraper.metadata_heading'})
 def _extract_azure_metadata_item(metadata_section_soup: BeautifulSoup, heading_text: str) -> str | None:
     """ 
     Helper to find a heading in Azure metadata and extract related text or links.
@@ -479,6 +576,7 @@ def _extract_azure_metadata_item(metadata_section_soup: BeautifulSoup, heading_t
     return result
 
 
+@tracing.traced(none_outcome='failed')
 def fetch_page_with_javascript(url: str, wait_for_selector: str = None, wait_time: int = 10) -> str:
     """
     Fetch a web page with JavaScript execution using Selenium if available.
@@ -493,7 +591,7 @@ def fetch_page_with_javascript(url: str, wait_for_selector: str = None, wait_tim
     """
     selenium_spec = importlib.util.find_spec("selenium")
     if selenium_spec is None:
-        print("WARNING: Selenium is not installed. Cannot execute JavaScript. Run: pip install selenium webdriver-manager")
+        logger.warning("Selenium is not installed. Cannot execute JavaScript. Run: pip install selenium webdriver-manager")
         return None
     
     try:
@@ -517,42 +615,70 @@ def fetch_page_with_javascript(url: str, wait_for_selector: str = None, wait_tim
         chrome_options.add_argument("--disable-dev-shm-usage")
         chrome_options.add_argument(f"user-agent={USER_AGENT_HEADER['User-Agent']}")
         
-        try:
-            if webdriver_mgr_available:
-                from webdriver_manager.chrome import ChromeDriverManager
-                service = Service(ChromeDriverManager().install())
-                driver = webdriver.Chrome(service=service, options=chrome_options)
-            else:
-                # Try to use locally installed ChromeDriver
-                driver = webdriver.Chrome(options=chrome_options)
-        except Exception as e:
-            print(f"Error initializing Chrome WebDriver: {e}")
-            print("If you don't have ChromeDriver installed, run: pip install webdriver-manager")
-            return None
+        driver = None
+        if _keep_browsers:
+            try:
+                driver = _idle_browsers.get_nowait()
+            except queue.Empty:
+                pass
+        tracing.set_attribute('scraper.browser_reused', driver is not None)
+        if driver is None:
+            try:
+                if webdriver_mgr_available:
+                    from webdriver_manager.chrome import ChromeDriverManager
+                    with tracing.span('webdriver.install'):
+                        service = Service(ChromeDriverManager().install())
+                    with tracing.span('webdriver.start'):
+                        driver = webdriver.Chrome(service=service, options=chrome_options)
+                else:
+                    # Try to use locally installed ChromeDriver
+                    with tracing.span('webdriver.start'):
+                        driver = webdriver.Chrome(options=chrome_options)
+            except Exception as e:
+                tracing.set_attribute(tracing.OUTCOME_ATTRIBUTE, 'driver_error')
+                logger.error("Error initializing Chrome WebDriver: %s. If you don't have ChromeDriver installed, run: pip install webdriver-manager", e)
+                return None
+            if _keep_browsers:
+                with _browsers_lock:
+                    _open_browsers.append(driver)
             
         try:
-            print(f"Fetching page with JavaScript: {url}")
-            driver.get(url)
+            logger.debug("Fetching page with JavaScript: %s", url)
+            with tracing.span('page.load'):
+                driver.get(url)
             
             if wait_for_selector:
-                try:
-                    WebDriverWait(driver, wait_time).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, wait_for_selector))
-                    )
-                except TimeoutException:
-                    print(f"Timeout waiting for element with selector: {wait_for_selector}")
+                with tracing.span('selector.wait', attributes={'scraper.selector': wait_for_selector}) as wait_span:
+                    try:
+                        WebDriverWait(driver, wait_time).until(
+                            EC.presence_of_element_located((By.CSS_SELECTOR, wait_for_selector))
+                        )
+                    except TimeoutException:
+                        wait_span.set_attribute(tracing.OUTCOME_ATTRIBUTE, 'timeout')
+                        logger.warning("Timeout waiting for element with selector: %s", wait_for_selector)
             else:
                 # Wait for the page to load completely
                 time.sleep(wait_time)
                 
             page_source = driver.page_source
             return page_source
+        except Exception:
+            if _keep_browsers:
+                # The browser may have crashed; the next page starts a new one
+                _discard_browser(driver)
+                driver = None
+            raise
         finally:
-            driver.quit()
+            if not _keep_browsers:
+                driver.quit()
+            elif driver is not None:
+                _idle_browsers.put(driver)
     except Exception as e:
-        print(f"Error fetching page with JavaScript: {e}")
+        tracing.record_exception(e)
+        logger.error("Error fetching page with JavaScript: %s", e)
         return None
 
+@tracing.traced()
 def scrape_azure_update(url: str, rss_title: str, rss_pub_date: str, rss_metadata: dict = None) -> dict | None:
     """ 
     Scrapes an individual Azure update page for detailed information.
@@ -566,30 +692,48 @@ def scrape_azure_update(url: str, rss_title: str, rss_pub_date: str, rss_metadat
     try:
         # First try to load the page with JavaScript execution
         if "azure.microsoft.com" in url and "/updates" in url:
-            print(f"Attempting to fetch Azure page with JavaScript execution: {url}")
+            logger.debug("Attempting to fetch Azure page with JavaScript execution: %s", url)
             # For Azure updates pages, first try with JavaScript execution
-            html_content = fetch_page_with_javascript(
-                url, 
-                wait_for_selector="div.ocr-faq-item__body, div.content-area, article",
-                wait_time=15
-            )
+            with run_report.stage('Azure', 'javascript_render'):
+                html_content = fetch_page_with_javascript(
+                    url, 
+                    wait_for_selector="div.ocr-faq-item__body, div.content-area, article",
+                    wait_time=15
+                )
             if html_content:
-                soup = BeautifulSoup(html_content, 'html.parser')
+                run_report.add_bytes('Azure', 'page', len(html_content.encode('utf-8')))
+                tracing.set_attribute('scraper.fetch_method', 'javascript')
+                page_content = html_content
             else:
                 # Fall back to regular requests if JavaScript execution fails
-                print("JavaScript execution failed, falling back to standard HTTP request")
-                response = requests.get(url, headers=USER_AGENT_HEADER, timeout=15)
-                response.raise_for_status()
-                soup = BeautifulSoup(response.content, 'html.parser')
+                logger.warning("JavaScript execution failed for %s, falling back to standard HTTP request", url)
+                run_report.record_error('Azure', 'JavaScriptRenderFailed')
+                tracing.set_attribute('scraper.fetch_method', 'http_fallback')
+                with run_report.stage('Azure', 'page_fetch'):
+                    response = http_get(url, timeout=15)
+                    tracing.set_attribute('http.response.status_code', response.status_code)
+                    response.raise_for_status()
+                run_report.add_bytes('Azure', 'page', len(response.content))
+                page_content = response.content
         else:
             # For non-Azure updates pages, use standard requests
-            response = requests.get(url, headers=USER_AGENT_HEADER, timeout=15)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
+            tracing.set_attribute('scraper.fetch_method', 'http')
+            with run_report.stage('Azure', 'page_fetch'):
+                response = http_get(url, timeout=15)
+                tracing.set_attribute('http.response.status_code', response.status_code)
+                response.raise_for_status()
+            run_report.add_bytes('Azure', 'page', len(response.content))
+            page_content = response.content
     except Exception as e:
-        print(f"Error fetching Azure page {url}: {e}")
+        run_report.record_error('Azure', e)
+        tracing.record_exception(e)
+        tracing.set_attribute(tracing.OUTCOME_ATTRIBUTE, 'fetch_error')
+        logger.error("Error fetching Azure page %s: %s", url, e)
         return None
 
+    parse_start = time.perf_counter()
+    soup = BeautifulSoup(page_content, 'html.parser')
+
     # Check for JSON-based content that might contain the data
     json_script_tags = soup.find_all('script', type='application/json') + soup.find_all('script', {'id': re.compile(r'__NEXT_DATA__')})
     content_html_source = None
@@ -605,7 +749,7 @@ def scrape_azure_update(url: str, rss_title: str, rss_pub_date: str, rss_metadat
                     # Handle common patterns in Azure JSON data
                     if json_data.get('props', {}).get('pageProps', {}).get('pageData'):
                         content_data = json_data['props']['pageProps']['pageData']
-                        print("DEBUG: Found pageData in JSON script tag.")
+                        logger.debug("Found pageData in JSON script tag.")
                         processed_via_json = True
                         
                         # Try to extract metadata from the JSON
@@ -628,7 +772,7 @@ def scrape_azure_update(url: str, rss_title: str, rss_pub_date: str, rss_metadat
                         
                         break
             except Exception as e:
-                print(f"DEBUG: Error processing JSON for Azure: {e}")
+                logger.debug("Error processing JSON for Azure: %s", e)
                 
     # print(f"\n--- HTML Snippet for Azure URL: {url} (first 150k chars) ---")
     # print(soup.prettify()[:150000]) 
@@ -676,7 +820,7 @@ def scrape_azure_update(url: str, rss_title: str, rss_pub_date: str, rss_metadat
         for a_tag in description_html_element.find_all('a', href=True):
             href = a_tag['href']; absolute_url = urljoin(url, href)
             if absolute_url not in links_list: links_list.append(absolute_url)
-    else: print(f"Warning: Azure description element not found for {url}")
+    else: logger.warning("Azure description element not found for %s", url)
     links_str = ",".join(links_list) if links_list else "N/A"
 
     # TODO: Verify/Refine these selectors for metadata area
@@ -685,7 +829,7 @@ def scrape_azure_update(url: str, rss_title: str, rss_pub_date: str, rss_metadat
         "div[data-bi-area='sidebar']", "div.column.medium-3", "div.col-md-3", "div.statusBoxes", "div.cloudInstance.section", "div.platforms.section"
     ]
     metadata_section_soup = next((soup.select_one(s) for s in metadata_container_selectors if soup.select_one(s)), soup) # Fallback to whole soup
-    if metadata_section_soup == soup: print(f"DEBUG: Azure metadata section not specifically found for {url}, using whole soup.")
+    if metadata_section_soup == soup: logger.debug("Azure metadata section not specifically found for %s, using whole soup.", url)
 
     status = _extract_azure_metadata_item(metadata_section_soup, "Status")
     update_type = _extract_azure_metadata_item(metadata_section_soup, "Update type")
@@ -695,6 +839,11 @@ def scrape_azure_update(url: str, rss_title: str, rss_pub_date: str, rss_metadat
     categories = _extract_azure_metadata_item(metadata_section_soup, "Categories") or \
                  _extract_azure_metadata_item(metadata_section_soup, "Category")
 
+    merge_start = time.perf_counter()
+    run_report.add_time('Azure', 'parse', merge_start - parse_start)
+    tracing.add_span('parse', parse_start, merge_start,
+                     {'scraper.content_source': 'next_data' if processed_via_json else 'html'})
+
     # Merge metadata from different sources with priority: 
     # 1. RSS feed metadata (most reliable for structured data)
     # 2. JSON metadata from the page
@@ -735,6 +884,9 @@ def scrape_azure_update(url: str, rss_title: str, rss_pub_date: str, rss_metadat
     
     # Final normalization of status for consistency
     final_status = normalize_azure_status(final_status)
+    merge_end = time.perf_counter()
+    run_report.add_time('Azure', 'metadata_merge', merge_end - merge_start)
+    tracing.add_span('metadata_merge', merge_start, merge_end, {'scraper.rss_metadata': bool(rss_metadata)})
     
     return {
         'title': title, 
@@ -786,6 +938,7 @@ def normalize_azure_status(status):
     return status
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.DEBUG, format='%(levelname)s: %(message)s')
     aws_rss_url = "https://aws.amazon.com/about-aws/whats-new/recent/feed/"
     print(f"\n--- Fetching AWS RSS feed from {aws_rss_url} to get a live test URL ---")
     live_test_url_aws, live_rss_title_aws, live_rss_pub_date_aws = None, None, None
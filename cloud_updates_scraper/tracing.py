@@ -0,0 +1,290 @@
+"""
+Span tracing for the cloud updates scraper.
+
+main.py --trace PATH records a span for every RSS feed fetch, update page scrape,
+JavaScript render (with the driver install, driver start, page load and selector wait
+inside it), page parse, metadata merge, Azure metadata fallback lookup and workbook row,
+so a slow item shows where its time went. Every scrape starts its own trace; the spans
+below it share its trace id and its url.full attribute. Each span carries
+scraper.outcome: ok, error, or what a function returning None means for it (no_data,
+not_found, failed).
+
+Spans are written to PATH as OpenTelemetry OTLP/JSON, one ExportTraceServiceRequest per
+line, the format of the OpenTelemetry Collector file exporter. The otlpjsonfile receiver
+of the collector can forward the file to Jaeger, Tempo or any OTLP backend, and it can
+be opened in otel-desktop-viewer. No OpenTelemetry package is needed.
+
+Without an active tracer span() returns a shared no-op span and the traced()
+functions call straight through after one global check, so an untraced run pays
+practically nothing.
+"""
+
+import os
+import json
+import time
+import random
+import inspect
+import threading
+import functools
+
+SERVICE_NAME = "cloud-updates-scraper"
+SCOPE_NAME = "cloud_updates_scraper"
+FLUSH_EVERY = 512  # finished spans buffered before they are written
+
+# OTLP span status codes
+STATUS_UNSET, STATUS_OK, STATUS_ERROR = 0, 1, 2
+SPAN_KIND_INTERNAL = 1
+
+URL_ATTRIBUTE = 'url.full'
+OUTCOME_ATTRIBUTE = 'scraper.outcome'
+
+_active_tracer = None
+
+def _any_value(value):
+    """Attribute value in OTLP/JSON form"""
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+def _key_values(attributes):
+    return [{'key': key, 'value': _any_value(value)} for key, value in attributes.items()]
+
+class Span:
+    __slots__ = ('tracer', 'name', 'trace_id', 'span_id', 'parent_id', 'attributes', 'events',
+                 'status_code', 'status_message', 'start_ns', 'end_ns')
+
+    def __init__(self, tracer, name, parent, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = parent.trace_id if parent else f"{random.getrandbits(128):032x}"
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = attributes
+        if parent and URL_ATTRIBUTE not in attributes and URL_ATTRIBUTE in parent.attributes:
+            attributes[URL_ATTRIBUTE] = parent.attributes[URL_ATTRIBUTE]
+        self.events = []
+        self.status_code = STATUS_UNSET
+        self.status_message = None
+        self.start_ns = None
+        self.end_ns = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def record_exception(self, error):
+        self.events.append({
+            'timeUnixNano': str(time.time_ns()),
+            'name': 'exception',
+            'attributes': _key_values({'exception.type': type(error).__name__, 'exception.message': str(error)}),
+        })
+        self.status_code = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    def __enter__(self):
+        self.start_ns = time.time_ns()
+        self.tracer._push(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.time_ns()
+        self.tracer._pop(self)
+        if exc is not None:
+            self.record_exception(exc)
+            self.attributes.setdefault(OUTCOME_ATTRIBUTE, 'error')
+        else:
+            self.attributes.setdefault(OUTCOME_ATTRIBUTE, 'ok')
+        self.tracer._finish(self)
+        return False
+
+    def to_otlp(self):
+        span = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': SPAN_KIND_INTERNAL,
+            'startTimeUnixNano': str(self.start_ns),
+            'endTimeUnixNano': str(self.end_ns),
+            'attributes': _key_values(self.attributes),
+            'status': {'code': self.status_code},
+        }
+        if self.parent_id:
+            span['parentSpanId'] = self.parent_id
+        if self.status_message:
+            span['status']['message'] = self.status_message
+        if self.events:
+            span['events'] = self.events
+        return span
+
+class _NoSpan:
+    """Stands in for a span while tracing is off"""
+
+    def set_attribute(self, key, value):
+        pass
+
+    def record_exception(self, error):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NO_SPAN = _NoSpan()
+
+class Tracer:
+    """Creates spans and exports the finished ones to an OTLP/JSON lines file"""
+
+    def __init__(self, path, service_name=SERVICE_NAME):
+        self.path = path
+        self.resource = {'attributes': _key_values({'service.name': service_name,
+                                                    'process.pid': os.getpid()})}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._finished = []
+        # perf_counter() readings of add_span are converted with this offset
+        self._wall_offset_ns = time.time_ns() - time.perf_counter_ns()
+        open(path, 'w', encoding='utf-8').close()
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def current_span(self):
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def _push(self, span):
+        self._stack().append(span)
+
+    def _pop(self, span):
+        stack = self._stack()
+        if stack and stack[-1] is span:
+            stack.pop()
+
+    def span(self, name, url=None, attributes=None):
+        attributes = dict(attributes) if attributes else {}
+        if url:
+            attributes[URL_ATTRIBUTE] = url
+        return Span(self, name, self.current_span(), attributes)
+
+    def add_span(self, name, start, end, attributes=None):
+        """Record a finished child span of the current span from two time.perf_counter() readings"""
+        span = Span(self, name, self.current_span(), dict(attributes) if attributes else {})
+        span.start_ns = int(start * 1e9) + self._wall_offset_ns
+        span.end_ns = int(end * 1e9) + self._wall_offset_ns
+        span.attributes.setdefault(OUTCOME_ATTRIBUTE, 'ok')
+        self._finish(span)
+
+    def _finish(self, span):
+        with self._lock:
+            self._finished.append(span)
+            if len(self._finished) < FLUSH_EVERY:
+                return
+            spans, self._finished = self._finished, []
+            self._write(spans)
+
+    def flush(self):
+        with self._lock:
+            spans, self._finished = self._finished, []
+            if spans:
+                self._write(spans)
+
+    def _write(self, spans):
+        """Append one ExportTraceServiceRequest line; called with the lock held"""
+        request = {'resourceSpans': [{
+            'resource': self.resource,
+            'scopeSpans': [{'scope': {'name': SCOPE_NAME}, 'spans': [span.to_otlp() for span in spans]}],
+        }]}
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(request, separators=(',', ':')) + "\n")
+
+def start_tracing(path, service_name=SERVICE_NAME):
+    """Make a new tracer writing to path the active one and return it"""
+    global _active_tracer
+    _active_tracer = Tracer(path, service_name)
+    return _active_tracer
+
+def stop_tracing():
+    """Write the remaining spans and deactivate the tracer"""
+    global _active_tracer
+    tracer, _active_tracer = _active_tracer, None
+    if tracer is not None:
+        tracer.flush()
+
+def flush():
+    """Write the finished spans of the active tracer now, e.g. after every watch mode poll"""
+    if _active_tracer is not None:
+        _active_tracer.flush()
+
+def enabled():
+    return _active_tracer is not None
+
+def span(name, url=None, attributes=None):
+    """Context manager for a span, a child of the current span of this thread if there is one"""
+    if _active_tracer is None:
+        return _NO_SPAN
+    return _active_tracer.span(name, url, attributes)
+
+def set_attribute(key, value):
+    """Set an attribute of the current span"""
+    if _active_tracer is None:
+        return
+    current = _active_tracer.current_span()
+    if current is not None:
+        current.set_attribute(key, value)
+
+def record_exception(error):
+    """Record a handled exception on the current span and mark the span as failed"""
+    if _active_tracer is None:
+        return
+    current = _active_tracer.current_span()
+    if current is not None:
+        current.record_exception(error)
+
+def add_span(name, start, end, attributes=None):
+    """Record a finished child span of the current span from two time.perf_counter() readings"""
+    if _active_tracer is not None:
+        _active_tracer.add_span(name, start, end, attributes)
+
+def traced(name=None, url_arg='url', none_outcome='no_data', arg_attributes=None):
+    """
+    Decorator running every call of the function in a span.
+
+    Args:
+        name: Span name (default: the function's qualified name)
+        url_arg: Parameter holding the URL, recorded as url.full
+        none_outcome: scraper.outcome when the function returns None
+        arg_attributes: {parameter: attribute} of further parameters to record
+    """
+    def decorate(function):
+        span_name = name or function.__qualname__
+        parameters = list(inspect.signature(function).parameters)
+        recorded = dict(arg_attributes or {})
+        if url_arg in parameters:
+            recorded[url_arg] = URL_ATTRIBUTE
+        positions = {parameter: parameters.index(parameter) for parameter in recorded}
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _active_tracer is None:
+                return function(*args, **kwargs)
+            attributes = {}
+            for parameter, attribute in recorded.items():
+                value = kwargs.get(parameter) if parameter in kwargs else (
+                    args[positions[parameter]] if positions[parameter] < len(args) else None)
+                if value is not None:
+                    attributes[attribute] = value
+            with _active_tracer.span(span_name, attributes=attributes) as current:
+                result = function(*args, **kwargs)
+                if result is None:
+                    current.attributes.setdefault(OUTCOME_ATTRIBUTE, none_outcome)
+                return result
+        return wrapper
+    return decorate
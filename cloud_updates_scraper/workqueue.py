@@ -0,0 +1,424 @@
+"""
+Coordinator/worker mode for the cloud updates scraper (main.py --coordinator / --worker).
+
+The coordinator lists the update URLs (from the RSS feeds, or from the archive listings
+with --backfill) into a durable SQLite queue and is the only process that writes the
+workbook. Workers claim items from the queue, scrape them and submit the records. Any
+number of workers can run, as threads, processes or on other hosts:
+
+*   on the same host (or a local disk they share) a worker opens the queue file itself
+    (--worker cloud_updates.queue.sqlite)
+*   on other hosts a worker talks to the coordinator, which serves the queue over HTTP
+    with --queue-port (--worker http://coordinator:8765). With a shared token
+    (CLOUD_UPDATES_QUEUE_TOKEN or --queue-token) the coordinator only accepts requests
+    that carry it, so other clients on the network cannot claim items or submit records.
+
+Claiming an item leases it to the worker for lease_seconds. A worker acks the item with
+its record, or fails it, and the item is queued again until it has been tried
+max_attempts times. When a worker crashes or loses its connection, its leases expire and
+other workers claim the items again. Acked records stay in the queue until the
+coordinator has written them, so a coordinator that is stopped can be started again on
+the same queue: URLs already in the queue are not queued twice, items that failed are
+tried again, and the records not yet in the workbook are written.
+"""
+
+import os
+import hmac
+import json
+import time
+import socket
+import ipaddress
+import sqlite3
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_MAX_ATTEMPTS = 3
+POLL_INTERVAL = 2.0
+SAVE_INTERVAL = 60.0
+SAVE_RECORDS = 1000
+# Shared secret of the coordinator and its remote workers, unless --queue-token is given
+QUEUE_TOKEN_ENV = 'CLOUD_UPDATES_QUEUE_TOKEN'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    provider TEXT NOT NULL,
+    item TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    record TEXT,
+    error TEXT,
+    written INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS items_state ON items (state, lease_expires);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+class WorkQueue:
+    """
+    SQLite work queue with leases. Items are keyed by URL and go from pending to leased
+    to done, or back to pending when they fail or their lease expires, until
+    max_attempts claims have failed.
+    """
+
+    def __init__(self, path, lease_seconds=DEFAULT_LEASE_SECONDS, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        db = sqlite3.connect(path, timeout=30)
+        try:
+            # WAL lets the coordinator read while workers write
+            db.execute('PRAGMA journal_mode=WAL')
+            db.executescript(SCHEMA)
+        finally:
+            db.close()
+
+    def _connect(self):
+        # One connection per call: the queue is used from several threads and processes
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        return _Transaction(db)
+
+    def enqueue(self, provider, items):
+        """Queue the items of a provider. URLs already in the queue are left alone. Returns the number queued"""
+        with self._connect() as db:
+            before = db.total_changes
+            db.executemany("INSERT OR IGNORE INTO items (url, provider, item) VALUES (?, ?, ?)",
+                           [(item['url'], provider, json.dumps(item, ensure_ascii=False)) for item in items])
+            return db.total_changes - before
+
+    def requeue_failed(self):
+        """Give the failed items a new set of attempts. Returns their number"""
+        with self._connect() as db:
+            return db.execute("UPDATE items SET state = 'pending', attempts = 0 WHERE state = 'failed'").rowcount
+
+    def set_closed(self, closed=True):
+        """Closed means the coordinator has queued everything: workers stop once the queue is empty"""
+        with self._connect() as db:
+            db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('closed', ?)", ('1' if closed else '0',))
+
+    def claim(self, worker_id, limit=1):
+        """Lease up to limit items to the worker. Returns [{'id', 'provider', 'item'}]"""
+        now = time.time()
+        with self._connect() as db:
+            # Expired leases of items that used up their attempts are not claimed again
+            db.execute("UPDATE items SET state = 'failed', error = 'lease expired', lease_owner = NULL "
+                       "WHERE state = 'leased' AND lease_expires < ? AND attempts >= ?", (now, self.max_attempts))
+            rows = db.execute("SELECT id, provider, item FROM items "
+                              "WHERE state = 'pending' OR (state = 'leased' AND lease_expires < ?) "
+                              "ORDER BY id LIMIT ?", (now, limit)).fetchall()
+            db.executemany("UPDATE items SET state = 'leased', attempts = attempts + 1, lease_owner = ?, "
+                           "lease_expires = ? WHERE id = ?",
+                           [(worker_id, now + self.lease_seconds, row[0]) for row in rows])
+        return [{'id': row[0], 'provider': row[1], 'item': json.loads(row[2])} for row in rows]
+
+    def ack(self, item_id, worker_id, record):
+        """Store the record of a claimed item. A late ack of an expired lease is still accepted"""
+        with self._connect() as db:
+            db.execute("UPDATE items SET state = 'done', record = ?, error = NULL, lease_owner = NULL, "
+                       "lease_expires = NULL WHERE id = ? AND state != 'done'",
+                       (json.dumps(record, ensure_ascii=False), item_id))
+
+    def fail(self, item_id, worker_id, error):
+        """Give a claimed item back, or mark it failed once it has used up its attempts"""
+        with self._connect() as db:
+            db.execute("UPDATE items SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                       "error = ?, lease_owner = NULL, lease_expires = NULL "
+                       "WHERE id = ? AND state = 'leased' AND lease_owner = ?",
+                       (self.max_attempts, str(error), item_id, worker_id))
+
+    def counts(self):
+        """{state: number of items}"""
+        with self._connect() as db:
+            counts = dict.fromkeys(('pending', 'leased', 'done', 'failed'), 0)
+            counts.update(db.execute("SELECT state, COUNT(*) FROM items GROUP BY state").fetchall())
+            return counts
+
+    def finished(self):
+        """True once the queue is closed and every item is done or failed"""
+        with self._connect() as db:
+            closed = db.execute("SELECT value FROM meta WHERE key = 'closed'").fetchone()
+            open_items = db.execute("SELECT COUNT(*) FROM items WHERE state IN ('pending', 'leased')").fetchone()[0]
+        return bool(closed and closed[0] == '1') and not open_items
+
+    def unwritten_records(self):
+        """[(id, provider, record)] of the done items the coordinator has not written yet"""
+        with self._connect() as db:
+            rows = db.execute("SELECT id, provider, record FROM items WHERE state = 'done' AND written = 0 "
+                              "ORDER BY id").fetchall()
+        return [(row[0], row[1], json.loads(row[2])) for row in rows]
+
+    def mark_written(self, ids):
+        with self._connect() as db:
+            db.executemany("UPDATE items SET written = 1 WHERE id = ?", [(item_id,) for item_id in ids])
+
+class _Transaction:
+    """Runs the statements of a with block in one write transaction, then closes the connection"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        # BEGIN IMMEDIATE takes the write lock up front, so two workers cannot claim the same item
+        self.db.execute('BEGIN IMMEDIATE')
+        return self.db
+
+    def __exit__(self, exc_type, exc, traceback):
+        try:
+            self.db.execute('ROLLBACK' if exc_type else 'COMMIT')
+        finally:
+            self.db.close()
+
+class RemoteQueue:
+    """The WorkQueue methods a worker needs, served by a coordinator started with --queue-port"""
+
+    def __init__(self, base_url, timeout=30, token=None):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        if token:
+            self.session.headers['Authorization'] = f"Bearer {token}"
+
+    def _call(self, method, **params):
+        response = self.session.post(f"{self.base_url}/{method}", json=params, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def claim(self, worker_id, limit=1):
+        return self._call('claim', worker_id=worker_id, limit=limit)['items']
+
+    def ack(self, item_id, worker_id, record):
+        self._call('ack', item_id=item_id, worker_id=worker_id, record=record)
+
+    def fail(self, item_id, worker_id, error):
+        self._call('fail', item_id=item_id, worker_id=worker_id, error=str(error))
+
+    def finished(self):
+        return self._call('finished')['finished']
+
+def open_queue(location, lease_seconds=DEFAULT_LEASE_SECONDS, max_attempts=DEFAULT_MAX_ATTEMPTS, token=None):
+    """A RemoteQueue for an http(s):// URL, otherwise the WorkQueue in that SQLite file"""
+    if location.startswith(('http://', 'https://')):
+        return RemoteQueue(location, token=token)
+    return WorkQueue(location, lease_seconds, max_attempts)
+
+def is_loopback(host):
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+def serve_queue(work_queue, port, host='127.0.0.1', token=None):
+    """
+    Serve claim/ack/fail/finished of the queue as JSON POSTs at http://host:port/<method>. Returns the server.
+    With a token only requests with the header "Authorization: Bearer <token>" are accepted.
+    """
+    if not token and not is_loopback(host):
+        logger.warning("The work queue is served on %s without a token: anyone who can reach port %s can claim "
+                       "items and submit records. Set %s or --queue-token.", host, port, QUEUE_TOKEN_ENV)
+    expected = f"Bearer {token}".encode('utf-8') if token else None
+    methods = {
+        'claim': lambda params: {'items': work_queue.claim(params['worker_id'], int(params.get('limit', 1)))},
+        'ack': lambda params: work_queue.ack(params['item_id'], params['worker_id'], params['record']),
+        'fail': lambda params: work_queue.fail(params['item_id'], params['worker_id'], params.get('error')),
+        'finished': lambda params: {'finished': work_queue.finished()},
+    }
+
+    class QueueHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if expected is not None:
+                given = (self.headers.get('Authorization') or '').encode('utf-8')
+                if not hmac.compare_digest(given, expected):
+                    self.send_error(401)
+                    return
+            method = methods.get(self.path.strip('/'))
+            if method is None:
+                self.send_error(404)
+                return
+            try:
+                params = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+                data = json.dumps(method(params) or {}).encode('utf-8')
+            except (ValueError, KeyError, TypeError) as e:
+                self.send_error(400, str(e))
+                return
+            except sqlite3.Error as e:
+                logger.error("Work queue request %s failed: %s", self.path, e)
+                self.send_error(503, str(e))
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), QueueHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def run_worker(work_queue, process_items, workers=1, worker_id=None, poll_interval=POLL_INTERVAL):
+    """
+    Claim, scrape and ack items until the coordinator has closed the queue and it is empty.
+
+    Args:
+        work_queue: WorkQueue or RemoteQueue
+        process_items: {provider: function scraping one item, returning the record or None}
+        workers: Items scraped in parallel; this many are claimed at a time
+        worker_id: Name of this worker in the leases (default: host-pid)
+
+    Returns:
+        (scraped, failed) item counts
+    """
+    worker_id = worker_id or default_worker_id()
+    scraped = failed = 0
+    logger.info("Worker %s started with %s threads.", worker_id, workers)
+
+    def scrape(claimed):
+        try:
+            record = process_items[claimed['provider']](claimed['item'])
+        except Exception as e:
+            record, error = None, e
+        else:
+            error = 'no data'
+        if record:
+            work_queue.ack(claimed['id'], worker_id, record)
+        else:
+            work_queue.fail(claimed['id'], worker_id, error)
+        return bool(record)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        while True:
+            try:
+                batch = work_queue.claim(worker_id, max(1, workers))
+                if not batch:
+                    if work_queue.finished():
+                        break
+                    time.sleep(poll_interval)
+                    continue
+                results = list(executor.map(scrape, batch))
+            except (requests.RequestException, sqlite3.Error) as e:
+                # The leases of this batch expire and the items are claimed again
+                logger.error("Work queue unavailable: %s", e)
+                time.sleep(poll_interval)
+                continue
+            scraped += sum(results)
+            failed += len(results) - sum(results)
+    logger.info("Worker %s finished: %s items scraped, %s failed.", worker_id, scraped, failed)
+    return scraped, failed
+
+def run_coordinator(work_queue, batches, write_records, save, poll_interval=POLL_INTERVAL,
+                    save_interval=SAVE_INTERVAL, save_records=SAVE_RECORDS):
+    """
+    Queue the items and write the submitted records until every item is done or failed.
+
+    Records are marked written in the queue only after the output was saved, so records of
+    a failed save are saved again by the next save, or written again by a restarted coordinator.
+
+    Args:
+        work_queue: WorkQueue
+        batches: Iterable of (provider, items) to queue
+        write_records: write_records(provider, records) adds records to the output; it is
+            only called from this thread, so the output has a single writer
+        save: save() saves the output and returns False if it could not be saved
+        poll_interval: Seconds between collecting the records
+        save_interval: Seconds between saves while records come in; the output is also saved
+            once save_records records are waiting, and at the end
+
+    Returns:
+        The item counts by state
+    """
+    work_queue.set_closed(False)
+    requeued = work_queue.requeue_failed()
+    if requeued:
+        logger.info("Retrying %s items that failed in an earlier run.", requeued)
+    for provider, items in batches:
+        queued = work_queue.enqueue(provider, items)
+        logger.info("Queued %s new %s items (%s listed).", queued, provider, len(items))
+    work_queue.set_closed()
+
+    last_counts = None
+    unsaved_ids = set()  # written to the output but not saved yet
+    last_save = time.monotonic()
+    while True:
+        # Check before collecting, so records submitted in between are collected on the next pass
+        finished = work_queue.finished()
+        records = [entry for entry in work_queue.unwritten_records() if entry[0] not in unsaved_ids]
+        if records:
+            for provider in dict.fromkeys(provider for _, provider, _ in records):
+                write_records(provider, [record for _, record_provider, record in records if record_provider == provider])
+            unsaved_ids.update(item_id for item_id, _, _ in records)
+        if unsaved_ids and (finished or len(unsaved_ids) >= save_records
+                            or time.monotonic() - last_save >= save_interval):
+            last_save = time.monotonic()
+            if save():
+                work_queue.mark_written(unsaved_ids)
+                unsaved_ids.clear()
+            else:
+                logger.error("%s records are not saved yet; retrying in %s seconds.", len(unsaved_ids), save_interval)
+        counts = work_queue.counts()
+        if counts != last_counts:
+            logger.info("Queue: %s pending, %s leased, %s done, %s failed.",
+                        counts['pending'], counts['leased'], counts['done'], counts['failed'])
+            last_counts = counts
+        if finished:
+            if unsaved_ids:
+                logger.error("%s records could not be saved; start the coordinator again to write them.", len(unsaved_ids))
+            return counts
+        time.sleep(poll_interval)
+
+if __name__ == '__main__':
+    # Offline check: a coordinator and worker threads on the benchmark fixture server. One
+    # worker claims items and "crashes" without acking them; their leases expire and the
+    # other workers scrape them.
+    import sys
+    import tempfile
+    import benchmark
+    import main as scraper_main
+    from openpyxl import load_workbook
+
+    server, base_url = benchmark.start_fixture_server()
+    scraper_main.AWS_RSS_URL = f"{base_url}/aws/feed?size=30"
+    scraper_main.AZURE_RSS_URL = f"{base_url}/azure/feed?size=30"
+    with tempfile.TemporaryDirectory() as workdir:
+        scraper_main.EXCEL_FILENAME = os.path.join(workdir, 'cloud_updates.xlsx')
+        queue_path = os.path.join(workdir, 'cloud_updates.queue.sqlite')
+        os.environ[QUEUE_TOKEN_ENV] = 'harness-token'
+        sys.argv = ['main.py', '--coordinator', queue_path, '--queue-port', '8765', '--lease-seconds', '3', '--quiet']
+        coordinator = threading.Thread(target=scraper_main.main)
+        coordinator.start()
+        while not os.path.exists(queue_path) or not WorkQueue(queue_path).counts()['pending']:
+            time.sleep(0.1)
+        try:
+            RemoteQueue('http://127.0.0.1:8765').claim('intruder', 5)
+        except requests.HTTPError as e:
+            print(f"Claim without the token: {e.response.status_code}")
+        crashed = RemoteQueue('http://127.0.0.1:8765', token='harness-token').claim('crashed-worker', 5)
+        print(f"Crashed worker left {len(crashed)} leased items")
+        process_items = {feed[0]: feed[3] for feed in scraper_main.registered_feeds()}
+        workers = [threading.Thread(target=run_worker, args=(open_queue(location, token='harness-token'), process_items, 2, f"worker-{n}", 0.5))
+                   for n, location in enumerate([queue_path, 'http://127.0.0.1:8765'])]
+        for worker in workers:
+            worker.start()
+        for thread in workers + [coordinator]:
+            thread.join()
+        sheet = load_workbook(scraper_main.EXCEL_FILENAME)['Updates']
+        urls = [row[0] for row in sheet.iter_rows(min_row=2, min_col=3, max_col=3, values_only=True)]
+        print(f"{len(urls)} rows, {len(set(urls))} distinct URLs, queue: {WorkQueue(queue_path).counts()}")
+    server.shutdown()
@@ -0,0 +1,181 @@
+"""
+Benchmark pdf2excel on synthetic price books of growing page counts.
+
+Generates price book PDFs with synthetic_pdf.py (10, 100 and 1000 pages by default) and
+converts each one in a fresh process, timing the three stages separately:
+
+*   extract - word extraction and line grouping of every page (iter_page_lines)
+*   match   - line classification and the item state machine
+*   write   - streaming the items to the Excel file
+
+The peak RSS is recorded after each stage (the process high-water mark so far), and the
+extracted items are checked against the generator's ground truth; the exit status is 1
+if any run extracted different items. Results are written to JSON for comparing versions.
+
+Usage: python benchmark.py [--pages 10 100 1000] [--backends pdfplumber pdfium] [--jobs 1]
+                           [--workdir <dir>] [--output benchmark_results.json]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import contextlib
+import subprocess
+from datetime import datetime
+
+try:
+    import resource  # Not available on Windows
+except ImportError:
+    resource = None
+
+from pdf2excel import load_config, LineClassifier, ItemStateMachine, StreamingExcelWriter, iter_page_lines
+from extraction_backends import available_backends
+from synthetic_pdf import generate
+
+ITEM_FIELDS = ["Section", "Item", "Description", "Unit Price", "Cut-Off"]
+
+def peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def count_mismatches(expected, extracted):
+    """Number of positions where the extracted item differs from the expected one, plus the count difference"""
+    mismatches = abs(len(expected) - len(extracted))
+    for expected_item, item in zip(expected, extracted):
+        if any(expected_item[field] != item.get(field) for field in ITEM_FIELDS):
+            mismatches += 1
+    return mismatches
+
+def run_once(pdf_path, config_path, items_path, backend, jobs):
+    """Convert one generated PDF stage by stage and return the measurements"""
+    config = load_config(config_path)
+    classifier = LineClassifier(config)
+    output_path = os.path.splitext(pdf_path)[0] + f'-{backend}.xlsx'
+    stages = {}
+
+    start = time.perf_counter()
+    pages = [(page_num, lines) for page_num, _, lines
+             in iter_page_lines(pdf_path, jobs, config.get('body_bbox'), classifier, None, backend)]
+    stages['extract'] = {'seconds': time.perf_counter() - start, 'peak_rss_bytes': peak_rss_bytes()}
+
+    start = time.perf_counter()
+    items = []
+    machine = ItemStateMachine(classifier, items.append)
+    for _, lines in pages:
+        for line in lines:
+            if line.strip():
+                machine.feed(line)
+    machine.finish()
+    stages['match'] = {'seconds': time.perf_counter() - start, 'peak_rss_bytes': peak_rss_bytes()}
+
+    start = time.perf_counter()
+    writer = StreamingExcelWriter(output_path)
+    for item in items:
+        writer.write_item(item)
+    writer.close()
+    stages['write'] = {'seconds': time.perf_counter() - start, 'peak_rss_bytes': peak_rss_bytes()}
+
+    with open(items_path, 'r', encoding='utf-8') as f:
+        expected = json.load(f)
+    total_seconds = sum(stage['seconds'] for stage in stages.values())
+    for stage in stages.values():
+        stage['seconds'] = round(stage['seconds'], 3)
+    return {
+        'pages': len(pages),
+        'backend': backend,
+        'jobs': jobs,
+        'items': len(items),
+        'expected_items': len(expected),
+        'mismatches': count_mismatches(expected, items),
+        'seconds': round(total_seconds, 3),
+        'pages_per_sec': round(len(pages) / total_seconds, 2) if total_seconds else None,
+        'stages': stages,
+    }
+
+def run_in_subprocess(pdf_path, config_path, items_path, backend, jobs):
+    with tempfile.TemporaryDirectory() as result_dir:
+        result_path = os.path.join(result_dir, 'result.json')
+        command = [sys.executable, os.path.abspath(__file__), '--run-one', pdf_path, config_path, items_path,
+                   '--backends', backend, '--jobs', str(jobs), '--result-file', result_path]
+        subprocess.run(command, check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        with open(result_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+def prepare_pdf(workdir, pages):
+    """Generate the price book of the given page count unless the work directory already has it"""
+    pdf_path = os.path.join(workdir, f'price_book_{pages}.pdf')
+    base = os.path.splitext(pdf_path)[0]
+    config_path, items_path = base + '.config', base + '.items.json'
+    if not all(os.path.exists(path) for path in (pdf_path, config_path, items_path)):
+        print(f"Generating {pages} page price book...")
+        generate(pages, pdf_path)
+    return pdf_path, config_path, items_path
+
+def print_results(runs):
+    print(f"\n{'Pages':>6} {'Backend':<11} {'Items':>6} {'Extract s':>10} {'Match s':>8} {'Write s':>8} "
+          f"{'Pages/s':>8} {'Peak RSS MB':>11} {'Check':>6}")
+    for run in runs:
+        stages = run['stages']
+        rss = stages['write']['peak_rss_bytes']
+        rss = f"{rss / (1024 * 1024):.1f}" if rss else 'n/a'
+        check = 'OK' if run['mismatches'] == 0 else f"{run['mismatches']} bad"
+        print(f"{run['pages']:>6} {run['backend']:<11} {run['items']:>6} {stages['extract']['seconds']:>10.2f} "
+              f"{stages['match']['seconds']:>8.2f} {stages['write']['seconds']:>8.2f} {run['pages_per_sec'] or 0:>8.1f} "
+              f"{rss:>11} {check:>6}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark pdf2excel on synthetic price books')
+    parser.add_argument('--pages', type=int, nargs='+', default=[10, 100, 1000], help='Page counts (default: 10 100 1000)')
+    parser.add_argument('--backends', nargs='+', choices=available_backends(), default=['pdfplumber'],
+                        help='Extraction backends to benchmark (default: pdfplumber)')
+    parser.add_argument('--jobs', type=int, default=1, help='Worker processes for page extraction (default: 1)')
+    parser.add_argument('--workdir', help='Directory for the generated PDFs; existing ones are reused (default: a temporary directory)')
+    parser.add_argument('--output', default='benchmark_results.json', help='JSON results file (default: benchmark_results.json)')
+    # Internal: a single measured run, started by the driver in a fresh process
+    parser.add_argument('--run-one', nargs=3, metavar=('PDF', 'CONFIG', 'ITEMS'), help=argparse.SUPPRESS)
+    parser.add_argument('--result-file', help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if args.run_one:
+        result = run_once(*args.run_one, args.backends[0], max(1, args.jobs))
+        with open(args.result_file, 'w', encoding='utf-8') as f:
+            json.dump(result, f)
+        return
+
+    with contextlib.ExitStack() as stack:
+        workdir = args.workdir or stack.enter_context(tempfile.TemporaryDirectory())
+        os.makedirs(workdir, exist_ok=True)
+        runs = []
+        for pages in args.pages:
+            pdf_path, config_path, items_path = prepare_pdf(workdir, pages)
+            for backend in args.backends:
+                print(f"Converting {pages} pages with {backend}...")
+                runs.append(run_in_subprocess(pdf_path, config_path, items_path, backend, max(1, args.jobs)))
+
+    print_results(runs)
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'runs': runs,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to {args.output}")
+
+    failed = [run for run in runs if run['mismatches']]
+    if failed:
+        print(f"{len(failed)} runs extracted items that differ from the ground truth.")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
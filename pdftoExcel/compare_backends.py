@@ -0,0 +1,87 @@
+"""
+Compare the text extraction backends of pdf2excel on a PDF.
+
+Runs the full extraction with every backend, reports how long each took and lists
+the items that differ from the first (reference) backend. Exits with status 1 if
+any backend produced different items, so a new engine is only switched to when its
+output matches.
+
+Usage: python compare_backends.py <pdf_filename> [--backends pdfplumber pdfium] [--config <path>] [--show 20]
+"""
+
+import os
+import sys
+import time
+import difflib
+import argparse
+
+from pdf2excel import extract_data_from_pdf, load_config, LineClassifier
+from extraction_backends import available_backends
+
+ITEM_FIELDS = ["Section", "Item", "Description", "Unit Price", "Cut-Off"]
+
+def run_backend(pdf_path, backend, config, classifier):
+    """Extract the items with one backend. Returns (items, seconds)"""
+    start = time.perf_counter()
+    items, _ = extract_data_from_pdf(pdf_path, collect_raw_lines=False, config=config,
+                                     classifier=classifier, backend=backend)
+    return items, time.perf_counter() - start
+
+def diff_items(reference, candidate):
+    """Return a list of (operation, reference items, candidate items) for the differing item ranges"""
+    reference_rows = [tuple(item.get(field) for field in ITEM_FIELDS) for item in reference]
+    candidate_rows = [tuple(item.get(field) for field in ITEM_FIELDS) for item in candidate]
+    matcher = difflib.SequenceMatcher(a=reference_rows, b=candidate_rows, autojunk=False)
+    return [(operation, reference_rows[a0:a1], candidate_rows[b0:b1])
+            for operation, a0, a1, b0, b1 in matcher.get_opcodes() if operation != 'equal']
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare pdf2excel extraction backends on a PDF')
+    parser.add_argument('pdf_path', help='PDF file to extract')
+    parser.add_argument('--backends', nargs='+', choices=available_backends(), default=available_backends(),
+                        help='Backends to compare; the first one is the reference (default: all installed)')
+    parser.add_argument('--config', help='Path to the config file (default: pdf2excel.config)')
+    parser.add_argument('--show', type=int, default=20, help='Number of differences to print per backend (default: 20)')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.pdf_path):
+        print(f"Error: File '{args.pdf_path}' not found.")
+        sys.exit(1)
+
+    config = load_config(args.config)
+    classifier = LineClassifier(config)
+    results = {}
+    for backend in args.backends:
+        print(f"Extracting with {backend}...")
+        results[backend] = run_backend(args.pdf_path, backend, config, classifier)
+
+    reference_name = args.backends[0]
+    reference_items, reference_seconds = results[reference_name]
+    print(f"\n{'Backend':<12} {'Seconds':>9} {'Speedup':>8} {'Items':>7} {'Differences':>12}")
+    all_match = True
+    differences = {}
+    for backend in args.backends:
+        items, seconds = results[backend]
+        differences[backend] = diff_items(reference_items, items) if backend != reference_name else []
+        changed = sum(max(len(old), len(new)) for _, old, new in differences[backend])
+        all_match = all_match and not differences[backend]
+        print(f"{backend:<12} {seconds:>9.2f} {reference_seconds / seconds if seconds else 0:>7.1f}x {len(items):>7} {changed:>12}")
+
+    for backend, backend_differences in differences.items():
+        if not backend_differences:
+            continue
+        print(f"\nDifferences between {reference_name} and {backend}:")
+        for operation, old, new in backend_differences[:args.show]:
+            print(f"  {operation}:")
+            for row in old:
+                print(f"    - {row}")
+            for row in new:
+                print(f"    + {row}")
+        if len(backend_differences) > args.show:
+            print(f"  ... {len(backend_differences) - args.show} more")
+
+    print("\nAll backends produced the same items." if all_match else "\nThe backends produced different items.")
+    sys.exit(0 if all_match else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Text extraction backends for pdf2excel.
+
+Every backend opens one PDF and returns the positioned words of a page as dicts with
+'text', 'x0', 'x1', 'top' and 'bottom' (points, origin at the top-left corner of the
+page), which is the structure pdf2excel groups into lines. extract_text returns the
+plain text of a page for quick checks that do not need word positions.
+
+*   pdfplumber - the original engine, accurate but slow (pdfminer layout in pure Python)
+*   pdfium     - pypdfium2 (installed together with pdfplumber), reads the character
+                 boxes from the PDFium C library and builds the words itself
+"""
+
+import importlib.util
+from importlib import metadata
+
+PDFIUM_AVAILABLE = importlib.util.find_spec("pypdfium2") is not None
+
+# Backend used for quick plain text passes over a PDF (profile fingerprinting)
+TEXT_BACKEND = "pdfium" if PDFIUM_AVAILABLE else "pdfplumber"
+
+# Characters closer than these distances (points) are joined into one word, as in pdfplumber's defaults
+WORD_X_TOLERANCE = 3
+WORD_Y_TOLERANCE = 3
+
+def _package_version(name):
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+class PdfplumberBackend:
+    name = "pdfplumber"
+
+    def __init__(self, pdf_path):
+        import pdfplumber
+        self.pdf = pdfplumber.open(pdf_path)
+        self.version = _package_version("pdfplumber")
+
+    @property
+    def page_count(self):
+        return len(self.pdf.pages)
+
+    def page_size(self, page_num):
+        page = self.pdf.pages[page_num - 1]
+        return page.width, page.height
+
+    def extract_words(self, page_num, body_bbox=None):
+        page = self.pdf.pages[page_num - 1]
+        if body_bbox:
+            x0, top, x1, bottom = body_bbox
+            page_x0, page_top, page_x1, page_bottom = page.bbox
+            clamped = (max(x0, page_x0), max(top, page_top), min(x1, page_x1), min(bottom, page_bottom))
+            if clamped[0] < clamped[2] and clamped[1] < clamped[3]:
+                # within_bbox only keeps characters that lie completely inside the body
+                page = page.within_bbox(clamped)
+        words = page.extract_words(keep_blank_chars=True)
+        # Release the parsed layout objects, otherwise pdfplumber keeps them until the PDF is closed
+        self.pdf.pages[page_num - 1].close()
+        # Only the fields used for line grouping are kept; this keeps cache entries and worker results small
+        return [{'text': word['text'], 'x0': word['x0'], 'x1': word['x1'], 'top': word['top'], 'bottom': word['bottom']}
+                for word in words]
+
+    def extract_text(self, page_num):
+        page = self.pdf.pages[page_num - 1]
+        text = page.extract_text() or ''
+        page.close()
+        return text
+
+    def close(self):
+        self.pdf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class PdfiumBackend:
+    name = "pdfium"
+
+    def __init__(self, pdf_path):
+        import pypdfium2
+        import pypdfium2.raw as pdfium_c
+        self.pdfium_c = pdfium_c
+        self.pdf = pypdfium2.PdfDocument(pdf_path)
+        self.version = _package_version("pypdfium2")
+
+    @property
+    def page_count(self):
+        return len(self.pdf)
+
+    def page_size(self, page_num):
+        page = self.pdf[page_num - 1]
+        try:
+            return page.get_width(), page.get_height()
+        finally:
+            page.close()
+
+    def extract_words(self, page_num, body_bbox=None):
+        page = self.pdf[page_num - 1]
+        textpage = page.get_textpage()
+        try:
+            height = page.get_height()
+            words = []
+            word = None
+            for index in range(textpage.count_chars()):
+                # Skip the spaces and line breaks PDFium inserts on its own
+                if self.pdfium_c.FPDFText_IsGenerated(textpage.raw, index):
+                    continue
+                char = chr(self.pdfium_c.FPDFText_GetUnicode(textpage.raw, index))
+                if char in '\r\n':
+                    continue
+                # Loose boxes use the font ascent/descent, so all characters of a line share top and bottom
+                left, low, right, high = textpage.get_charbox(index, loose=True)
+                top, bottom = height - high, height - low
+                if body_bbox and not (left >= body_bbox[0] and right <= body_bbox[2]
+                                      and top >= body_bbox[1] and bottom <= body_bbox[3]):
+                    continue
+                if (word is not None and abs(top - word['top']) <= WORD_Y_TOLERANCE
+                        and word['x1'] - WORD_X_TOLERANCE <= left <= word['x1'] + WORD_X_TOLERANCE):
+                    word['text'] += char
+                    word['x1'] = right
+                    word['bottom'] = max(word['bottom'], bottom)
+                    continue
+                if word is not None:
+                    words.append(word)
+                word = {'text': char, 'x0': left, 'x1': right, 'top': top, 'bottom': bottom}
+            if word is not None:
+                words.append(word)
+            # pdfplumber does not return words that are only blank characters
+            return [word for word in words if word['text'].strip()]
+        finally:
+            textpage.close()
+            page.close()
+
+    def extract_text(self, page_num):
+        page = self.pdf[page_num - 1]
+        textpage = page.get_textpage()
+        try:
+            return textpage.get_text_range().replace('\r\n', '\n')
+        finally:
+            textpage.close()
+            page.close()
+
+    def close(self):
+        self.pdf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+BACKENDS = {
+    PdfplumberBackend.name: PdfplumberBackend,
+    PdfiumBackend.name: PdfiumBackend,
+}
+
+def available_backends():
+    """Names of the backends whose libraries are installed"""
+    return [name for name in BACKENDS if name != PdfiumBackend.name or PDFIUM_AVAILABLE]
+
+def open_backend(name, pdf_path):
+    """Open a PDF with the named backend"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown extraction backend '{name}'. Available: {', '.join(available_backends())}")
+    return BACKENDS[name](pdf_path)
@@ -0,0 +1,126 @@
+"""
+On-disk cache for pdf2excel page extraction results.
+
+Entries are small JSON files stored under a directory per PDF content hash, so a
+re-run on the same PDF (even after renaming or moving it) can skip the pdfminer
+layout of every page it has already seen. The cache size is bounded; when it grows
+past the limit the least recently used entries are removed.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import time
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'pdf2excel')
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+# Temporary files this old were left by a run that crashed while writing an entry
+STALE_TEMP_SECONDS = 3600
+
+class ExtractionCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0  # entries written since the last prune
+
+    @staticmethod
+    def hash_file(path):
+        """SHA-256 of the file content"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _path(self, pdf_hash, name):
+        return os.path.join(self.cache_dir, pdf_hash[:2], pdf_hash, name + '.json')
+
+    def contains(self, pdf_hash, name):
+        return os.path.exists(self._path(pdf_hash, name))
+
+    def get(self, pdf_hash, name):
+        """Return the cached data or None. A hit marks the entry as recently used"""
+        path = self._path(pdf_hash, name)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)  # LRU order is based on the modification time
+        except OSError:
+            pass
+        self.hits += 1
+        return data
+
+    def put(self, pdf_hash, name, data):
+        path = self._path(pdf_hash, name)
+        temp_path = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temporary file first so concurrent runs never read a partial entry
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(temp_path, path)
+            self.writes += 1
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning("Could not write cache entry %s: %s", path, e)
+            if temp_path is not None:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+
+    def prune(self):
+        """
+        Remove the least recently used entries until the cache is within max_bytes, and
+        temporary files left by crashed runs. Does nothing if no entry was written since the
+        last prune, so runs that only read the cache do not walk it.
+        """
+        if not self.writes:
+            return 0
+        self.writes = 0
+        entries = []
+        total = 0
+        stale_before = time.time() - STALE_TEMP_SECONDS
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if name.endswith('.tmp'):
+                    if stat.st_mtime < stale_before:
+                        try:
+                            os.remove(path)
+                            continue
+                        except OSError:
+                            pass
+                    total += stat.st_size  # in use by another run
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        if total <= self.max_bytes:
+            return 0
+
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        logger.info("Removed %s old entries from the extraction cache", removed)
+        return removed
@@ -20,21 +20,70 @@ limitations under the License.
 """
 
 import re
-import pandas as pd
-import pdfplumber
 import sys
 import os
 import json
+import argparse
+import tempfile
+import glob
+import csv
+import time
+import hashlib
+import logging
+import importlib.util
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from extraction_cache import ExtractionCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES
+from extraction_backends import open_backend, available_backends, TEXT_BACKEND
+import profiling
+import logging_setup
 
-def load_config():
+logger = logging.getLogger(__name__)
+
+# XlsxWriter's constant_memory mode is the fastest streaming writer; openpyxl's write-only mode is the fallback
+XLSXWRITER_AVAILABLE = importlib.util.find_spec("xlsxwriter") is not None
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Raw lines kept in memory before the rest are spilled to a temporary file
+RAW_LINES_SPILL_THRESHOLD = 100000
+
+# Words whose top is within this many points of a line's first word belong to that line
+LINE_Y_THRESHOLD = 2
+
+# Bump when the format or content of cached page words changes
+PAGE_CACHE_VERSION = 1
+
+# Text extraction engine used unless --backend says otherwise
+DEFAULT_BACKEND = 'pdfplumber'
+
+# [SECTION] keyword for "any upper-case line is a section heading"
+UPPERCASE_SECTION = 'UPPERCASE'
+
+# Section rules used when the config file has no [SECTION], [START] or [EXCLUDE] block
+DEFAULT_SECTION_RULES = {
+    'section_patterns': [UPPERCASE_SECTION],
+    'start_patterns': ['APPLIANCES'],
+    'exclude_patterns': ['A', 'TBD', 'OPTION SELECTIONS', '7D']
+}
+
+def load_config(config_path=None):
     """Load configuration from pdf2excel.config file"""
-    config_path = os.path.join(os.path.dirname(__file__), 'pdf2excel.config')
+    if config_path is None:
+        config_path = os.path.join(os.path.dirname(__file__), 'pdf2excel.config')
     
     if not os.path.exists(config_path):
-        print("\nError: Configuration file not found!")
-        print(f"Please create a file named 'pdf2excel.config' in the same directory as this script: {os.path.dirname(__file__)}")
-        print("\nThe config file should be a text file with the following structure:")
-        print("""
+        logger.error("Configuration file not found!")
+        logger.error("Please create a file named 'pdf2excel.config' in the same directory as this script: %s", os.path.dirname(__file__))
+        logger.error("The config file should be a text file with the following structure:")
+        logger.error("""\
 # Header patterns - one per line
 [HEADER]
 pattern1
@@ -48,6 +97,23 @@ pattern2
 # Item line pattern - single line
 [ITEM]
 your_item_pattern
+
+# Optional section heading patterns - one per line, UPPERCASE means any upper-case line
+[SECTION]
+UPPERCASE
+
+# Optional section headings that start the extraction - one per line
+# (an empty block starts at the first section)
+[START]
+pattern1
+
+# Optional lines that are never section headings - one per line
+[EXCLUDE]
+pattern1
+
+# Optional page body region - 'auto' or x0, top, x1, bottom in points
+[BODY]
+auto
         """)
         sys.exit(1)
     
@@ -55,183 +121,682 @@ your_item_pattern
         config = {
             'header_patterns': [],
             'footer_patterns': [],
-            'item_line_pattern': None
+            'item_line_pattern': None,
+            'section_patterns': [],
+            'start_patterns': [],
+            'exclude_patterns': [],
+            'body_bbox': None
+        }
+        list_sections = {
+            '[HEADER]': 'header_patterns',
+            '[FOOTER]': 'footer_patterns',
+            '[SECTION]': 'section_patterns',
+            '[START]': 'start_patterns',
+            '[EXCLUDE]': 'exclude_patterns'
         }
         
         current_section = None
+        seen_sections = set()
         with open(config_path, 'r') as f:
             for line in f:
                 line = line.strip()
                 if not line or line.startswith('#'):
                     continue
                     
-                if line == '[HEADER]':
-                    current_section = 'header_patterns'
-                elif line == '[FOOTER]':
-                    current_section = 'footer_patterns'
+                if line in list_sections:
+                    current_section = list_sections[line]
+                    seen_sections.add(current_section)
                 elif line == '[ITEM]':
                     current_section = 'item_line_pattern'
+                elif line == '[BODY]':
+                    current_section = 'body_bbox'
                 elif current_section == 'item_line_pattern':
                     config['item_line_pattern'] = line
-                elif current_section in ['header_patterns', 'footer_patterns']:
+                elif current_section == 'body_bbox':
+                    config['body_bbox'] = parse_body_bbox(line)
+                elif current_section in list_sections.values():
                     config[current_section].append(line)
         
         # Validate required fields
         if not config['header_patterns']:
-            print("\nError: No header patterns found in config file!")
+            logger.error("No header patterns found in config file!")
             sys.exit(1)
         if not config['footer_patterns']:
-            print("\nError: No footer patterns found in config file!")
+            logger.error("No footer patterns found in config file!")
             sys.exit(1)
         if not config['item_line_pattern']:
-            print("\nError: No item line pattern found in config file!")
+            logger.error("No item line pattern found in config file!")
             sys.exit(1)
+        # Config files written before the section rules were configurable keep the old behaviour;
+        # otherwise a missing [START] starts at the first section and a missing [EXCLUDE] excludes nothing
+        if not seen_sections & set(DEFAULT_SECTION_RULES):
+            config.update({key: list(default) for key, default in DEFAULT_SECTION_RULES.items()})
+        if not config['section_patterns']:
+            config['section_patterns'] = [UPPERCASE_SECTION]
         
         return config
     except Exception as e:
-        print(f"\nError reading configuration file: {str(e)}")
+        logger.error("Error reading configuration file: %s", e)
         sys.exit(1)
 
-# Function to extract data from the PDF
-def extract_data_from_pdf(pdf_path):
-    print(f"Opening PDF file: {pdf_path}")
-    extracted_data = []
-    raw_lines = []  # Store all non-empty lines
-    current_section = None
-    found_first_section = False  # Flag to track if we've found the first section
-    pending_item = None  # Store the current item being processed
-    pending_description_lines = []  # Store all text lines between items
-    
-    # Load configuration
-    config = load_config()
-    
-    # Get patterns from config
-    header_patterns = config['header_patterns']
-    footer_patterns = config['footer_patterns']
-    item_line_pattern = config['item_line_pattern']
-    
-    # Combine all patterns to ignore
-    ignore_patterns = header_patterns + footer_patterns
-    
-    def save_pending_item():
-        """Helper function to save the pending item with any accumulated description"""
-        nonlocal pending_item, pending_description_lines
-        if pending_item:
+def load_profiles(profiles_dir):
+    """Load every *.config file of a directory as a named config profile (the file name without .config)"""
+    profile_paths = sorted(glob.glob(os.path.join(profiles_dir, '*.config')))
+    if not profile_paths:
+        logger.error("No *.config profiles found in %s", profiles_dir)
+        sys.exit(1)
+    profiles = {}
+    for profile_path in profile_paths:
+        name = os.path.splitext(os.path.basename(profile_path))[0]
+        profiles[name] = load_config(profile_path)
+    logger.info("Loaded %s config profiles: %s", len(profiles), ', '.join(profiles))
+    return profiles
+
+class ProfileSelector:
+    """
+    Picks the config profile for a PDF from the plain text of its first page.
+    
+    Each profile is scored by the number of its header/footer patterns found on the page, ties
+    broken by the share of its patterns found. The page text is read with the quickest installed
+    backend and no words are laid out, so selecting costs a fraction of the real extraction.
+    A PDF that matches no profile, or two profiles equally well, is left for a human to sort.
+    """
+    
+    def __init__(self, profiles):
+        self.profiles = profiles
+        self.patterns = {name: [re.compile(pattern) for pattern in config['header_patterns'] + config['footer_patterns']]
+                         for name, config in profiles.items()}
+    
+    def score(self, lines):
+        """Returns {profile name: (pattern hits, share of the patterns hit)}"""
+        scores = {}
+        for name, regexes in self.patterns.items():
+            hits = sum(1 for regex in regexes if any(regex.search(line) for line in lines))
+            scores[name] = (hits, hits / len(regexes) if regexes else 0.0)
+        return scores
+    
+    def select(self, pdf_path):
+        """Returns (profile name, error) - the name is None when no profile or more than one fits"""
+        with open_backend(TEXT_BACKEND, pdf_path) as doc:
+            lines = [line.strip() for line in doc.extract_text(1).splitlines() if line.strip()] if doc.page_count else []
+        scores = self.score(lines)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        best_name, best_score = ranked[0]
+        if best_score[0] == 0:
+            return None, "No config profile matches the first page"
+        tied = [name for name, score in ranked if score == best_score]
+        if len(tied) > 1:
+            return None, f"Ambiguous config profile: {', '.join(tied)} match {best_score[0]} patterns each"
+        return best_name, None
+
+def parse_body_bbox(value):
+    """Parse the [BODY] config value: 'auto' or 'x0, top, x1, bottom' in points"""
+    if value.lower() == 'auto':
+        return 'auto'
+    try:
+        x0, top, x1, bottom = (float(part) for part in value.split(','))
+    except ValueError:
+        logger.error("Invalid [BODY] value '%s'. Expected 'auto' or 'x0, top, x1, bottom'.", value)
+        sys.exit(1)
+    if x0 >= x1 or top >= bottom:
+        logger.error("Invalid [BODY] value '%s'. The region has no area.", value)
+        sys.exit(1)
+    return (x0, top, x1, bottom)
+
+class LineClassifier:
+    """
+    Classifies text lines as 'header', 'footer', 'section', 'item' or 'text'.
+    
+    The header, footer, section and item patterns from the config are compiled once into a
+    single alternation with named groups, so each line is matched with one regex call instead
+    of one re.search per header/footer pattern plus separate section and item checks.
+    Header/footer patterns match anywhere in the line, section/start/exclude patterns must match
+    the whole line and the item pattern must match at its start.
+    """
+    
+    def __init__(self, config):
+        self.header_patterns = list(config['header_patterns'])
+        self.footer_patterns = list(config['footer_patterns'])
+        self.item_regex = re.compile(config['item_line_pattern'])
+        
+        section_patterns = config.get('section_patterns') or [UPPERCASE_SECTION]
+        self.uppercase_sections = UPPERCASE_SECTION in section_patterns
+        section_patterns = [pattern for pattern in section_patterns if pattern != UPPERCASE_SECTION]
+        self.exclude_regex = self._compile_full_match(config.get('exclude_patterns', []))
+        self.start_regex = self._compile_full_match(config.get('start_patterns', []))
+        
+        header_alternation = '|'.join(f'(?:{pattern})' for pattern in config['header_patterns'])
+        footer_alternation = '|'.join(f'(?:{pattern})' for pattern in config['footer_patterns'])
+        section_branch = ''
+        if section_patterns:
+            section_branch = '|(?P<section>' + '|'.join(f'(?:{pattern})' for pattern in section_patterns) + r')\Z'
+        try:
+            # The first branch behaves like re.search for the header/footer patterns,
+            # the last like re.match for the item pattern
+            self.combined_regex = re.compile(
+                f'(?:.*?(?:(?P<header>{header_alternation})|(?P<footer>{footer_alternation})))'
+                f'{section_branch}'
+                f'|(?P<item>{config["item_line_pattern"]})'
+            )
+            # Index of the first capturing group of the item pattern within combined_regex.groups()
+            self.item_group_offset = self.combined_regex.groupindex['item']
+        except re.error as e:
+            # e.g. the config patterns use their own 'header'/'item' group names
+            logger.warning("Could not combine config patterns into one regex (%s), matching them separately", e)
+            self.combined_regex = None
+            self.header_regexes = [re.compile(pattern) for pattern in config['header_patterns']]
+            self.footer_regexes = [re.compile(pattern) for pattern in config['footer_patterns']]
+            self.section_regex = self._compile_full_match(section_patterns)
+    
+    @staticmethod
+    def _compile_full_match(patterns):
+        if not patterns:
+            return None
+        return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns))
+    
+    def is_excluded(self, line):
+        return self.exclude_regex is not None and self.exclude_regex.fullmatch(line) is not None
+    
+    def is_start_section(self, line):
+        """True if the section heading starts the extraction (any section when there are no [START] patterns)"""
+        return self.start_regex is None or self.start_regex.fullmatch(line) is not None
+    
+    def classify(self, line):
+        """Returns (kind, item_groups) - item_groups holds the item pattern's groups for 'item' lines, otherwise None"""
+        if self.combined_regex is not None:
+            match = self.combined_regex.match(line)
+            if match:
+                if match.start('header') != -1:
+                    return 'header', None
+                if match.start('footer') != -1:
+                    return 'footer', None
+            is_section = match is not None and 'section' in self.combined_regex.groupindex and match.start('section') != -1
+        else:
+            if any(regex.search(line) for regex in self.header_regexes):
+                return 'header', None
+            if any(regex.search(line) for regex in self.footer_regexes):
+                return 'footer', None
+            match = self.item_regex.match(line)
+            is_section = self.section_regex is not None and self.section_regex.fullmatch(line) is not None
+        
+        # Section headings take precedence over item lines
+        if is_section or (self.uppercase_sections and line.isupper()):
+            if not self.is_excluded(line):
+                return 'section', None
+            if is_section and self.combined_regex is not None:
+                # The section branch won, so the item branch was never tried
+                match = self.item_regex.match(line)
+                if match:
+                    return 'item', match.groups()
+                return 'text', None
+        
+        if match:
+            if self.combined_regex is not None:
+                return 'item', match.groups()[self.item_group_offset:self.item_group_offset + self.item_regex.groups]
+            return 'item', match.groups()
+        return 'text', None
+
+class ItemStateMachine:
+    """
+    Turns classified lines into items. Lines before the start section are skipped, every item
+    line starts a new item and the text lines that follow it become the item's description.
+    """
+    
+    def __init__(self, classifier, on_item):
+        self.classifier = classifier
+        self.on_item = on_item
+        self.current_section = None
+        self.found_first_section = False  # Flag to track if we've found the first section
+        self.pending_item = None  # Store the current item being processed
+        self.pending_description_lines = []  # Store all text lines between items
+        self.item_count = 0
+    
+    def save_pending_item(self):
+        """Save the pending item with any accumulated description"""
+        if self.pending_item:
             # If there are pending description lines, combine them
-            if pending_description_lines:
-                pending_item["Description"] = " ".join(pending_description_lines)
-            extracted_data.append(pending_item)
-            print(f"Saved item: {pending_item['Item']}")
+            if self.pending_description_lines:
+                self.pending_item["Description"] = " ".join(self.pending_description_lines)
+            self.on_item(self.pending_item)
+            self.item_count += 1
+            logger.debug("Saved item: %s", self.pending_item['Item'])
             # Reset pending data
-            pending_item = None
-            pending_description_lines = []
+            self.pending_item = None
+            self.pending_description_lines = []
     
-    print("Starting to process pages...")
-    with pdfplumber.open(pdf_path) as pdf:
-        for page_num, page in enumerate(pdf.pages, 1):
-            print(f"Processing page {page_num}/{len(pdf.pages)}")
-            
-            # Extract words with their formatting
-            words = page.extract_words(keep_blank_chars=True)
-            
-            # Group words into lines
-            current_line = []
-            current_y = None
-            lines = []
+    def feed(self, line):
+        """Process one non-empty line"""
+        kind, item_groups = self.classifier.classify(line)
+        
+        # Skip header/footer lines
+        if kind in ('header', 'footer'):
+            return
+        
+        if kind == 'section':
+            if not self.found_first_section and self.classifier.is_start_section(line):
+                self.found_first_section = True
+                self.current_section = line
+                logger.info("Found first section: %s", self.current_section)
+            elif self.found_first_section:
+                # Save any pending item before starting new section
+                self.save_pending_item()
+                self.current_section = line
+                logger.info("Found section: %s", self.current_section)
+            return
+        
+        # Skip all lines before the first section
+        if not self.found_first_section:
+            return
+        
+        # Check for item line pattern (item, cutoff, and price on same line)
+        if kind == 'item':
+            # Save any pending item before starting new one
+            self.save_pending_item()
             
-            for word in words:
-                if current_y is None:
-                    current_y = word['top']
-                
-                # If y position changes significantly, we're on a new line
-                if abs(word['top'] - current_y) > 2:  # threshold for new line
-                    if current_line:
-                        line_text = ' '.join(word['text'] for word in current_line)
-                        lines.append(line_text.strip())
-                    current_line = [word]
-                    current_y = word['top']
+            # Create new item from the matched components
+            item_text, price = item_groups
+            self.pending_item = {
+                "Section": self.current_section,
+                "Item": item_text.strip(),
+                "Description": None,
+                "Unit Price": price.strip(),
+                "Cut-Off": "A"
+            }
+            return
+        
+        # If we get here, this is a text line between items
+        # Add it to pending description lines
+        self.pending_description_lines.append(line)
+    
+    def finish(self):
+        # Don't forget to save the last pending item
+        self.save_pending_item()
+
+def group_words_into_line_words(words):
+    """
+    Group words into lines by their vertical position. Returns a list of word lists, one per line.
+    
+    Words are sorted by their top coordinate first, so the result does not depend on the order
+    pdfplumber returns them in (e.g. on multi-column pages). A line starts at its topmost word and
+    takes every word whose top is within LINE_Y_THRESHOLD of it; the words of each line are ordered
+    left to right.
+    """
+    if not words:
+        return []
+    if NUMPY_AVAILABLE:
+        return _group_words_numpy(words)
+    
+    sorted_words = sorted(words, key=lambda word: word['top'])
+    current_line = []
+    current_y = None
+    lines = []
+    
+    for word in sorted_words:
+        if current_y is None:
+            current_y = word['top']
+        
+        # If y position changes significantly, we're on a new line
+        if word['top'] - current_y > LINE_Y_THRESHOLD:
+            lines.append(sorted(current_line, key=lambda word: word['x0']))
+            current_line = [word]
+            current_y = word['top']
+        else:
+            current_line.append(word)
+    
+    # Don't forget the last line
+    lines.append(sorted(current_line, key=lambda word: word['x0']))
+    return lines
+
+def _group_words_numpy(words):
+    """NumPy version of group_words_into_line_words: sorts and splits all words of a page in bulk"""
+    count = len(words)
+    tops = np.fromiter((word['top'] for word in words), dtype=float, count=count)
+    x0s = np.fromiter((word['x0'] for word in words), dtype=float, count=count)
+    by_top = np.argsort(tops, kind='stable')
+    sorted_tops = tops[by_top]
+    
+    # For every word, the index of the first word more than LINE_Y_THRESHOLD below it.
+    # A line ends where the next line starts, so only the chain from word 0 is followed.
+    next_line_start = np.searchsorted(sorted_tops, sorted_tops + LINE_Y_THRESHOLD, side='right').tolist()
+    line_starts = [0]
+    start = next_line_start[0]
+    while start < count:
+        line_starts.append(start)
+        start = next_line_start[start]
+    
+    # Order by line, then left to right within the line
+    line_ids = np.zeros(count, dtype=np.int64)
+    line_ids[line_starts[1:]] = 1
+    line_ids = np.cumsum(line_ids)
+    order = by_top[np.lexsort((x0s[by_top], line_ids))].tolist()
+    
+    bounds = line_starts[1:] + [count]
+    return [[words[index] for index in order[begin:end]] for begin, end in zip(line_starts, bounds)]
+
+def group_words_into_lines(words):
+    """Group words into text lines by their vertical position"""
+    return [' '.join(word['text'] for word in line_words).strip()
+            for line_words in group_words_into_line_words(words)]
+
+def detect_body_bbox(doc, classifier, sample_pages=3):
+    """
+    Find the body region from the first pages: below the lowest header line in the
+    top half of the page and above the highest footer line in the bottom half.
+    Returns None if no header or footer lines were found.
+    """
+    header_bottom = None
+    footer_top = None
+    width = height = None
+    for page_num in range(1, min(sample_pages, doc.page_count) + 1):
+        width, height = doc.page_size(page_num)
+        for line_words in group_words_into_line_words(doc.extract_words(page_num)):
+            line = ' '.join(word['text'] for word in line_words).strip()
+            kind, _ = classifier.classify(line)
+            line_top = min(word['top'] for word in line_words)
+            line_bottom = max(word['bottom'] for word in line_words)
+            if kind == 'header' and line_bottom < height / 2:
+                header_bottom = line_bottom if header_bottom is None else max(header_bottom, line_bottom)
+            elif kind == 'footer' and line_top > height / 2:
+                footer_top = line_top if footer_top is None else min(footer_top, line_top)
+    
+    if header_bottom is None and footer_top is None:
+        return None
+    # Leave a small margin so descenders of the last header line are not picked up
+    return (0, header_bottom + 1 if header_bottom is not None else 0,
+            width, footer_top - 1 if footer_top is not None else height)
+
+def parse_page_ranges(value):
+    """Parse a page selection like '1-5,8,12-' into [(first, last), ...]; last is None for an open range"""
+    page_ranges = []
+    for part in value.split(','):
+        part = part.strip()
+        match = re.fullmatch(r'(\d+)(?:\s*(-)\s*(\d*))?', part)
+        if not match or int(match.group(1)) < 1:
+            raise argparse.ArgumentTypeError(f"invalid page range '{part}' (use e.g. 1-5,8,12-)")
+        first = int(match.group(1))
+        if match.group(2) is None:
+            last = first
+        else:
+            last = int(match.group(3)) if match.group(3) else None
+        if last is not None and last < first:
+            raise argparse.ArgumentTypeError(f"invalid page range '{part}': the last page is before the first")
+        page_ranges.append((first, last))
+    return page_ranges
+
+def resolve_page_ranges(page_ranges, total_pages):
+    """Sorted page numbers selected by page_ranges within the document; every page when page_ranges is None"""
+    if page_ranges is None:
+        return list(range(1, total_pages + 1))
+    pages = set()
+    for first, last in page_ranges:
+        pages.update(range(first, min(last or total_pages, total_pages) + 1))
+    return sorted(pages)
+
+def prescan_page_range(pdf_path, classifier, page_ranges=None):
+    """
+    Find the pages worth a full word extraction with a quick plain text pass: from the page with
+    the start section to the last page with item lines. Pages before the start section are dropped
+    by the extraction anyway. Text after the last item line is no longer added to that item's description.
+    
+    Returns [(first, last)] within page_ranges, or page_ranges unchanged if the start section is not
+    found in the plain text (its line breaks can differ from the word layout).
+    """
+    first_page = last_page = None
+    with open_backend(TEXT_BACKEND, pdf_path) as doc:
+        pages = resolve_page_ranges(page_ranges, doc.page_count)
+        for page_num in pages:
+            for line in doc.extract_text(page_num).splitlines():
+                line = line.strip()
+                if not line:
+                    continue
+                kind, _ = classifier.classify(line)
+                if first_page is None:
+                    if kind == 'section' and classifier.is_start_section(line):
+                        first_page = page_num
+                elif kind == 'item':
+                    last_page = page_num
+    
+    if first_page is None:
+        logger.info("Prescan did not find the start section, extracting all selected pages")
+        return page_ranges
+    if last_page is None:
+        # No item lines in the plain text; let the full extraction decide
+        last_page = pages[-1]
+    logger.info("Prescan: items are on pages %s-%s of %s selected pages", first_page, last_page, len(pages))
+    return [(page_num, page_num) for page_num in pages if first_page <= page_num <= last_page]
+
+def _extract_pages_worker(pdf_path, page_numbers, body_bbox=None, backend=DEFAULT_BACKEND):
+    """Process pool worker: extract the words of a chunk of pages. Returns [(page_num, words), ...]"""
+    with open_backend(backend, pdf_path) as doc:
+        return [(page_num, doc.extract_words(page_num, body_bbox)) for page_num in page_numbers]
+
+def _page_cache_name(doc, page_num, body_bbox):
+    """Cache entry name of a page; changes whenever something that affects the extracted words changes"""
+    settings = json.dumps([PAGE_CACHE_VERSION, doc.name, doc.version, body_bbox])
+    return f"p{page_num}-{hashlib.sha1(settings.encode('utf-8')).hexdigest()[:12]}"
+
+def _words_to_cache(words):
+    return [[word['text'], word['x0'], word['x1'], word['top'], word['bottom']] for word in words]
+
+def _words_from_cache(entry):
+    return [{'text': text, 'x0': x0, 'x1': x1, 'top': top, 'bottom': bottom} for text, x0, x1, top, bottom in entry]
+
+def resolve_body_bbox(doc, body_bbox, classifier, cache=None, pdf_hash=None):
+    """Turn the 'auto' body setting into a bounding box, reusing a cached detection when possible"""
+    if body_bbox != 'auto':
+        return body_bbox
+    cache_name = None
+    if cache is not None:
+        patterns = json.dumps([PAGE_CACHE_VERSION, doc.name, doc.version,
+                               classifier.header_patterns, classifier.footer_patterns])
+        cache_name = f"body-{hashlib.sha1(patterns.encode('utf-8')).hexdigest()[:12]}"
+        cached = cache.get(pdf_hash, cache_name)
+        if cached is not None:
+            return tuple(cached['bbox']) if cached['bbox'] else None
+    
+    body_bbox = detect_body_bbox(doc, classifier)
+    if body_bbox:
+        logger.info("Detected page body region: x0=%.1f, top=%.1f, x1=%.1f, bottom=%.1f", body_bbox[0], body_bbox[1], body_bbox[2], body_bbox[3])
+    else:
+        logger.info("Could not detect the page body region, extracting full pages")
+    if cache_name:
+        cache.put(pdf_hash, cache_name, {'bbox': body_bbox})
+    return body_bbox
+
+def iter_page_lines(pdf_path, jobs=1, body_bbox=None, classifier=None, cache=None, backend=DEFAULT_BACKEND,
+                    page_ranges=None):
+    """
+    Yield (page_num, total_pages, lines) for every page in document order, or only for the
+    pages selected by page_ranges ([(first, last), ...], see parse_page_ranges).
+    With jobs > 1 the word extraction runs in a process pool, results are still
+    yielded in page order.
+    
+    body_bbox crops each page before word extraction; 'auto' detects it from the
+    header/footer lines of the first pages (requires classifier).
+    
+    With an ExtractionCache, pages extracted by an earlier run of the same PDF content
+    are read from the cache and only the remaining pages are laid out.
+    
+    backend names the text extraction engine, see extraction_backends.
+    """
+    pdf_hash = cache.hash_file(pdf_path) if cache is not None else None
+    
+    def cached_words(page_num):
+        if cache is None:
+            return None
+        entry = cache.get(pdf_hash, cache_names[page_num])
+        return _words_from_cache(entry) if entry is not None else None
+    
+    def store_words(page_num, words):
+        if cache is not None:
+            cache.put(pdf_hash, cache_names[page_num], _words_to_cache(words))
+    
+    with open_backend(backend, pdf_path) as doc:
+        total_pages = doc.page_count
+        pages = resolve_page_ranges(page_ranges, total_pages)
+        body_bbox = resolve_body_bbox(doc, body_bbox, classifier, cache, pdf_hash)
+        cache_names = {page_num: _page_cache_name(doc, page_num, body_bbox) for page_num in pages}
+        if cache is not None:
+            missing_pages = [page_num for page_num in pages if not cache.contains(pdf_hash, cache_names[page_num])]
+            if len(missing_pages) < len(pages):
+                logger.info("Reusing cached layout for %s of %s pages", len(pages) - len(missing_pages), len(pages))
+        else:
+            missing_pages = list(pages)
+        
+        if jobs <= 1 or len(missing_pages) < 2:
+            for page_num in pages:
+                words = cached_words(page_num)
+                if words is None:
+                    words = doc.extract_words(page_num, body_bbox)
+                    store_words(page_num, words)
+                yield page_num, total_pages, group_words_into_lines(words)
+            return
+    
+    # Several small chunks per worker keep the pool busy without re-opening the PDF for every page
+    chunk_size = max(1, -(-len(missing_pages) // (jobs * 4)))
+    chunks = [missing_pages[start:start + chunk_size] for start in range(0, len(missing_pages), chunk_size)]
+    logger.info("Extracting %s pages with %s worker processes", len(missing_pages), jobs)
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        def extract_in_order():
+            # At most jobs * 2 chunks in flight, so the words of pages far ahead of the
+            # writer do not pile up in this process
+            pending_chunks = iter(chunks)
+            in_flight = deque()
+            for chunk in pending_chunks:
+                in_flight.append(executor.submit(_extract_pages_worker, pdf_path, chunk, body_bbox, backend))
+                if len(in_flight) >= jobs * 2:
+                    break
+            while in_flight:
+                chunk_result = in_flight.popleft().result()
+                next_chunk = next(pending_chunks, None)
+                if next_chunk is not None:
+                    in_flight.append(executor.submit(_extract_pages_worker, pdf_path, next_chunk, body_bbox, backend))
+                yield from chunk_result
+        
+        extracted = extract_in_order()
+        missing = set(missing_pages)
+        for page_num in pages:
+            words = cached_words(page_num) if page_num not in missing else None
+            if words is None:
+                if page_num not in missing:
+                    # The cache entry disappeared since the check above
+                    words = _extract_pages_worker(pdf_path, [page_num], body_bbox, backend)[0][1]
                 else:
-                    current_line.append(word)
-            
-            # Don't forget the last line
-            if current_line:
-                line_text = ' '.join(word['text'] for word in current_line)
-                lines.append(line_text.strip())
-            
-            # Process lines
-            i = 0
-            while i < len(lines):
-                line = lines[i]
-                
+                    extracted_page_num, words = next(extracted)
+                    if extracted_page_num != page_num:
+                        raise RuntimeError(f"Extracted page {extracted_page_num} while expecting page {page_num}")
+                store_words(page_num, words)
+            yield page_num, total_pages, group_words_into_lines(words)
+
+class RawLineStore:
+    """Collects raw lines for the debug sheet, spilling them to a temporary file once there are too many to keep in memory"""
+    
+    def __init__(self, spill_threshold=RAW_LINES_SPILL_THRESHOLD):
+        self.spill_threshold = spill_threshold
+        self.lines = []
+        self.spill_file = None
+        self.spilled_count = 0
+    
+    def append(self, raw_line):
+        self.lines.append(raw_line)
+        if len(self.lines) >= self.spill_threshold:
+            if self.spill_file is None:
+                self.spill_file = tempfile.TemporaryFile(mode='w+', encoding='utf-8')
+                logger.info("Raw lines exceed %s, spilling them to a temporary file", self.spill_threshold)
+            for entry in self.lines:
+                self.spill_file.write(json.dumps(entry) + "\n")
+            self.spilled_count += len(self.lines)
+            self.lines = []
+    
+    def __len__(self):
+        return self.spilled_count + len(self.lines)
+    
+    def __iter__(self):
+        if self.spill_file is not None:
+            self.spill_file.flush()
+            self.spill_file.seek(0)
+            for entry in self.spill_file:
+                yield json.loads(entry)
+            self.spill_file.seek(0, os.SEEK_END)
+        yield from self.lines
+    
+    def close(self):
+        if self.spill_file is not None:
+            self.spill_file.close()
+            self.spill_file = None
+
+# Function to extract data from the PDF
+def extract_data_from_pdf(pdf_path, jobs=1, collect_raw_lines=True, on_item=None, config=None, classifier=None, cache=None,
+                          backend=DEFAULT_BACKEND, page_ranges=None, prescan=False):
+    """
+    Extract the items from a PDF.
+    
+    Args:
+        pdf_path: Path to the input PDF
+        jobs: Number of worker processes used for page extraction
+        collect_raw_lines: Keep every non-empty line for the 'Raw Lines' debug sheet
+        on_item: Optional callback receiving each item as soon as it is complete. Items passed
+                 to the callback are not kept in the returned list, so memory stays flat.
+        config: Loaded configuration, read from pdf2excel.config when not given
+        classifier: Pre-built LineClassifier for the configuration
+        cache: Optional ExtractionCache for the per-page word extraction
+        backend: Name of the text extraction backend, see extraction_backends
+        page_ranges: Only extract these pages, [(first, last), ...] as returned by parse_page_ranges
+        prescan: Narrow the pages down to the item pages with a quick plain text pass first
+    
+    Returns:
+        (extracted_data, raw_lines) - raw_lines is None when collect_raw_lines is False
+    """
+    logger.info("Opening PDF file: %s", pdf_path)
+    extracted_data = []
+    raw_lines = RawLineStore() if collect_raw_lines else None  # Store all non-empty lines
+    
+    # Load configuration and compile its patterns
+    if config is None:
+        config = load_config()
+    if classifier is None:
+        classifier = LineClassifier(config)
+    machine = ItemStateMachine(classifier, on_item or extracted_data.append)
+    if prescan:
+        with profiling.stage('prescan'):
+            page_ranges = prescan_page_range(pdf_path, classifier, page_ranges)
+    
+    logger.info("Starting to process pages...")
+    pages = iter_page_lines(pdf_path, jobs, config.get('body_bbox'), classifier, cache, backend, page_ranges)
+    for page_num, total_pages, lines in profiling.staged_iter('extract', pages):
+        logger.info("Processing page %s/%s", page_num, total_pages)
+        
+        with profiling.stage('match'):
+            for line in lines:
                 # Skip empty lines
                 if not line.strip():
-                    i += 1
                     continue
                 
                 # Store raw line
-                raw_lines.append({"Page": page_num, "Line": line})
-                
-                # Skip header/footer lines
-                should_skip = False
-                for pattern in ignore_patterns:
-                    if re.search(pattern, line):
-                        should_skip = True
-                        break
-                if should_skip:
-                    i += 1
-                    continue
-                
-                # Check if this is a section heading (exclude 'A' and 'TBD')
-                if line.isupper() and line not in ["A", "TBD", "OPTION SELECTIONS", "7D"]:
-                    if not found_first_section and line == "APPLIANCES":
-                        found_first_section = True
-                        current_section = line
-                        print(f"Found first section: {current_section}")
-                    elif found_first_section:
-                        # Save any pending item before starting new section
-                        save_pending_item()
-                        current_section = line
-                        print(f"Found section: {current_section}")
-                    i += 1
-                    continue
+                if raw_lines is not None:
+                    raw_lines.append({"Page": page_num, "Line": line})
                 
-                # Skip all lines before the first section
-                if not found_first_section:
-                    i += 1
-                    continue
-                
-                # Check for item line pattern (item, cutoff, and price on same line)
-                match = re.match(item_line_pattern, line)
-                if match:
-                    # Save any pending item before starting new one
-                    save_pending_item()
-                    
-                    # Create new item from the matched components
-                    item_text, price = match.groups()
-                    pending_item = {
-                        "Section": current_section,
-                        "Item": item_text.strip(),
-                        "Description": None,
-                        "Unit Price": price.strip(),
-                        "Cut-Off": "A"
-                    }
-                    i += 1
-                    continue
-                
-                # If we get here, this is a text line between items
-                # Add it to pending description lines
-                pending_description_lines.append(line)
-                i += 1
+                machine.feed(line)
+    
+    with profiling.stage('match'):
+        machine.finish()
     
-    # Don't forget to save the last pending item
-    save_pending_item()
+    if cache is not None:
+        cache.prune()
     
-    print(f"Extraction complete. Found {len(extracted_data)} items total.")
+    logger.info("Extraction complete. Found %s items total.", machine.item_count)
     return extracted_data, raw_lines
 
 # Function to save data to Excel
 def save_to_excel(processed_data, raw_lines, output_path, debug_mode=False):
-    print(f"Saving data to Excel file: {output_path}")
+    """Write collected items with pandas (only used with --pandas; pandas is imported here on demand)"""
+    try:
+        import pandas as pd
+    except ImportError:
+        logger.error("pandas is not installed. Run: pip install pandas, or leave out --pandas.")
+        sys.exit(1)
+    
+    logger.info("Saving data to Excel file: %s", output_path)
     
     # Create a pandas DataFrame from the processed data
     df = pd.DataFrame(processed_data)
@@ -243,43 +808,376 @@ def save_to_excel(processed_data, raw_lines, output_path, debug_mode=False):
         
         # If in debug mode, write raw lines to second sheet
         if debug_mode and raw_lines:
-            df_raw = pd.DataFrame(raw_lines)
+            df_raw = pd.DataFrame(list(raw_lines))
             df_raw.to_excel(writer, sheet_name='Raw Lines', index=False)
     
-    print("Excel file saved successfully.")
+    logger.info("Excel file saved successfully.")
 
-def print_usage():
-    print("Usage: python pdf2excel.py <pdf_filename> [-debug]")
-    print("Example: python pdf2excel.py input.pdf")
-    print("Example with debug: python pdf2excel.py input.pdf -debug")
-    sys.exit(1)
+class StreamingExcelWriter:
+    """
+    Writes items to the 'Processed Data' sheet as they are extracted, without keeping them in memory.
+    Uses XlsxWriter's constant_memory mode when it is installed, otherwise openpyxl's write-only mode.
+    """
+    
+    COLUMNS = ["Section", "Item", "Description", "Unit Price", "Cut-Off"]
+    
+    def __init__(self, output_path, engine=None):
+        self.output_path = output_path
+        self.engine = engine or ('xlsxwriter' if XLSXWRITER_AVAILABLE else 'openpyxl')
+        logger.info("Streaming data to Excel file: %s (using %s)", output_path, self.engine)
+        if self.engine == 'xlsxwriter':
+            import xlsxwriter
+            self.workbook = xlsxwriter.Workbook(output_path, {'constant_memory': True})
+            self.header_format = self.workbook.add_format({'bold': True})
+        else:
+            self.workbook = Workbook(write_only=True)
+        self.sheet, self.row = self._add_sheet('Processed Data', self.COLUMNS)
+    
+    def _add_sheet(self, name, headers):
+        """Create a sheet with a bold header row. Returns (sheet, next row index)"""
+        if self.engine == 'xlsxwriter':
+            sheet = self.workbook.add_worksheet(name)
+            sheet.write_row(0, 0, headers, self.header_format)
+        else:
+            sheet = self.workbook.create_sheet(name)
+            header_cells = []
+            for header in headers:
+                cell = WriteOnlyCell(sheet, value=header)
+                cell.font = Font(bold=True)
+                header_cells.append(cell)
+            sheet.append(header_cells)
+        return sheet, 1
+    
+    def _write_row(self, sheet, row, values):
+        if self.engine == 'xlsxwriter':
+            sheet.write_row(row, 0, values)
+        else:
+            sheet.append(values)
+    
+    def write_item(self, item):
+        self._write_row(self.sheet, self.row, [item.get(column) for column in self.COLUMNS])
+        self.row += 1
+    
+    def write_raw_lines(self, raw_lines):
+        raw_sheet, row = self._add_sheet('Raw Lines', ["Page", "Line"])
+        for raw_line in raw_lines:
+            self._write_row(raw_sheet, row, [raw_line["Page"], raw_line["Line"]])
+            row += 1
+    
+    def close(self):
+        if self.engine == 'xlsxwriter':
+            self.workbook.close()
+        else:
+            self.workbook.save(self.output_path)
+        logger.info("Excel file saved successfully.")
+
+def convert_pdf(pdf_path, output_path=None, debug_mode=False, stream=True, jobs=1, config=None, classifier=None, cache=None,
+                backend=DEFAULT_BACKEND, page_ranges=None, prescan=False):
+    """
+    Convert one PDF to an Excel file next to it (or at output_path).
+    Items are streamed to the Excel file as they are found; stream=False collects them
+    first and writes them with pandas.
+    
+    Returns:
+        (output_path, item_count)
+    """
+    # Generate output filename based on input filename
+    if output_path is None:
+        output_path = os.path.splitext(pdf_path)[0] + ".xlsx"
+    logger.info("Output will be saved to: %s", output_path)
+    
+    if stream:
+        # Items go straight to the write-only workbook instead of being collected first
+        with profiling.stage('write'):
+            writer = StreamingExcelWriter(output_path)
+        item_count = 0
+        
+        def write_item(item):
+            nonlocal item_count
+            writer.write_item(item)
+            item_count += 1
+        
+        _, raw_lines = extract_data_from_pdf(pdf_path, jobs=jobs, collect_raw_lines=debug_mode,
+                                             on_item=profiling.staged('write', write_item), config=config,
+                                             classifier=classifier, cache=cache, backend=backend,
+                                             page_ranges=page_ranges, prescan=prescan)
+        with profiling.stage('write'):
+            if debug_mode and raw_lines:
+                writer.write_raw_lines(raw_lines)
+            writer.close()
+    else:
+        # Extract data from PDF
+        processed_data, raw_lines = extract_data_from_pdf(pdf_path, jobs=jobs, collect_raw_lines=debug_mode,
+                                                          config=config, classifier=classifier, cache=cache,
+                                                          backend=backend, page_ranges=page_ranges, prescan=prescan)
+        item_count = len(processed_data)
+        
+        # Save extracted data to Excel
+        with profiling.stage('write'):
+            save_to_excel(processed_data, raw_lines, output_path, debug_mode)
+    
+    if raw_lines is not None:
+        raw_lines.close()
+    return output_path, item_count
+
+# --- Batch mode ---
+
+# Compiled once per batch worker process by _init_batch_worker
+_batch_config = None
+_batch_classifier = None
+_batch_cache = None
+_batch_backend = DEFAULT_BACKEND
+_batch_profiles = None
+_batch_profile_classifiers = None
+_batch_profile_selector = None
+_batch_page_ranges = None
+_batch_prescan = False
+
+def _init_batch_worker(config, cache_settings=None, backend=DEFAULT_BACKEND, profiles=None, page_ranges=None, prescan=False,
+                       log_settings=None):
+    global _batch_config, _batch_classifier, _batch_cache, _batch_backend
+    global _batch_profiles, _batch_profile_classifiers, _batch_profile_selector, _batch_page_ranges, _batch_prescan
+    _batch_config = config
+    _batch_classifier = LineClassifier(config) if config is not None else None
+    _batch_cache = ExtractionCache(*cache_settings) if cache_settings else None
+    _batch_backend = backend
+    _batch_profiles = profiles
+    if profiles:
+        _batch_profile_classifiers = {name: LineClassifier(profile) for name, profile in profiles.items()}
+        _batch_profile_selector = ProfileSelector(profiles)
+    _batch_page_ranges = page_ranges
+    _batch_prescan = prescan
+    if log_settings:
+        logging_setup.configure_logging(*log_settings, use_queue=False, plain=True)
+
+def _convert_batch_file(pdf_path, debug_mode, stream):
+    """Batch worker: convert one file and return its summary row"""
+    start = time.perf_counter()
+    result = {"File": pdf_path, "Profile": None, "Items": None, "Seconds": None, "Output": None, "Error": None}
+    try:
+        config, classifier = _batch_config, _batch_classifier
+        if _batch_profiles:
+            result["Profile"], result["Error"] = _batch_profile_selector.select(pdf_path)
+            if result["Profile"] is None:
+                result["Seconds"] = round(time.perf_counter() - start, 3)
+                return result
+            logger.info("Using config profile '%s' for %s", result['Profile'], pdf_path)
+            config, classifier = _batch_profiles[result["Profile"]], _batch_profile_classifiers[result["Profile"]]
+        result["Output"], result["Items"] = convert_pdf(pdf_path, debug_mode=debug_mode, stream=stream,
+                                                        config=config, classifier=classifier,
+                                                        cache=_batch_cache, backend=_batch_backend,
+                                                        page_ranges=_batch_page_ranges, prescan=_batch_prescan)
+    except Exception as e:
+        result["Error"] = f"{type(e).__name__}: {e}"
+    result["Seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+def is_batch_input(path):
+    """A directory or a glob pattern selects batch mode; an existing file never does, even with [ ] in its name"""
+    if os.path.isfile(path):
+        return False
+    return os.path.isdir(path) or any(char in path for char in '*?[')
+
+def find_batch_pdfs(path):
+    """List the PDFs of a directory or glob pattern"""
+    if os.path.isdir(path):
+        path = os.path.join(path, '*.pdf')
+    return sorted(file for file in glob.glob(path) if file.lower().endswith('.pdf') and os.path.isfile(file))
+
+def convert_batch(pdf_paths, config, jobs=1, debug_mode=False, stream=True, cache_settings=None, backend=DEFAULT_BACKEND,
+                  profiles=None, page_ranges=None, prescan=False, log_settings=None):
+    """
+    Convert several PDFs with the same configuration, jobs files at a time. Returns the summary rows.
+    cache_settings is the (cache_dir, max_bytes) of the extraction cache, or None to disable it.
+    With profiles ({name: config}) every PDF is converted with the profile that fits its first page instead.
+    log_settings is the (level, json_format) logging setup of the worker processes.
+    """
+    results = []
+    if jobs <= 1:
+        _init_batch_worker(config, cache_settings, backend, profiles, page_ranges, prescan)
+        for pdf_path in pdf_paths:
+            logger.info("Converting %s", pdf_path)
+            results.append(_convert_batch_file(pdf_path, debug_mode, stream))
+    else:
+        logger.info("Converting %s files with %s worker processes", len(pdf_paths), jobs)
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_batch_worker,
+                                 initargs=(config, cache_settings, backend, profiles, page_ranges, prescan,
+                                           log_settings)) as executor:
+            futures = [executor.submit(_convert_batch_file, pdf_path, debug_mode, stream) for pdf_path in pdf_paths]
+            for future in as_completed(futures):
+                results.append(future.result())
+        # Report in input order rather than completion order
+        order = {pdf_path: index for index, pdf_path in enumerate(pdf_paths)}
+        results.sort(key=lambda result: order[result["File"]])
+    return results
+
+def write_batch_report(results, report_path, append=False):
+    """Write (or append) the per-file summary rows to a CSV report"""
+    fieldnames = ["File", "Profile", "Items", "Seconds", "Output", "Error"]
+    write_header = not (append and os.path.exists(report_path))
+    with open(report_path, 'a' if append else 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        if write_header:
+            writer.writeheader()
+        writer.writerows(results)
+
+def print_batch_summary(results):
+    logging_setup.flush_logging()
+    for result in results:
+        if result["Error"]:
+            print(f"  FAILED  {result['File']}: {result['Error']}")
+        else:
+            print(f"  {result['Items']:>6} items  {result['Seconds']:>8.2f}s  {result['File']}")
+    failed = sum(1 for result in results if result["Error"])
+    print(f"Converted {len(results) - failed} of {len(results)} files.")
+    unsorted = [result["File"] for result in results if result["Error"] and result["Error"].startswith(("No config profile", "Ambiguous"))]
+    if unsorted:
+        print(f"{len(unsorted)} files need a config profile picked by hand:")
+        for pdf_path in unsorted:
+            print(f"  {pdf_path}")
+
+def run_batch(args):
+    """
+    Batch mode: convert every PDF of a directory or glob, optionally watching for new ones.
+    Returns the number of files that failed.
+    """
+    input_path = args.pdf_path
+    report_path = args.report or os.path.join(input_path if os.path.isdir(input_path) else os.getcwd(),
+                                              'pdf2excel_report.csv')
+    # The configuration (or the profiles) is read and checked once for the whole batch
+    profiles = load_profiles(args.profiles) if args.profiles else None
+    config = None if profiles else load_config(args.config)
+    jobs = max(1, args.jobs)
+    cache_settings = None if args.no_cache else (args.cache_dir, int(args.cache_size_mb * 1024 * 1024))
+    
+    pdf_paths = find_batch_pdfs(input_path)
+    logger.info("Starting batch PDF to Excel conversion of %s files", len(pdf_paths))
+    results = convert_batch(pdf_paths, config, jobs, args.debug, not args.pandas, cache_settings, args.backend, profiles,
+                            args.pages, args.prescan, logging_setup.settings_from_args(args))
+    write_batch_report(results, report_path)
+    print_batch_summary(results)
+    logger.info("Summary report saved to %s", report_path)
+    failed = sum(1 for result in results if result["Error"])
+    
+    if not args.watch:
+        return failed
+    
+    logger.info("Watching %s for new PDF files every %s seconds (Ctrl+C to stop)", input_path, args.interval)
+    seen = set(pdf_paths)
+    last_sizes = {}
+    try:
+        while True:
+            time.sleep(args.interval)
+            ready = []
+            for pdf_path in find_batch_pdfs(input_path):
+                if pdf_path in seen:
+                    continue
+                # Only pick up files whose size did not change since the last poll, i.e. fully copied
+                size = os.path.getsize(pdf_path)
+                if last_sizes.get(pdf_path) == size:
+                    ready.append(pdf_path)
+                last_sizes[pdf_path] = size
+            if not ready:
+                continue
+            logger.info("Found %s new PDF files", len(ready))
+            results = convert_batch(ready, config, jobs, args.debug, not args.pandas, cache_settings, args.backend, profiles,
+                                    args.pages, args.prescan, logging_setup.settings_from_args(args))
+            write_batch_report(results, report_path, append=True)
+            print_batch_summary(results)
+            failed += sum(1 for result in results if result["Error"])
+            seen.update(ready)
+            for pdf_path in ready:
+                last_sizes.pop(pdf_path, None)
+    except KeyboardInterrupt:
+        logger.info("Stopped watching.")
+    return failed
+
+def finish_profile(profile_prefix):
+    """Stop the --profile profiler, print its per-stage summary and save its data"""
+    profiler = profiling.stop_profiler()
+    if profiler is None:
+        return
+    logging_setup.flush_logging()
+    print(profiler.summary())
+    try:
+        logger.info("Profile data saved to %s", ', '.join(profiler.write()))
+    except OSError as e:
+        logger.error("Could not write the profile data %s.*: %s", profile_prefix, e)
+
+def parse_args():
+    """Parse command-line arguments"""
+    parser = argparse.ArgumentParser(description='Convert an option price PDF into an Excel sheet')
+    parser.add_argument('pdf_path', help='Complete path to the input PDF file, or a directory/glob pattern for batch mode')
+    parser.add_argument('-debug', action='store_true', help="Also write the raw input lines to a 'Raw Lines' sheet")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Number of worker processes used to extract pages, or to convert files in batch mode (default: 1)')
+    parser.add_argument('--pandas', action='store_true',
+                        help='Collect all items first and write them with pandas instead of streaming them to the Excel file')
+    # Streaming is the default now; --stream is still accepted for existing scripts
+    parser.add_argument('--stream', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--config', help='Path to the config file (default: pdf2excel.config next to this script)')
+    parser.add_argument('--profiles', help='Directory of named *.config profiles; each PDF uses the profile that matches its first page')
+    parser.add_argument('--backend', choices=available_backends(), default=DEFAULT_BACKEND,
+                        help=f'Text extraction engine (default: {DEFAULT_BACKEND}). Check new engines with compare_backends.py first')
+    parser.add_argument('--pages', type=parse_page_ranges, help='Only extract these pages, e.g. 1-5,8,12- (default: all pages)')
+    parser.add_argument('--prescan', action='store_true',
+                        help='Find the pages from the start section to the last item line with a quick text pass and only extract those')
+    parser.add_argument('--profile', nargs='?', const='pdf2excel_profile', metavar='PREFIX',
+                        help='Profile the conversion per stage, print the hottest functions and save the data as PREFIX.* (default: pdf2excel_profile)')
+    parser.add_argument('--profile-mode', choices=profiling.PROFILE_MODES, default='cprofile',
+                        help='cprofile (deterministic) or sample (low overhead stack sampling) (default: cprofile)')
+    parser.add_argument('--profile-memory', action='store_true', help='With --profile, also trace memory allocations per stage with tracemalloc')
+    parser.add_argument('--profile-top', type=int, default=15, metavar='N', help='Number of functions listed per profiled stage (default: 15)')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the page extraction cache')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help=f'Page extraction cache directory (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--cache-size-mb', type=float, default=DEFAULT_MAX_BYTES / (1024 * 1024),
+                        help='Maximum size of the page extraction cache in MB; least recently used pages are removed first (default: %(default)g)')
+    parser.add_argument('--report', help='Batch mode: path of the CSV summary report (default: pdf2excel_report.csv in the input directory)')
+    parser.add_argument('--watch', action='store_true', help='Batch mode: keep watching the directory and convert new PDFs as they land')
+    parser.add_argument('--interval', type=float, default=10, help='Batch mode: seconds between checks for new files (default: 10)')
+    logging_setup.add_logging_arguments(parser)
+    return parser.parse_args()
 
 # Main script execution
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print_usage()
+    args = parse_args()
+    logging_setup.configure_from_args(args, plain=True)
+    pdf_path = args.pdf_path
+    debug_mode = args.debug
     
-    pdf_path = sys.argv[1]
-    debug_mode = len(sys.argv) > 2 and sys.argv[2] == "-debug"
+    if args.profile:
+        profiling.start_profiler(args.profile, args.profile_mode, args.profile_top, args.profile_memory)
+    
+    if is_batch_input(pdf_path):
+        failed = run_batch(args)
+        finish_profile(args.profile)
+        # A non-zero exit code lets cron jobs and wrapper scripts notice failed files
+        sys.exit(1 if failed else 0)
     
     if not os.path.exists(pdf_path):
-        print(f"Error: File '{pdf_path}' not found.")
+        logger.error("File '%s' not found.", pdf_path)
         sys.exit(1)
     
-    print(f"\nStarting PDF to Excel conversion")
-    print(f"Input file: {pdf_path}")
+    logger.info("Starting PDF to Excel conversion")
+    logger.info("Input file: %s", pdf_path)
     if debug_mode:
-        print("Debug mode enabled - will include raw data sheet")
-    
-    # Generate output filename based on input filename
-    output_path = os.path.splitext(pdf_path)[0] + ".xlsx"
-    print(f"Output will be saved to: {output_path}")
+        logger.info("Debug mode enabled - will include raw data sheet")
     
-    # Extract data from PDF
-    processed_data, raw_lines = extract_data_from_pdf(pdf_path)
+    if args.profiles:
+        profiles = load_profiles(args.profiles)
+        profile, error = ProfileSelector(profiles).select(pdf_path)
+        if profile is None:
+            logger.error("%s. Use --config to pick the config file.", error)
+            sys.exit(1)
+        logger.info("Using config profile '%s'", profile)
+        config = profiles[profile]
+    else:
+        config = load_config(args.config)
     
-    # Save extracted data to Excel
-    save_to_excel(processed_data, raw_lines, output_path, debug_mode)
+    cache = None if args.no_cache else ExtractionCache(args.cache_dir, int(args.cache_size_mb * 1024 * 1024))
+    output_path, _ = convert_pdf(pdf_path, debug_mode=debug_mode, stream=not args.pandas, jobs=max(1, args.jobs),
+                                 config=config, cache=cache, backend=args.backend, page_ranges=args.pages, prescan=args.prescan)
     
-    print(f"\nProcess complete!")
-    print(f"Data has been saved to {output_path}")
+    logger.info("Process complete!")
+    logger.info("Data has been saved to %s", output_path)
+    finish_profile(args.profile)
@@ -0,0 +1,314 @@
+"""
+Stage-scoped profiling (pdf2excel.py --profile and the cloud updates scraper's main.py --profile).
+
+Twin file: pdftoExcel/profiling.py and cloud_updates_scraper/profiling.py are kept
+byte-identical, because each tool runs standalone from its own directory. Change both.
+
+The callers run their pipeline stages through profiling.stage(), staged() and staged_iter().
+Without an active profiler the helpers hand back a shared no-op context or the unwrapped
+callable, so an unprofiled run pays nothing.
+
+*   pdf2excel: prescan, extract (word extraction and line grouping of a page), match
+    (classifying the lines of a page) and write (writing items and saving the Excel file).
+    The stages interleave page by page; write runs inside match and pauses it. Worker
+    processes (--jobs > 1) are not profiled, only the main process.
+*   scraper: rss (feed fetch and parse), scrape (the update pages), add_rows and
+    save_workbook.
+
+Modes:
+
+*   cprofile - a deterministic cProfile per stage. Nested stages pause the outer one, so
+    every call is counted in exactly one stage. cProfile only sees the thread that enters
+    the stage, so use the sample mode to profile the scraper with --workers > 1.
+*   sample   - a background thread records the stacks of all threads every few
+    milliseconds and tags each sample with the current stage. Much lower overhead, so
+    the stage times stay close to those of an unprofiled run, and it sees worker threads.
+
+At exit the seconds and the hottest functions of every stage are printed, and the raw
+data is written next to PREFIX: PREFIX.<stage>.pstats and PREFIX.pstats (all stages) in
+cprofile mode, for python -m pstats or snakeviz; PREFIX.folded in sample mode, the
+folded stack format of flamegraph.pl and speedscope.
+
+With trace_memory the peak traced memory of every stage is reported, and tracemalloc
+snapshots are taken when a stage ends (at most one per snapshot_interval seconds). The
+allocation growth between two snapshots is reported for the stages that ran in between;
+stages that alternate quickly, like the per-page stages, share their growth.
+"""
+
+import io
+import os
+import sys
+import time
+import pstats
+import cProfile
+import threading
+import contextlib
+import tracemalloc
+from collections import Counter, defaultdict
+
+PROFILE_MODES = ('cprofile', 'sample')
+DEFAULT_SAMPLE_INTERVAL = 0.005
+NO_STAGE_NAME = 'other'  # sample tag outside of any stage
+
+_NO_STAGE = contextlib.nullcontext()
+_active_profiler = None
+
+class StageProfiler:
+    def __init__(self, output_prefix, mode='cprofile', top=15, trace_memory=False,
+                 sample_interval=DEFAULT_SAMPLE_INTERVAL, snapshot_interval=1.0):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode '{mode}', expected one of {', '.join(PROFILE_MODES)}")
+        self.output_prefix = output_prefix
+        self.mode = mode
+        self.top = top
+        self.trace_memory = trace_memory
+        self.sample_interval = sample_interval
+        self.snapshot_interval = snapshot_interval
+        self.stage_seconds = defaultdict(float)
+        self.stage_calls = Counter()
+        self._stack = []  # active stage names, innermost last
+        self._nested_seconds = []  # per active stage, the time spent in the stages nested in it
+        self._profiles = {}  # stage -> cProfile.Profile
+        self._samples = Counter()  # (stage, stack of frame names) -> sample count
+        self._sampler = None
+        self._stop_sampling = threading.Event()
+        self._memory_growth = defaultdict(Counter)  # 'stage+stage' -> allocation site -> bytes grown
+        self._memory_peaks = defaultdict(int)
+        self._snapshot = None
+        self._snapshot_time = 0.0
+        self._pending_memory_stages = []  # stages that ended since the last snapshot
+        self._started_tracemalloc = False
+
+    # --- lifetime ---
+
+    def start(self):
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            self._snapshot = self._filtered_snapshot()
+            self._snapshot_time = time.perf_counter()
+        if self.mode == 'sample':
+            self._sampler = threading.Thread(target=self._sample_loop, name='stage-profiler', daemon=True)
+            self._sampler.start()
+
+    def stop(self):
+        if self._sampler is not None:
+            self._stop_sampling.set()
+            self._sampler.join()
+            self._sampler = None
+        if self.trace_memory and self._snapshot is not None:
+            self._take_snapshot()
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+            self._snapshot = None
+
+    # --- stages ---
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        if self._stack and self._stack[-1] == name:
+            # Re-entering the running stage (e.g. a recursive call) just continues it
+            yield
+            return
+        if self.mode == 'cprofile':
+            if self._stack:
+                self._profiles[self._stack[-1]].disable()
+            profile = self._profiles.get(name)
+            if profile is None:
+                profile = self._profiles[name] = cProfile.Profile()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        self._stack.append(name)
+        self._nested_seconds.append(0.0)
+        start = time.perf_counter()
+        if self.mode == 'cprofile':
+            profile.enable()
+        try:
+            yield
+        finally:
+            if self.mode == 'cprofile':
+                profile.disable()
+            elapsed = time.perf_counter() - start
+            # Stage times exclude nested stages, like the profiles do
+            self.stage_seconds[name] += elapsed - self._nested_seconds.pop()
+            self.stage_calls[name] += 1
+            self._stack.pop()
+            if self._nested_seconds:
+                self._nested_seconds[-1] += elapsed
+            if self.trace_memory:
+                self._memory_checkpoint(name)
+            if self.mode == 'cprofile' and self._stack:
+                self._profiles[self._stack[-1]].enable()
+
+    def wrap(self, name, function):
+        """function, running as stage name on every call"""
+        def staged(*args, **kwargs):
+            with self.stage(name):
+                return function(*args, **kwargs)
+        return staged
+
+    # --- sampling ---
+
+    def _sample_loop(self):
+        own_thread = threading.get_ident()
+        while not self._stop_sampling.wait(self.sample_interval):
+            stage = self._stack[-1] if self._stack else NO_STAGE_NAME
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.reverse()
+                self._samples[(stage, tuple(stack))] += 1
+
+    # --- memory ---
+
+    def _memory_checkpoint(self, name):
+        peak = tracemalloc.get_traced_memory()[1]
+        # The stage reset the peak on entry, so the stages around it see its peak too
+        for stage_name in self._stack + [name]:
+            self._memory_peaks[stage_name] = max(self._memory_peaks[stage_name], peak)
+        self._pending_memory_stages.append(name)
+        if time.perf_counter() - self._snapshot_time >= self.snapshot_interval:
+            self._take_snapshot()
+
+    @staticmethod
+    def _filtered_snapshot():
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+
+    def _take_snapshot(self):
+        """Record the growth since the previous snapshot under the stages that ended in between"""
+        snapshot = self._filtered_snapshot()
+        stages = '+'.join(dict.fromkeys(self._pending_memory_stages)) or NO_STAGE_NAME
+        for difference in snapshot.compare_to(self._snapshot, 'lineno'):
+            if difference.size_diff:
+                frame = difference.traceback[0]
+                self._memory_growth[stages][f"{os.path.basename(frame.filename)}:{frame.lineno}"] += difference.size_diff
+        self._snapshot = snapshot
+        self._snapshot_time = time.perf_counter()
+        self._pending_memory_stages = []
+
+    # --- results ---
+
+    def _stages(self):
+        return sorted(self.stage_seconds, key=self.stage_seconds.get, reverse=True)
+
+    def write(self):
+        """Write the raw profile data next to the output prefix. Returns the written paths"""
+        paths = []
+        if self.mode == 'cprofile':
+            combined = None
+            for name, profile in self._profiles.items():
+                path = f"{self.output_prefix}.{name}.pstats"
+                profile.dump_stats(path)
+                paths.append(path)
+                if combined is None:
+                    combined = pstats.Stats(profile)
+                else:
+                    combined.add(profile)
+            if combined is not None:
+                path = f"{self.output_prefix}.pstats"
+                combined.dump_stats(path)
+                paths.append(path)
+        elif self._samples:
+            path = f"{self.output_prefix}.folded"
+            with open(path, 'w', encoding='utf-8') as f:
+                for (stage, stack), count in sorted(self._samples.items()):
+                    f.write(';'.join((f"[{stage}]",) + stack) + f" {count}\n")
+            paths.append(path)
+        return paths
+
+    def summary(self):
+        """Text summary: per stage its time and hottest functions, then the memory growth"""
+        out = io.StringIO()
+        out.write(f"\n=== Profile ({self.mode}) ===\n")
+        for name in self._stages():
+            out.write(f"\n--- Stage {name}: {self.stage_seconds[name]:.3f}s in {self.stage_calls[name]} calls")
+            if self.trace_memory:
+                out.write(f", peak traced memory {self._memory_peaks[name] / (1024 * 1024):.1f} MB")
+            out.write(" ---\n")
+            if self.mode == 'cprofile' and name in self._profiles:
+                stats = pstats.Stats(self._profiles[name], stream=out)
+                stats.sort_stats('tottime').print_stats(self.top)
+            elif self.mode == 'sample':
+                self._write_sample_summary(out, name)
+        if self.mode == 'sample':
+            other = sum(count for (stage, _), count in self._samples.items() if stage == NO_STAGE_NAME)
+            if other:
+                out.write(f"\n{other} samples outside of any stage\n")
+        for stages, growth in self._memory_growth.items():
+            grown = [(site, size) for site, size in growth.most_common(self.top) if size > 0]
+            if grown:
+                out.write(f"\n--- Allocation growth during {stages}: {sum(growth.values()) / 1024:.1f} KB net ---\n")
+                for site, size in grown:
+                    out.write(f"  {size / 1024:>10.1f} KB  {site}\n")
+        return out.getvalue()
+
+    def _write_sample_summary(self, out, name):
+        own = Counter()
+        inclusive = Counter()
+        total = 0
+        for (stage, stack), count in self._samples.items():
+            if stage != name or not stack:
+                continue
+            total += count
+            own[stack[-1]] += count
+            for function in set(stack):
+                inclusive[function] += count
+        if not total:
+            out.write("No samples\n")
+            return
+        out.write(f"{total} samples (all threads)\n{'own %':>7} {'total %':>8}  function\n")
+        for function, count in own.most_common(self.top):
+            out.write(f"{100 * count / total:>7.1f} {100 * inclusive[function] / total:>8.1f}  {function}\n")
+
+def start_profiler(output_prefix, mode='cprofile', top=15, trace_memory=False):
+    """Make a new profiler the active one, start it and return it"""
+    global _active_profiler
+    _active_profiler = StageProfiler(output_prefix, mode, top, trace_memory)
+    _active_profiler.start()
+    return _active_profiler
+
+def stop_profiler():
+    """Stop the active profiler and return it (None without one); see summary() and write()"""
+    global _active_profiler
+    profiler, _active_profiler = _active_profiler, None
+    if profiler is not None:
+        profiler.stop()
+    return profiler
+
+def active_profiler():
+    return _active_profiler
+
+def stage(name):
+    """Context manager profiling a pipeline stage when a profiler is active"""
+    if _active_profiler is None:
+        return _NO_STAGE
+    return _active_profiler.stage(name)
+
+def staged(name, function):
+    """function as stage name when a profiler is active, otherwise function itself"""
+    if _active_profiler is None:
+        return function
+    return _active_profiler.wrap(name, function)
+
+def staged_iter(name, iterable):
+    """Iterate iterable, producing every element as stage name when a profiler is active"""
+    if _active_profiler is None:
+        yield from iterable
+        return
+    iterator = iter(iterable)
+    while True:
+        with _active_profiler.stage(name):
+            try:
+                element = next(iterator)
+            except StopIteration:
+                return
+        yield element
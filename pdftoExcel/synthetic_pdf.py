@@ -0,0 +1,184 @@
+"""
+Generate synthetic option price book PDFs for testing and benchmarking pdf2excel.
+
+The pages have the shape pdf2excel.config describes: the header lines at the top, the
+footer lines at the bottom, upper-case section headings, item lines with the 'A' cut-off
+and a price in separate columns, and descriptions of up to three lines below the items.
+The PDF is written directly (Helvetica text only), so no PDF library is needed.
+
+Next to the PDF the generator writes the config that matches it (<name>.config, with the
+page count in the footer pattern) and the items pdf2excel should extract (<name>.items.json).
+
+Usage: python synthetic_pdf.py <pages> <output.pdf> [--seed 1]
+"""
+
+import os
+import re
+import sys
+import json
+import random
+import argparse
+
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792  # US letter, points
+FONT_SIZE = 9
+LINE_HEIGHT = 13
+BODY_TOP = 680
+BODY_BOTTOM = 90
+
+HEADER_LINES = [
+    "KB Home Lone Star Inc., a Texas corporation",
+    "Salerno 45's 868290",
+    "All Plan Options with Prices",
+    "Options Available for Plan 7D (134.1655) March 30, 2025",
+    "OPTION SELECTIONS Sales Office Option Cut-Off Unit Price",
+]
+FOOTER_LINE = "Prices and availability of option selections are subject to change."
+ITEM_LINE_PATTERN = r"^(.*?)\s+A\s+(\$[\d,]+(?:\.\d{2})?|Included|N/C|TBD)\s*$"
+START_SECTION = "APPLIANCES"
+SECTIONS = ["CABINETS", "COUNTERTOPS", "ELECTRICAL", "FLOORING", "LIGHTING", "PLUMBING",
+            "WINDOW COVERINGS", "EXTERIOR", "STRUCTURAL", "SMART HOME"]
+EXCLUDED_SECTIONS = ["A", "TBD", "OPTION SELECTIONS", "7D"]
+
+ADJECTIVES = ["Stainless", "Brushed nickel", "Quartz", "Upgraded", "Designer", "Oversized", "Energy efficient",
+              "Tankless", "Frameless", "Soft close", "Recessed", "Vaulted", "Covered", "Prewired"]
+NOUNS = ["range hood", "sink", "faucet", "vanity", "tile surround", "ceiling fan", "pendant light",
+         "garage door opener", "patio extension", "water heater", "shower door", "cabinet hardware",
+         "outlet package", "island", "pantry shelving", "laminate flooring"]
+DETAILS = ["includes installation", "color per selection sheet", "available in kitchen and baths",
+           "not available with option 12", "requires electrical upgrade", "matches the standard finish",
+           "per room", "see sales counselor for samples", "limited to one per home"]
+
+def _price(rng):
+    roll = rng.random()
+    if roll < 0.1:
+        return "Included"
+    if roll < 0.15:
+        return "N/C"
+    if roll < 0.17:
+        return "TBD"
+    if roll < 0.6:
+        return f"${rng.randint(1, 99) * 25:,}"
+    return f"${rng.randint(1, 4000) * 5:,}.00"
+
+def generate_price_book(pages, seed=1):
+    """
+    Lay out a price book of the given page count.
+
+    Returns:
+        (page_rows, items) - page_rows holds per page a list of rows, each row a list of
+        (x, y, text) strings; items holds the item dicts pdf2excel should extract.
+    """
+    rng = random.Random(seed)
+    items = []
+    page_rows = []
+    section_index = -1
+    item_number = 0
+    for page_num in range(1, pages + 1):
+        rows = []
+        y = PAGE_HEIGHT - 40
+        for header in HEADER_LINES:
+            rows.append([(40, y, header)])
+            y -= LINE_HEIGHT
+
+        y = BODY_TOP
+        if page_num == 1:
+            rows.append([(40, y, "Prices shown are per home unless stated otherwise.")])
+            y -= LINE_HEIGHT
+        while True:
+            description = [f"{rng.choice(DETAILS).capitalize()}, {rng.choice(DETAILS)}"
+                           for _ in range(rng.choice([0, 0, 1, 1, 2, 3]))]
+            new_section = section_index < 0 or rng.random() < 0.08
+            needed = (1 + len(description)) * LINE_HEIGHT + (LINE_HEIGHT + 4 if new_section else 0)
+            if y - needed < BODY_BOTTOM:
+                break
+            if new_section:
+                section_index += 1
+                section = START_SECTION if section_index == 0 else SECTIONS[(section_index - 1) % len(SECTIONS)]
+                rows.append([(40, y, section)])
+                y -= LINE_HEIGHT + 4
+
+            item_number += 1
+            item_text = f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} option {item_number}"
+            price = _price(rng)
+            rows.append([(40, y, item_text), (380, y, "A"), (460, y, price)])
+            y -= LINE_HEIGHT
+            for line in description:
+                rows.append([(50, y, line)])
+                y -= LINE_HEIGHT
+            items.append({
+                "Section": section,
+                "Item": item_text,
+                "Description": " ".join(description) if description else None,
+                "Unit Price": price,
+                "Cut-Off": "A"
+            })
+
+        rows.append([(40, 50, FOOTER_LINE)])
+        rows.append([(450, 36, f"Page {page_num} of {pages}")])
+        page_rows.append(rows)
+    return page_rows, items
+
+def _pdf_string(text):
+    return '(' + text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') + ')'
+
+def write_pdf(path, page_rows):
+    """Write the laid out pages as a PDF with one Helvetica text object per string"""
+    objects = [None, None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    page_ids = []
+    for rows in page_rows:
+        content = "\n".join(f"BT /F1 {FONT_SIZE} Tf {x} {y} Td {_pdf_string(text)} Tj ET"
+                            for row in rows for x, y, text in row).encode('latin-1')
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+        content_id = len(objects)
+        objects.append(("<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Resources << /Font << /F1 3 0 R >> >> "
+                        "/Contents %d 0 R >>" % (PAGE_WIDTH, PAGE_HEIGHT, content_id)).encode('ascii'))
+        page_ids.append(len(objects))
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = ("<< /Type /Pages /Kids [%s] /Count %d >>" % (" ".join(f"{page_id} 0 R" for page_id in page_ids),
+                                                                 len(page_ids))).encode('ascii')
+
+    with open(path, 'wb') as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+        xref_offset = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for offset in offsets:
+            f.write(b"%010d 00000 n \n" % offset)
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset))
+
+def write_config(path, pages):
+    """Write the pdf2excel config matching a generated price book"""
+    lines = ["# Generated by synthetic_pdf.py", "[HEADER]"]
+    lines += [re.escape(header) for header in HEADER_LINES]
+    lines += ["", "[FOOTER]", re.escape(FOOTER_LINE), rf"Page \d+ of {pages}"]
+    lines += ["", "[ITEM]", ITEM_LINE_PATTERN]
+    lines += ["", "[SECTION]", "UPPERCASE", "", "[START]", START_SECTION, "", "[EXCLUDE]"] + EXCLUDED_SECTIONS
+    with open(path, 'w') as f:
+        f.write("\n".join(lines) + "\n")
+
+def generate(pages, pdf_path, seed=1):
+    """Write <pdf_path>, its config and its expected items. Returns (config_path, items_path, items)"""
+    page_rows, items = generate_price_book(pages, seed)
+    write_pdf(pdf_path, page_rows)
+    base = os.path.splitext(pdf_path)[0]
+    config_path = base + '.config'
+    items_path = base + '.items.json'
+    write_config(config_path, pages)
+    with open(items_path, 'w', encoding='utf-8') as f:
+        json.dump(items, f, indent=1)
+    return config_path, items_path, items
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Generate a synthetic option price book PDF')
+    parser.add_argument('pages', type=int, help='Number of pages')
+    parser.add_argument('pdf_path', help='Output PDF file')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    args = parser.parse_args()
+    if args.pages < 1:
+        print("Error: pages must be at least 1")
+        sys.exit(1)
+    config_path, items_path, items = generate(args.pages, args.pdf_path, args.seed)
+    print(f"Wrote {args.pdf_path} ({args.pages} pages, {len(items)} items), {config_path} and {items_path}")